@@ -12,56 +12,111 @@ bl_info = {
 }
 
 import bpy
+from bpy.app.handlers import persistent
+import numpy as np
 import count_objects
 
-# On récupère tous les objets présents dans la scène
-# objects = bpy.context.scene.objects
-
-class Globals:   
-    selected_objects = 0
-    vertices_number = 0
-    faces_number = 0
+# Statistiques de chaque maillage calculées par count_objects, indexées par l'identifiant de session du maillage
+# Une entrée est invalidée dès que la géométrie du maillage est modifiée (gestionnaire 'depsgraph_update_post'),
+# le panneau peut donc afficher les totaux en direct sans relire les maillages inchangés. En mode 'Edition', les tableaux
+# du maillage ne sont mis à jour qu'à la sortie de ce mode : l'entrée est conservée jusque-là
+mesh_statistics_cache = {}
+
+
+# Tableaux du maillage lus avec foreach_get, dans l'ordre des arguments de count_objects.getMeshStatistics
+def mesh_buffers(mesh):
+    vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", vertices)
+    loop_start = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("edge_index", loop_edges)
+    return vertices, loop_start, loop_total, loop_vertices, loop_edges, len(mesh.edges)
+
+
+# Statistiques d'un maillage (sommets, arêtes, faces, boîte englobante, aire, volume, arêtes isolées, de bord et non
+# manifold), calculées en un seul parcours par count_objects puis conservées dans le cache
+# En mode 'Edition', ce sont celles du maillage tel qu'il était à l'entrée dans ce mode
+def mesh_statistics(mesh):
+    statistics = mesh_statistics_cache.get(mesh.session_uid)
+    if statistics is None:
+        statistics = count_objects.getMeshStatistics(*mesh_buffers(mesh))
+        mesh_statistics_cache[mesh.session_uid] = statistics
+    return statistics
+
+
+# Invalide les statistiques des maillages dont la géométrie vient d'être modifiée
+# Les modifications faites en mode 'Edition' ne sont pas encore reportées dans les tableaux du maillage : l'entrée n'est
+# invalidée qu'à la sortie de ce mode (qui met à jour la géométrie), et non à chaque modification
+@persistent
+def invalidate_mesh_statistics(scene, depsgraph):
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+        id = update.id.original
+        if isinstance(id, bpy.types.Object) and id.type == 'MESH':
+            id = id.data
+        if isinstance(id, bpy.types.Mesh) and not id.is_editmode:
+            mesh_statistics_cache.pop(id.session_uid, None)
+
+
+# Les identifiants de session ne sont plus valables après l'ouverture d'un fichier
+@persistent
+def clear_mesh_statistics(*args):
+    mesh_statistics_cache.clear()
+
+
+# Totaux des statistiques des maillages sélectionnés
+# La boîte englobante est exprimée dans le repère global ; l'aire et le volume sont mesurés dans le repère de chaque objet
+def selection_statistics(context):
+    selected_meshs = [object for object in context.selected_objects if object.type == 'MESH']
+    totals = {"objects": len(selected_meshs), "vertices": 0, "edges": 0, "faces": 0, "area": 0.0, "volume": 0.0,
+              "wire_edges": 0, "boundary_edges": 0, "non_manifold_edges": 0, "bbox_min": None, "bbox_max": None,
+              "edit_mode": False}
+    for object in selected_meshs:
+        statistics = mesh_statistics(object.data)
+        for key in ("vertices", "edges", "faces", "area", "volume", "wire_edges", "boundary_edges", "non_manifold_edges"):
+            totals[key] += statistics[key]
+        totals["edit_mode"] |= object.mode == 'EDIT'
+        if statistics["vertices"] == 0:
+            continue
+        # Les huit coins de la boîte englobante de l'objet sont placés dans le repère global
+        corners = np.array([[x, y, z, 1.0] for x in (statistics["bbox_min"][0], statistics["bbox_max"][0])
+                                           for y in (statistics["bbox_min"][1], statistics["bbox_max"][1])
+                                           for z in (statistics["bbox_min"][2], statistics["bbox_max"][2])])
+        corners = (corners @ np.array(object.matrix_world).T)[:, :3]
+        bbox_min, bbox_max = corners.min(axis=0), corners.max(axis=0)
+        if totals["bbox_min"] is not None:
+            bbox_min = np.minimum(bbox_min, totals["bbox_min"])
+            bbox_max = np.maximum(bbox_max, totals["bbox_max"])
+        totals["bbox_min"], totals["bbox_max"] = bbox_min, bbox_max
+    return totals
 
 
 def display_infos(context):
     # On récupère tous les objets qui sont sélectionnés dans la scène et qui sont des maillages (meshs)
-    selected_meshs = [object for object in bpy.context.selected_objects if object.type == 'MESH']
+    selected_meshs = [object for object in context.selected_objects if object.type == 'MESH']
 
     # Si la liste est vide
     if not selected_meshs :
         print('Il n\'y a pas de meshs sélectionnés dans la scène.')
-        Globals.selected_objects = 0
-        Globals.vertices_number = 0
-        Globals.faces_number = 0
-    # Sinon on compte le nombre de sommets de chaque meshs et on fait le total
-    else :
-        Globals.selected_objects = len(selected_meshs)
-        print('Il y a {} meshs sélectionnés :'.format(len(selected_meshs)))
-        total_vertices = 0
-        total_faces = 0
-        for mesh in selected_meshs :
-            vertices_list = []
-            for vertice in mesh.data.vertices:
-                vertices_list.append(vertice.co)
-            # On récupère le nombre de sommets du mesh
-            vertices = count_objects.getVerticesNumber(vertices_list)
-            print('Un mesh appelé {} et possédant {} sommets;'.format(mesh.name, vertices))
-            total_vertices += vertices
-            
-            faces_list = []
-            for face in mesh.data.polygons:
-                faces_list.append(face.vertices)
-            # On récupère le nombre de sommets du mesh
-            faces = count_objects.getFacesNumber(faces_list)
-            print('Ainsi que {} faces;'.format(faces))
-            total_faces += faces
-            # afficher les coordonnées des sommets
-            # for vertice in mesh.data.vertices:
-            #    print(vertice.co)
-        print('Au total, l\'ensemble des meshs sélectionnés représentent {} sommets.'.format(total_vertices))
-        Globals.vertices_number = total_vertices
-        Globals.faces_number = total_faces
-        
+        return
+    # Sinon on affiche les statistiques de chaque mesh puis leur total
+    print('Il y a {} meshs sélectionnés :'.format(len(selected_meshs)))
+    for object in selected_meshs :
+        statistics = mesh_statistics(object.data)
+        print('Un mesh appelé {} et possédant {} sommets, {} arêtes et {} faces ({} arêtes isolées, {} de bord et {} non manifold) ;'.format(
+            object.name, statistics["vertices"], statistics["edges"], statistics["faces"], statistics["wire_edges"],
+            statistics["boundary_edges"], statistics["non_manifold_edges"]))
+        print('Aire {:.6g}, volume {:.6g}, boîte englobante {} - {} ;'.format(
+            statistics["area"], statistics["volume"], statistics["bbox_min"], statistics["bbox_max"]))
+    totals = selection_statistics(context)
+    print('Au total, l\'ensemble des meshs sélectionnés représentent {} sommets et {} faces.'.format(totals["vertices"], totals["faces"]))
+
 def test_divide_by_zero(context):
     try:
         count_objects.testDivideByNumber(0.0)
@@ -104,24 +159,50 @@ class VIEW3D_PT_test_panel(bpy.types.Panel):
         row.operator("view3d.count_object", text="Afficher informations")
         row = self.layout.row()
         row.operator("view3d.test_division", text="Test division par zéro")
+        # Totaux calculés en direct : seuls les maillages modifiés depuis le dernier affichage sont relus
+        totals = selection_statistics(context)
         row = self.layout.row()
-        row.label(text="Nombre d'objets sélectionnés : {}".format(Globals.selected_objects))
+        row.label(text="Nombre d'objets sélectionnés : {}".format(totals["objects"]))
         row = self.layout.row()
-        row.label(text="Nombre total de sommets : {}".format(Globals.vertices_number))
+        row.label(text="Nombre total de sommets : {}".format(totals["vertices"]))
         row = self.layout.row()
-        row.label(text="Nombre total de faces : {}".format(Globals.faces_number))
-
+        row.label(text="Nombre total d'arêtes : {}".format(totals["edges"]))
+        row = self.layout.row()
+        row.label(text="Nombre total de faces : {}".format(totals["faces"]))
+        row = self.layout.row()
+        row.label(text="Arêtes isolées : {}".format(totals["wire_edges"]))
+        row = self.layout.row()
+        row.label(text="Arêtes de bord : {}".format(totals["boundary_edges"]))
+        row = self.layout.row()
+        row.label(text="Arêtes non manifold : {}".format(totals["non_manifold_edges"]))
+        row = self.layout.row()
+        row.label(text="Aire : {:.6g}".format(totals["area"]))
+        row = self.layout.row()
+        row.label(text="Volume : {:.6g}".format(totals["volume"]))
+        if totals["bbox_min"] is not None:
+            row = self.layout.row()
+            row.label(text="Dimensions : {:.4g} x {:.4g} x {:.4g}".format(*(totals["bbox_max"] - totals["bbox_min"])))
+        if totals["edit_mode"]:
+            row = self.layout.row()
+            row.label(text="Mode Edition : totaux à l'entrée dans ce mode", icon='INFO')
 
 def register():
     bpy.utils.register_class(VIEW3D_PT_test_panel)
     bpy.utils.register_class(VIEW3D_OT_count_object)
     bpy.utils.register_class(VIEW3D_OT_test_division)
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_mesh_statistics)
+    bpy.app.handlers.load_post.append(clear_mesh_statistics)
 
 
 def unregister():
     bpy.utils.unregister_class(VIEW3D_PT_test_panel)
     bpy.utils.unregister_class(VIEW3D_OT_count_object)
     bpy.utils.unregister_class(VIEW3D_OT_test_division)
+    if invalidate_mesh_statistics in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(invalidate_mesh_statistics)
+    if clear_mesh_statistics in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_mesh_statistics)
+    mesh_statistics_cache.clear()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,21 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
 #include <vector>
 #include <iostream>
 #include <stdexcept>
+#include <string>
+#include <limits>
+#include <cmath>
+#include <cstdint>
+#include <algorithm>
 
 namespace py = pybind11;
 
+// Tableaux numpy contigus lus en place (aucune copie si le tableau est déjà de ce type)
+typedef py::array_t<float, py::array::c_style | py::array::forcecast>        Float_array;
+typedef py::array_t<std::int32_t, py::array::c_style | py::array::forcecast> Int_array;
+
 int getVerticesNumber(const std::vector<std::vector<double>>& data){
     return (int)data.size();
 }
@@ -29,10 +39,117 @@ float testDivideByNumber(float number){
     return result;
 }
 
+// Statistiques d'un maillage calculées en un seul parcours de ses tableaux (lus avec foreach_get) :
+// - vertices : coordonnées des sommets (3N)
+// - loop_start, loop_total : premier coin et nombre de coins de chaque polygone
+// - loop_vertices, loop_edges : sommet et arête de chaque coin
+// - number_of_edges : nombre d'arêtes du maillage
+// Les polygones sont triangulés en éventail pour le calcul de l'aire et du volume (volume signé, significatif pour un maillage fermé)
+// Les arêtes sont classées selon le nombre de polygones qui les partagent : aucun (arête isolée), un seul (arête de bord)
+// ou plus de deux (arête non manifold)
+py::dict getMeshStatistics(const Float_array& vertices, const Int_array& loop_start, const Int_array& loop_total,
+                           const Int_array& loop_vertices, const Int_array& loop_edges, std::size_t number_of_edges){
+    if(vertices.size() % 3 != 0){
+        throw std::runtime_error("Le tableau des sommets doit contenir 3 coordonnées par sommet...");
+    }
+    if(loop_start.size() != loop_total.size() || loop_vertices.size() != loop_edges.size()){
+        throw std::runtime_error("Les tableaux des polygones et des coins sont de tailles incohérentes...");
+    }
+    const std::size_t number_of_vertices = static_cast<std::size_t>(vertices.size()) / 3;
+    const std::size_t number_of_polygons = static_cast<std::size_t>(loop_start.size());
+    const std::size_t number_of_loops = static_cast<std::size_t>(loop_vertices.size());
+    const float* points = vertices.data();
+    const std::int32_t* starts = loop_start.data();
+    const std::int32_t* totals = loop_total.data();
+    const std::int32_t* corners = loop_vertices.data();
+    const std::int32_t* corner_edges = loop_edges.data();
+
+    double bbox_min[3] = {0.0, 0.0, 0.0};
+    double bbox_max[3] = {0.0, 0.0, 0.0};
+    double area = 0.0;
+    double volume = 0.0;
+    std::size_t triangles = 0;
+    std::size_t wire_edges = 0;
+    std::size_t boundary_edges = 0;
+    std::size_t non_manifold_edges = 0;
+    {
+        // Les tableaux restent référencés par l'appelant : le GIL est relâché pendant le calcul
+        py::gil_scoped_release release;
+
+        if(number_of_vertices > 0){
+            for(int axis = 0; axis < 3; ++axis){
+                bbox_min[axis] = std::numeric_limits<double>::max();
+                bbox_max[axis] = std::numeric_limits<double>::lowest();
+            }
+        }
+        for(std::size_t i = 0; i < number_of_vertices; ++i){
+            for(int axis = 0; axis < 3; ++axis){
+                bbox_min[axis] = std::min(bbox_min[axis], static_cast<double>(points[3 * i + axis]));
+                bbox_max[axis] = std::max(bbox_max[axis], static_cast<double>(points[3 * i + axis]));
+            }
+        }
+
+        // Nombre de polygones incidents à chaque arête
+        std::vector<std::uint32_t> edge_faces(number_of_edges, 0);
+        for(std::size_t polygon = 0; polygon < number_of_polygons; ++polygon){
+            const std::size_t start = static_cast<std::size_t>(starts[polygon]);
+            const std::size_t total = static_cast<std::size_t>(totals[polygon]);
+            if(starts[polygon] < 0 || totals[polygon] < 0 || start + total > number_of_loops){
+                throw std::runtime_error("Le polygone " + std::to_string(polygon) + " référence un coin inexistant...");
+            }
+            for(std::size_t loop = start; loop < start + total; ++loop){
+                if(corners[loop] < 0 || static_cast<std::size_t>(corners[loop]) >= number_of_vertices
+                   || corner_edges[loop] < 0 || static_cast<std::size_t>(corner_edges[loop]) >= number_of_edges){
+                    throw std::runtime_error("Le coin " + std::to_string(loop) + " référence un sommet ou une arête inexistant...");
+                }
+                ++edge_faces[corner_edges[loop]];
+            }
+
+            // Triangulation en éventail (v0, vk, vk+1) : aire et volume signé du tétraèdre formé avec l'origine
+            if(total < 3){
+                continue;
+            }
+            const float* p0 = points + 3 * corners[start];
+            for(std::size_t k = 1; k + 1 < total; ++k){
+                const float* p1 = points + 3 * corners[start + k];
+                const float* p2 = points + 3 * corners[start + k + 1];
+                const double u[3] = {double(p1[0]) - p0[0], double(p1[1]) - p0[1], double(p1[2]) - p0[2]};
+                const double v[3] = {double(p2[0]) - p0[0], double(p2[1]) - p0[1], double(p2[2]) - p0[2]};
+                const double cross[3] = {u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0]};
+                area += 0.5 * std::sqrt(cross[0] * cross[0] + cross[1] * cross[1] + cross[2] * cross[2]);
+                volume += (p0[0] * cross[0] + p0[1] * cross[1] + p0[2] * cross[2]) / 6.0;
+                ++triangles;
+            }
+        }
+
+        for(std::uint32_t faces : edge_faces){
+            wire_edges += faces == 0;
+            boundary_edges += faces == 1;
+            non_manifold_edges += faces > 2;
+        }
+    }
+
+    py::dict statistics;
+    statistics["vertices"] = number_of_vertices;
+    statistics["edges"] = number_of_edges;
+    statistics["faces"] = number_of_polygons;
+    statistics["triangles"] = triangles;
+    statistics["bbox_min"] = py::make_tuple(bbox_min[0], bbox_min[1], bbox_min[2]);
+    statistics["bbox_max"] = py::make_tuple(bbox_max[0], bbox_max[1], bbox_max[2]);
+    statistics["area"] = area;
+    statistics["volume"] = volume;
+    statistics["wire_edges"] = wire_edges;
+    statistics["boundary_edges"] = boundary_edges;
+    statistics["non_manifold_edges"] = non_manifold_edges;
+    return statistics;
+}
+
 PYBIND11_MODULE(count_objects, handle){
     handle.doc() = "compte le nombre de sommets, arêtes et faces d'un objet géométrique";
     handle.def("getVerticesNumber", &getVerticesNumber);
     handle.def("getEdgesNumber", &getEdgesNumber);
     handle.def("getFacesNumber", &getFacesNumber);
+    handle.def("getMeshStatistics", &getMeshStatistics, py::arg("vertices"), py::arg("loop_start"), py::arg("loop_total"),
+               py::arg("loop_vertices"), py::arg("loop_edges"), py::arg("number_of_edges"));
     handle.def("testDivideByNumber", &testDivideByNumber);
 }
\ No newline at end of file
@@ -0,0 +1,523 @@
+# Chaîne de traitement en ligne de commande (sans Blender) : simplification ou segmentation d'un ensemble de fichiers
+# OBJ, OFF ou PLY à l'aide des modules Python 'mesh_simplification' et 'surface_mesh_segmentation'
+#
+# Exemples :
+#   python batch_pipeline.py simplify modeles/ -o resultats/ --ratio 0.25 --workers 8
+#   python batch_pipeline.py segment "modeles/**/*.ply" -o resultats/ --clusters 5 --timings durees.csv
+
+import argparse
+import csv
+import glob
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+# Fonctions de conversion des maillages communes avec les extensions Blender (dossier Common)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Common'))
+from mesh_buffers import fan_triangulate, polygon_segments_ids, weld_vertices
+
+import chunked_simplification
+
+# Extensions des fichiers de maillage pris en charge
+MESH_EXTENSIONS = ('.obj', '.off', '.ply')
+
+# Distance en deçà de laquelle deux sommets sont fusionnés (0 : pas de fusion)
+DEFAULT_WELD_DISTANCE = 0.0
+
+
+# Nombre de lignes (fichiers texte) ou d'éléments (fichiers binaires) lus à la fois : les fichiers sont parcourus par blocs
+READ_BLOCK_SIZE = 1 << 18
+
+EMPTY_VERTICES = np.empty((0, 3), dtype=np.float32)
+
+
+# Construit la description d'un bloc de polygones (nombre de coins, sommets des coins) à partir d'une liste de polygones
+def polygons_to_loops(polygons):
+    loop_total = np.fromiter((len(polygon) for polygon in polygons), dtype=np.int32, count=len(polygons))
+    loop_vertices = np.fromiter((index for polygon in polygons for index in polygon), dtype=np.int32, count=int(loop_total.sum()))
+    return loop_total, loop_vertices
+
+
+# Tailles des blocs successifs de lecture de 'count' éléments
+def block_sizes(count):
+    for start in range(0, count, READ_BLOCK_SIZE):
+        yield min(READ_BLOCK_SIZE, count - start)
+
+
+# Les lecteurs parcourent un fichier par blocs et produisent des paires (sommets, polygones) : tableau (N, 3) des sommets du
+# bloc et description de ses polygones (voir polygons_to_loops), dont les indices sont ceux des sommets du fichier entier
+
+# Lecture d'un fichier OBJ : seuls les sommets ('v') et les faces ('f') sont pris en compte
+def read_obj(path):
+    number_of_vertices = 0
+    with open(path, 'r', encoding='utf-8', errors='replace') as file:
+        while True:
+            lines = list(itertools.islice(file, READ_BLOCK_SIZE))
+            if not lines:
+                return
+            vertices = []
+            polygons = []
+            for line in lines:
+                if line.startswith('v '):
+                    vertices.append(line.split()[1:4])
+                elif line.startswith('f '):
+                    # Les coins peuvent être de la forme 'v', 'v/vt', 'v//vn' ou 'v/vt/vn', les indices négatifs sont relatifs
+                    # aux sommets déjà lus
+                    polygon = [int(corner.split('/')[0]) for corner in line.split()[1:]]
+                    polygons.append([index - 1 if index > 0 else number_of_vertices + len(vertices) + index for index in polygon])
+            number_of_vertices += len(vertices)
+            yield np.array(vertices, dtype=np.float32).reshape(-1, 3), polygons_to_loops(polygons)
+
+
+# Retourne les lignes utiles d'un fichier OFF (sans commentaires ni lignes vides)
+def off_lines(file):
+    for line in file:
+        line = line.split('#', 1)[0].strip()
+        if line:
+            yield line
+
+
+# Lecture d'un fichier OFF (ASCII)
+def read_off(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as file:
+        lines = off_lines(file)
+        header = next(lines)
+        if not header.endswith('OFF'):
+            raise ValueError('En-tête OFF invalide : {}'.format(header))
+        # Le nombre d'éléments peut figurer sur la ligne d'en-tête
+        counts = header[len('OFF'):].split() if header.startswith('OFF') and len(header) > 3 else next(lines).split()
+        number_of_vertices, number_of_faces = int(counts[0]), int(counts[1])
+        for size in block_sizes(number_of_vertices):
+            yield np.array([next(lines).split()[:3] for _ in range(size)], dtype=np.float32).reshape(-1, 3), polygons_to_loops([])
+        for size in block_sizes(number_of_faces):
+            polygons = []
+            for _ in range(size):
+                values = next(lines).split()
+                # Les valeurs suivant les indices (couleur de la face) sont ignorées
+                polygons.append([int(value) for value in values[1:1 + int(values[0])]])
+            yield EMPTY_VERTICES, polygons_to_loops(polygons)
+
+
+# Correspondance entre les types PLY et les types numpy
+PLY_TYPES = {
+    'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8',
+}
+
+
+# Lecture de l'en-tête d'un fichier PLY : format et liste des éléments (nom, nombre, propriétés)
+def read_ply_header(file):
+    if file.readline().strip() != b'ply':
+        raise ValueError('En-tête PLY invalide')
+    file_format = None
+    elements = []
+    while True:
+        line = file.readline()
+        if not line:
+            raise ValueError('En-tête PLY incomplet')
+        words = line.decode('ascii', errors='replace').split()
+        if not words or words[0] in ('comment', 'obj_info'):
+            continue
+        if words[0] == 'format':
+            file_format = words[1]
+        elif words[0] == 'element':
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == 'property':
+            # propriété scalaire : ('nom', type) ; propriété liste : ('nom', (type du nombre, type des valeurs))
+            if words[1] == 'list':
+                elements[-1][2].append((words[4], (PLY_TYPES[words[2]], PLY_TYPES[words[3]])))
+            else:
+                elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+        elif words[0] == 'end_header':
+            return file_format, elements
+
+
+# Lecture par blocs d'un élément d'un fichier PLY binaire comportant des propriétés listes ('is_face' : élément des faces,
+# dont les polygones sont produits ; les autres éléments sont seulement parcourus). Lecture directe lorsque toutes les faces
+# ont le même nombre de sommets. Retourne la position de la fin de l'élément dans 'data'
+def read_ply_binary_faces(data, offset, count, properties, byte_order, is_face):
+    if len(properties) == 1 and isinstance(properties[0][1], tuple) and count > 0:
+        count_type, index_type = (np.dtype(byte_order + type) for type in properties[0][1])
+        corners = int(np.frombuffer(data, dtype=count_type, count=1, offset=offset)[0])
+        face_type = np.dtype([('count', count_type), ('indices', index_type, (corners,))])
+        if offset + count * face_type.itemsize <= len(data):
+            faces = np.frombuffer(data, dtype=face_type, count=count, offset=offset)
+            if all(np.all(faces['count'][start:start + READ_BLOCK_SIZE] == corners) for start in range(0, count, READ_BLOCK_SIZE)):
+                for start in range(0, count if is_face else 0, READ_BLOCK_SIZE):
+                    block = faces['indices'][start:start + READ_BLOCK_SIZE]
+                    yield EMPTY_VERTICES, (np.full(len(block), corners, dtype=np.int32), block.astype(np.int32).ravel())
+                return offset + count * face_type.itemsize
+    # Cas général : faces de tailles différentes ou propriétés supplémentaires
+    polygons = []
+    for _ in range(count):
+        for name, type in properties:
+            if isinstance(type, tuple):
+                count_type, index_type = (np.dtype(byte_order + t) for t in type)
+                corners = int(np.frombuffer(data, dtype=count_type, count=1, offset=offset)[0])
+                offset += count_type.itemsize
+                values = np.frombuffer(data, dtype=index_type, count=corners, offset=offset)
+                offset += corners * index_type.itemsize
+                if is_face and name in ('vertex_indices', 'vertex_index'):
+                    polygons.append(values)
+            else:
+                offset += np.dtype(type).itemsize
+        if len(polygons) >= READ_BLOCK_SIZE:
+            yield EMPTY_VERTICES, polygons_to_loops(polygons)
+            polygons = []
+    if polygons:
+        yield EMPTY_VERTICES, polygons_to_loops(polygons)
+    return offset
+
+
+# Lecture d'un fichier PLY (ASCII ou binaire) : un fichier binaire est projeté en mémoire et lu par blocs
+def read_ply(path):
+    with open(path, 'rb') as file:
+        file_format, elements = read_ply_header(file)
+        if file_format == 'ascii':
+            lines = (line.decode('ascii', errors='replace') for line in file)
+            for name, count, properties in elements:
+                names = [property_name for property_name, _ in properties]
+                for size in block_sizes(count):
+                    rows = [next(lines).split() for _ in range(size)]
+                    if name == 'vertex':
+                        axes = [names.index(axis) for axis in ('x', 'y', 'z')]
+                        yield np.array([[row[axis] for axis in axes] for row in rows], dtype=np.float32).reshape(-1, 3), polygons_to_loops([])
+                    elif name == 'face':
+                        yield EMPTY_VERTICES, polygons_to_loops([[int(value) for value in row[1:1 + int(row[0])]] for row in rows])
+            return
+        offset = file.tell()
+
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    byte_order = '<' if file_format == 'binary_little_endian' else '>'
+    for name, count, properties in elements:
+        if any(isinstance(type, tuple) for _, type in properties):
+            offset = yield from read_ply_binary_faces(data, offset, count, properties, byte_order, name == 'face')
+            continue
+        element_type = np.dtype([(property_name, byte_order + type) for property_name, type in properties])
+        for start in range(0, count if name == 'vertex' else 0, READ_BLOCK_SIZE):
+            values = np.frombuffer(data, dtype=element_type, count=min(READ_BLOCK_SIZE, count - start), offset=offset + start * element_type.itemsize)
+            yield np.stack([values[axis] for axis in ('x', 'y', 'z')], axis=1).astype(np.float32), polygons_to_loops([])
+        offset += count * element_type.itemsize
+
+
+MESH_READERS = {'.obj': read_obj, '.off': read_off, '.ply': read_ply}
+
+
+# Triangulation en éventail d'un bloc de polygones : retourne les triangles et l'indice, dans le bloc, du polygone de chacun
+def triangulate_loops(loop_total, loop_vertices):
+    return fan_triangulate(np.cumsum(loop_total) - loop_total, loop_total, loop_vertices)
+
+
+# Parcourt un maillage par blocs de polygones triangulés : produit des paires (sommets, triangles) sans charger le fichier entier
+def mesh_blocks(path):
+    for vertices, (loop_total, loop_vertices) in MESH_READERS[os.path.splitext(path)[1].lower()](path):
+        yield vertices, triangulate_loops(loop_total, loop_vertices)[0]
+
+
+# Lit un maillage et retourne les tableaux contigus (float32 et int32) envoyés au code C++ sans conversion intermédiaire,
+# l'indice du polygone d'origine de chaque triangle et le nombre de polygones du fichier
+def read_mesh(path, weld_distance=DEFAULT_WELD_DISTANCE):
+    vertices_blocks, faces_blocks, polygons_blocks = [EMPTY_VERTICES], [np.empty((0, 3), dtype=np.int32)], [np.empty(0, dtype=np.int32)]
+    number_of_polygons = 0
+    for vertices, (loop_total, loop_vertices) in MESH_READERS[os.path.splitext(path)[1].lower()](path):
+        faces, triangle_polygons = triangulate_loops(loop_total, loop_vertices)
+        vertices_blocks.append(vertices)
+        faces_blocks.append(faces)
+        polygons_blocks.append(triangle_polygons + number_of_polygons)
+        number_of_polygons += len(loop_total)
+    vertices, faces, kept = weld_vertices(np.concatenate(vertices_blocks), np.concatenate(faces_blocks), weld_distance)
+    return np.ascontiguousarray(vertices, dtype=np.float32), np.ascontiguousarray(faces, dtype=np.int32), np.concatenate(polygons_blocks)[kept], number_of_polygons
+
+
+# Les fonctions d'écriture reçoivent le nombre de sommets et de faces du maillage et ses blocs (paires (sommets, triangles),
+# écrits dans cet ordre) : tous les sommets doivent précéder les triangles, le maillage n'étant jamais chargé en entier
+
+def write_obj(path, number_of_vertices, number_of_faces, blocks):
+    with open(path, 'w', encoding='utf-8') as file:
+        for vertices, faces in blocks:
+            np.savetxt(file, vertices, fmt='v %.9g %.9g %.9g')
+            np.savetxt(file, faces + 1, fmt='f %d %d %d')
+
+
+def write_off(path, number_of_vertices, number_of_faces, blocks):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('OFF\n{} {} 0\n'.format(number_of_vertices, number_of_faces))
+        for vertices, faces in blocks:
+            np.savetxt(file, vertices, fmt='%.9g %.9g %.9g')
+            np.savetxt(file, faces, fmt='3 %d %d %d')
+
+
+# Écriture d'un fichier PLY binaire : les sommets et les faces de chaque bloc sont écrits en un seul bloc chacun
+def write_ply(path, number_of_vertices, number_of_faces, blocks):
+    face_type = np.dtype([('count', 'u1'), ('indices', '<i4', (3,))])
+    with open(path, 'wb') as file:
+        file.write(('ply\nformat binary_little_endian 1.0\n'
+                    'element vertex {}\nproperty float x\nproperty float y\nproperty float z\n'
+                    'element face {}\nproperty list uchar int vertex_indices\nend_header\n').format(number_of_vertices, number_of_faces).encode('ascii'))
+        for vertices, faces in blocks:
+            face_data = np.empty(len(faces), dtype=face_type)
+            face_data['count'] = 3
+            face_data['indices'] = faces
+            file.write(np.ascontiguousarray(vertices, dtype='<f4').tobytes())
+            file.write(face_data.tobytes())
+
+
+MESH_WRITERS = {'.obj': write_obj, '.off': write_off, '.ply': write_ply}
+
+
+# Parcourt les fichiers de maillage d'un dossier (récursivement) ou correspondant à un motif glob, sans les lister tous en mémoire
+# Le dossier des résultats 'excluded_directory' n'est pas parcouru
+def iterate_mesh_files(inputs, excluded_directory=None):
+    excluded_directory = os.path.abspath(excluded_directory) if excluded_directory else None
+    for input in inputs:
+        if os.path.isdir(input):
+            for directory, subdirectories, names in os.walk(input):
+                subdirectories[:] = [name for name in subdirectories if os.path.abspath(os.path.join(directory, name)) != excluded_directory]
+                for name in sorted(names):
+                    if name.lower().endswith(MESH_EXTENSIONS):
+                        yield os.path.join(directory, name)
+        else:
+            for path in glob.iglob(input, recursive=True):
+                if os.path.isfile(path) and path.lower().endswith(MESH_EXTENSIONS):
+                    yield path
+
+
+# Chemin du fichier résultat, le dossier d'origine étant reproduit dans le dossier de sortie
+def output_path(path, output_directory, suffix, extension):
+    name = os.path.splitext(os.path.basename(path))[0]
+    relative_directory = os.path.relpath(os.path.dirname(os.path.abspath(path)))
+    if relative_directory.startswith('..'):
+        relative_directory = ''
+    directory = os.path.join(output_directory, relative_directory)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name + suffix + extension)
+
+
+# Traitement d'un fichier, exécuté dans un processus du pool : retourne une ligne du fichier des durées
+def process_file(path, options):
+    row = {'file': path, 'operation': options['operation'], 'status': 'ok'}
+    start_time = time.perf_counter()
+    try:
+        vertices, faces, triangle_polygons, number_of_polygons = read_mesh(path, options['weld_distance'])
+        row['read_ms'] = (time.perf_counter() - start_time) * 1000.0
+        row['vertices'] = len(vertices)
+        row['faces'] = len(faces)
+
+        if options['operation'] == 'simplify':
+            from mesh_simplification import SurfaceMeshSimplification
+            cgal_mesh = SurfaceMeshSimplification(vertices, faces, options['ratio'])
+            if options['error_samples'] > 0:
+                cgal_mesh.enable_error_metrics(options['error_samples'], 1)
+            cgal_mesh.triangulated_surface_mesh_simplification()
+            result_vertices = cgal_mesh.get_vertices()
+            result_faces = cgal_mesh.get_faces()
+            statistics = cgal_mesh.get_statistics()
+            row['output_faces'] = len(result_faces)
+
+            write_start_time = time.perf_counter()
+            extension = options['format'] or os.path.splitext(path)[1].lower()
+            MESH_WRITERS[extension](output_path(path, options['output'], '_simplified', extension), len(result_vertices), len(result_faces),
+                                    [(result_vertices, result_faces)])
+        else:
+            from surface_mesh_segmentation import SurfaceMeshSegmentation
+            cgal_mesh = SurfaceMeshSegmentation(vertices, faces, options['clusters'], options['smoothness'])
+            cgal_mesh.computeSdfValues(number_of_rays=options['rays'], number_of_threads=options['sdf_threads'])
+            cgal_mesh.resegment(options['clusters'], options['smoothness'])
+            segments_data = cgal_mesh.getSegmentsData()
+            statistics = cgal_mesh.getStatistics()
+            row['output_faces'] = segments_data['number_of_segments']
+
+            # Un identifiant de segment par polygone du fichier d'origine (celui de son premier triangle)
+            write_start_time = time.perf_counter()
+            polygons_segments_ids = polygon_segments_ids(segments_data['segments_ids'], cgal_mesh.getMeshHandle().get_input_faces(),
+                                                         triangle_polygons, number_of_polygons)
+            np.save(output_path(path, options['output'], '_segments', '.npy'), polygons_segments_ids)
+
+        row['write_ms'] = (time.perf_counter() - write_start_time) * 1000.0
+        for name, duration in statistics['timings_ms'].items():
+            row[name + '_ms'] = duration
+        row.update(statistics.get('counts', {}))
+        row.update(statistics.get('error', {}))
+    except Exception as err:
+        row['status'] = 'error'
+        row['error'] = str(err)
+    row['total_ms'] = (time.perf_counter() - start_time) * 1000.0
+    return row
+
+
+# Passe de simplification par blocs du maillage enregistré dans 'directory' (voir chunked_simplification.partition_mesh) :
+# les durées des phases du code C++ sont cumulées dans 'row'. Retourne le nombre de blocs, le nombre de sommets conservés et
+# le maillage recousu (nombre de sommets, nombre de faces et blocs)
+def simplify_chunked_pass(executor, directory, options, bounds, row, shift=0.0, band_vertices=None):
+    partition_start_time = time.perf_counter()
+    chunks, number_of_kept = chunked_simplification.partition_mesh(directory, options['chunks'], bounds, shift, band_vertices)
+    row['partition_ms'] = row.get('partition_ms', 0.0) + (time.perf_counter() - partition_start_time) * 1000.0
+
+    results = chunked_simplification.simplify_chunks(executor, directory, chunks, options['ratio'])
+    for statistics, _, _ in results:
+        for name, duration in statistics['timings_ms'].items():
+            row[name + '_ms'] = row.get(name + '_ms', 0.0) + duration
+    return len(chunks), number_of_kept, chunked_simplification.assemble_chunks(directory, results, number_of_kept)
+
+
+# Simplification par blocs d'un fichier (mode '--chunks') : le fichier est lu par blocs et écrit au fil de sa lecture dans
+# un dossier de travail, ses blocs sont simplifiés en parallèle par les processus du pool, puis le résultat est recousu bloc
+# par bloc pendant son écriture. La mémoire occupée par le processus principal ne dépend pas de la taille du maillage
+def process_file_chunked(path, options, executor):
+    row = {'file': path, 'operation': options['operation'], 'status': 'ok'}
+    start_time = time.perf_counter()
+    directory = tempfile.mkdtemp(prefix='chunks_', dir=options['chunk_directory'])
+    try:
+        source_directory = os.path.join(directory, 'source')
+        vertices, faces = chunked_simplification.save_blocks(source_directory, mesh_blocks(path))
+        row['read_ms'] = (time.perf_counter() - start_time) * 1000.0
+        row['vertices'] = len(vertices)
+        row['faces'] = len(faces)
+        if len(faces) == 0:
+            raise ValueError('Le maillage ne contient aucune face')
+        # La même grille (boîte englobante du maillage d'origine) est utilisée par la passe de nettoyage des coutures
+        bounds = chunked_simplification.mesh_bounds(vertices)
+        del vertices, faces
+
+        row['chunks'], number_of_seam_vertices, result = simplify_chunked_pass(executor, source_directory, options, bounds, row)
+        # Nettoyage des coutures : les sommets de couture, conservés à leur résolution d'origine par les contraintes, sont placés
+        # en tête du maillage recousu. Les faces qui leur sont incidentes sont simplifiées à leur tour selon une grille décalée
+        # d'une demi-cellule, dont les cellules contiennent les coutures de la première passe
+        if options['seam_cleanup'] and number_of_seam_vertices > 0:
+            cleanup_start_time = time.perf_counter()
+            cleanup_directory = os.path.join(directory, 'seams')
+            chunked_simplification.save_blocks(cleanup_directory, result[2])
+            _, _, result = simplify_chunked_pass(executor, cleanup_directory, options, bounds, row, 0.5, number_of_seam_vertices)
+            row['seam_cleanup_ms'] = (time.perf_counter() - cleanup_start_time) * 1000.0
+
+        # Les blocs sont recousus au fil de l'écriture du résultat
+        write_start_time = time.perf_counter()
+        number_of_vertices, number_of_faces, blocks = result
+        row['output_faces'] = number_of_faces
+        extension = options['format'] or os.path.splitext(path)[1].lower()
+        MESH_WRITERS[extension](output_path(path, options['output'], '_simplified', extension), number_of_vertices, number_of_faces, blocks)
+        row['write_ms'] = (time.perf_counter() - write_start_time) * 1000.0
+    except Exception as err:
+        row['status'] = 'error'
+        row['error'] = str(err)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    row['total_ms'] = (time.perf_counter() - start_time) * 1000.0
+    return row
+
+
+# Ajoute au 'sys.path' des processus du pool les dossiers contenant les modules compilés
+def initialize_worker(module_paths):
+    for module_path in module_paths:
+        if module_path not in sys.path:
+            sys.path.insert(0, module_path)
+
+
+# Colonnes du fichier des durées : lecture et écriture des fichiers, phases du code C++ et durée totale par fichier
+# ('output_faces' contient le nombre de faces du maillage simplifié ou le nombre de segments ; 'chunks', 'partition_ms' et
+# 'seam_cleanup_ms' ne concernent que la simplification par blocs, dont les durées des phases C++ sont cumulées sur les blocs
+# et dont l'assemblage des blocs est compté dans 'write_ms' ;
+# 'hausdorff' et 'rms' contiennent l'erreur géométrique mesurée avec l'option '--error-samples' ; 'removed_edges' et 'proxy_faces'
+# sont les nombres d'arêtes contractées par la simplification et de faces du proxy de la segmentation)
+TIMINGS_COLUMNS = ['file', 'operation', 'status', 'vertices', 'faces', 'output_faces', 'removed_edges', 'proxy_faces', 'chunks', 'read_ms',
+                   'partition_ms', 'conversion_ms', 'mesh_build_ms', 'is_triangle_mesh_ms', 'sdf_ms', 'segmentation_ms', 'algorithm_ms', 'remap_ms', 'error_ms', 'export_ms', 'seam_cleanup_ms',
+                   'write_ms', 'total_ms', 'hausdorff', 'rms', 'error']
+
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(description='Simplification ou segmentation d\'un ensemble de maillages (OBJ, OFF, PLY) sans Blender')
+    parser.add_argument('operation', choices=('simplify', 'segment'), help='traitement à appliquer')
+    parser.add_argument('inputs', nargs='+', help='dossiers (parcourus récursivement) ou motifs glob des fichiers à traiter')
+    parser.add_argument('-o', '--output', default='output', help='dossier des résultats (défaut : output)')
+    parser.add_argument('-j', '--workers', type=int, default=0, help='nombre de processus (0 : autant que de coeurs disponibles)')
+    parser.add_argument('--timings', default=None, help='fichier CSV des durées par fichier (défaut : <output>/timings.csv)')
+    parser.add_argument('--module-path', action='append', default=[], help='dossier contenant les modules Python compilés (répétable)')
+    parser.add_argument('--weld-distance', type=float, default=DEFAULT_WELD_DISTANCE, help='distance de fusion des sommets superposés (0 : pas de fusion)')
+    # simplification
+    parser.add_argument('--ratio', type=float, default=0.5, help='facteur de décimation (proportion d\'arêtes conservées)')
+    parser.add_argument('--format', choices=MESH_WRITERS.keys(), default=None, help='format des maillages simplifiés (défaut : celui du fichier d\'origine)')
+    parser.add_argument('--error-samples', type=int, default=0, help='mesure de l\'erreur géométrique sur ce nombre d\'échantillons (0 : pas de mesure)')
+    parser.add_argument('--chunks', type=int, default=0, help='simplification par blocs : nombre de cellules de la grille par axe (0 : maillage entier)')
+    parser.add_argument('--seam-cleanup', action='store_true', help='simplifie également les faces des coutures entre blocs une fois le maillage recousu')
+    parser.add_argument('--chunk-directory', default=None, help='dossier des fichiers de travail de la simplification par blocs (défaut : dossier temporaire)')
+    # segmentation
+    parser.add_argument('--clusters', type=int, default=4, help='nombre de clusters de la segmentation')
+    parser.add_argument('--smoothness', type=float, default=0.5, help='finesse de la segmentation')
+    parser.add_argument('--rays', type=int, default=25, help='nombre de rayons lancés par face pour le calcul des valeurs SDF')
+    parser.add_argument('--sdf-threads', type=int, default=1, help='threads du calcul SDF dans chaque processus (1 : séquentiel)')
+    arguments = parser.parse_args(arguments)
+    if arguments.chunks and arguments.operation != 'simplify':
+        parser.error('l\'option --chunks ne concerne que la simplification')
+    # La fusion des sommets porte sur le maillage entier, qui n'est jamais chargé par la simplification par blocs
+    if arguments.chunks and arguments.weld_distance > 0:
+        parser.error('l\'option --weld-distance n\'est pas disponible avec l\'option --chunks')
+    return arguments
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    options = {
+        'operation': arguments.operation,
+        'output': arguments.output,
+        'weld_distance': arguments.weld_distance,
+        'ratio': arguments.ratio,
+        'format': arguments.format,
+        'error_samples': arguments.error_samples,
+        'chunks': arguments.chunks,
+        'seam_cleanup': arguments.seam_cleanup,
+        'chunk_directory': arguments.chunk_directory,
+        'clusters': arguments.clusters,
+        'smoothness': arguments.smoothness,
+        'rays': arguments.rays,
+        'sdf_threads': arguments.sdf_threads,
+    }
+    os.makedirs(arguments.output, exist_ok=True)
+    timings_path = arguments.timings or os.path.join(arguments.output, 'timings.csv')
+    module_paths = [os.path.abspath(module_path) for module_path in arguments.module_path]
+    workers = arguments.workers if arguments.workers > 0 else os.cpu_count()
+
+    processed = 0
+    failed = 0
+    start_time = time.perf_counter()
+    with open(timings_path, 'w', newline='', encoding='utf-8') as timings_file, \
+            ProcessPoolExecutor(max_workers=workers, initializer=initialize_worker, initargs=(module_paths,)) as executor:
+        writer = csv.DictWriter(timings_file, fieldnames=TIMINGS_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        # Simplification par blocs : les fichiers sont traités l'un après l'autre, leurs blocs étant répartis sur le pool
+        if arguments.chunks:
+            for path in iterate_mesh_files(arguments.inputs, arguments.output):
+                row = process_file_chunked(path, options, executor)
+                writer.writerow(row)
+                processed += 1
+                failed += row['status'] != 'ok'
+        # Le nombre de fichiers en cours de traitement est borné : les fichiers sont lus au fil de l'eau
+        pending = set()
+        for path in iterate_mesh_files(arguments.inputs, arguments.output) if not arguments.chunks else ():
+            pending.add(executor.submit(process_file, path, options))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = future.result()
+                    writer.writerow(row)
+                    processed += 1
+                    failed += row['status'] != 'ok'
+        for future in wait(pending).done:
+            row = future.result()
+            writer.writerow(row)
+            processed += 1
+            failed += row['status'] != 'ok'
+
+    print('{} fichiers traités ({} échecs) en {:.1f} s, durées dans {}'.format(processed, failed, time.perf_counter() - start_time, timings_path))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
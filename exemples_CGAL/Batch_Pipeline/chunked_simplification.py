@@ -0,0 +1,214 @@
+# Simplification par blocs des maillages trop volumineux pour être simplifiés, voire chargés, en une seule fois
+# Le maillage est écrit bloc par bloc, au fil de sa lecture, dans des fichiers lus par projection en mémoire (memmap), puis
+# découpé selon une grille de cellules : chaque bloc (faces dont le centre appartient à une même cellule) est lu depuis ces
+# fichiers et simplifié indépendamment, les sommets partagés avec les autres blocs étant verrouillés. Le code C++ retourne
+# l'indice d'origine des sommets verrouillés : les blocs simplifiés sont recousus par ces indices, bloc par bloc, pendant
+# l'écriture du résultat
+#
+# La mémoire occupée par le maillage CGAL et par les tableaux numpy est bornée par la taille d'un bloc : les tableaux
+# indexés par les sommets ou les faces du maillage entier sont des fichiers projetés en mémoire, parcourus par blocs
+
+import os
+
+import numpy as np
+
+# Nombre de faces ou de sommets traités à la fois lors des parcours des fichiers projetés en mémoire
+BLOCK_SIZE = 1 << 20
+
+EMPTY_VERTICES = np.empty((0, 3), dtype=np.float32)
+EMPTY_FACES = np.empty((0, 3), dtype=np.int32)
+
+
+# Tableau (N, 3) projeté en mémoire depuis un fichier brut (sans en-tête), vide si le fichier l'est
+def load_buffer(path, dtype):
+    if os.path.getsize(path) == 0:
+        return np.empty((0, 3), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r').reshape(-1, 3)
+
+
+# Sommets (float32) et triangles (int32) du maillage enregistré dans 'directory', projetés en mémoire
+def load_buffers(directory):
+    return (load_buffer(os.path.join(directory, 'vertices.bin'), np.float32),
+            load_buffer(os.path.join(directory, 'faces.bin'), np.int32))
+
+
+# Enregistre un maillage bloc par bloc dans le dossier de travail, puis le rouvre en projection mémoire
+# 'blocks' fournit des paires (sommets, triangles), les indices des triangles étant ceux du maillage entier : les nombres de
+# sommets et de faces n'ont pas à être connus à l'avance (les fichiers bruts sont complétés à chaque bloc)
+def save_blocks(directory, blocks):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'vertices.bin'), 'wb') as vertices_file, open(os.path.join(directory, 'faces.bin'), 'wb') as faces_file:
+        for vertices, faces in blocks:
+            np.ascontiguousarray(vertices, dtype=np.float32).tofile(vertices_file)
+            np.ascontiguousarray(faces, dtype=np.int32).tofile(faces_file)
+    return load_buffers(directory)
+
+
+# Boîte englobante des sommets (coin minimal, taille), calculée par blocs
+def mesh_bounds(vertices):
+    minimum = np.full(3, np.inf)
+    maximum = np.full(3, -np.inf)
+    for start in range(0, len(vertices), BLOCK_SIZE):
+        block = np.asarray(vertices[start:start + BLOCK_SIZE], dtype=np.float64)
+        minimum = np.minimum(minimum, block.min(axis=0))
+        maximum = np.maximum(maximum, block.max(axis=0))
+    return minimum, np.maximum(maximum - minimum, np.finfo(np.float32).tiny)
+
+
+# Cellule de la grille contenant le centre de chaque face de 'faces' (bloc de faces) : la grille compte 'cells_per_axis'
+# cellules par axe sur la boîte englobante 'bounds', décalées de 'shift' cellule (une cellule de plus par axe si 'shift' est
+# non nul, afin de couvrir toute la boîte)
+def face_cells(vertices, faces, bounds, cells_per_axis, shift=0.0):
+    minimum, size = bounds
+    axis_cells = cells_per_axis + 1 if shift else cells_per_axis
+    centers = np.asarray(vertices[faces.ravel()], dtype=np.float64).reshape(-1, 3, 3).mean(axis=1)
+    coordinates = np.clip(np.floor((centers - minimum) / size * cells_per_axis + shift).astype(np.int64), 0, axis_cells - 1)
+    return ((coordinates[:, 0] * axis_cells + coordinates[:, 1]) * axis_cells + coordinates[:, 2]).astype(np.int32)
+
+
+# Découpe le maillage enregistré dans 'directory' en blocs selon la grille décrite par face_cells : la cellule de chaque face
+# est écrite dans 'cells.npy' (-1 pour une face qui n'appartient à aucun bloc) et les faces des blocs sont rangées par cellule,
+# puis par indice, dans 'order.npy' (tri par dénombrement effectué par blocs de faces)
+# Si 'band_vertices' est fourni, seules les faces incidentes à l'un des 'band_vertices' premiers sommets sont découpées en
+# blocs, les autres faces étant conservées telles quelles
+# Les sommets des blocs partagés avec une autre cellule ou avec une face conservée sont verrouillés ('locked.npy'). Les sommets
+# verrouillés et ceux des faces conservées sont les sommets conservés du résultat ('kept_index.npy' : indice de chaque sommet
+# dans le résultat, -1 s'il n'est pas conservé), placés en tête du résultat dans leur ordre d'origine
+# Retourne la liste des blocs non vides (première position dans 'order.npy', nombre de faces) et le nombre de sommets conservés
+def partition_mesh(directory, cells_per_axis, bounds, shift=0.0, band_vertices=None):
+    vertices, faces = load_buffers(directory)
+    axis_cells = cells_per_axis + 1 if shift else cells_per_axis
+    number_of_cells = axis_cells ** 3
+
+    cells = np.lib.format.open_memmap(os.path.join(directory, 'cells.npy'), mode='w+', dtype=np.int32, shape=(len(faces),))
+    counts = np.zeros(number_of_cells, dtype=np.int64)
+    for start in range(0, len(faces), BLOCK_SIZE):
+        block = np.asarray(faces[start:start + BLOCK_SIZE])
+        block_cells = face_cells(vertices, block, bounds, cells_per_axis, shift)
+        if band_vertices is not None:
+            block_cells[~(block < band_vertices).any(axis=1)] = -1
+        cells[start:start + len(block)] = block_cells
+        counts += np.bincount(block_cells[block_cells >= 0], minlength=number_of_cells)
+
+    # Tri par dénombrement : chaque bloc de faces est réparti entre les cellules à la suite des blocs précédents
+    starts = np.cumsum(counts) - counts
+    cursors = starts.copy()
+    order = np.lib.format.open_memmap(os.path.join(directory, 'order.npy'), mode='w+', dtype=np.int32, shape=(int(counts.sum()),))
+    for start in range(0, len(faces), BLOCK_SIZE):
+        block_cells = np.asarray(cells[start:start + BLOCK_SIZE])
+        chunk_faces = np.flatnonzero(block_cells >= 0)
+        chunk_faces = chunk_faces[np.argsort(block_cells[chunk_faces], kind='stable')]
+        chunk_cells = block_cells[chunk_faces]
+        block_counts = np.bincount(chunk_cells, minlength=number_of_cells)
+        ranks = np.arange(len(chunk_faces)) - (np.cumsum(block_counts) - block_counts)[chunk_cells]
+        order[cursors[chunk_cells] + ranks] = start + chunk_faces
+        cursors += block_counts
+
+    # Plus petite et plus grande cellule des faces incidentes à chaque sommet (-1 pour une face conservée, -2 pour un sommet
+    # inutilisé) : elles diffèrent pour les sommets partagés entre plusieurs cellules ou avec une face conservée
+    lowest_cells = np.lib.format.open_memmap(os.path.join(directory, 'lowest_cells.npy'), mode='w+', dtype=np.int32, shape=(len(vertices),))
+    highest_cells = np.lib.format.open_memmap(os.path.join(directory, 'highest_cells.npy'), mode='w+', dtype=np.int32, shape=(len(vertices),))
+    lowest_cells[:] = np.iinfo(np.int32).max
+    highest_cells[:] = -2
+    for start in range(0, len(faces), BLOCK_SIZE):
+        corners = np.asarray(faces[start:start + BLOCK_SIZE]).ravel()
+        corner_cells = np.repeat(np.asarray(cells[start:start + BLOCK_SIZE]), 3)
+        np.minimum.at(lowest_cells, corners, corner_cells)
+        np.maximum.at(highest_cells, corners, corner_cells)
+
+    locked = np.lib.format.open_memmap(os.path.join(directory, 'locked.npy'), mode='w+', dtype=bool, shape=(len(vertices),))
+    kept_index = np.lib.format.open_memmap(os.path.join(directory, 'kept_index.npy'), mode='w+', dtype=np.int32, shape=(len(vertices),))
+    number_of_kept = 0
+    for start in range(0, len(vertices), BLOCK_SIZE):
+        lowest = np.asarray(lowest_cells[start:start + BLOCK_SIZE])
+        highest = np.asarray(highest_cells[start:start + BLOCK_SIZE])
+        block_locked = (highest >= -1) & (lowest != highest)
+        block_kept = block_locked | (lowest == -1)
+        locked[start:start + len(lowest)] = block_locked
+        kept_index[start:start + len(lowest)] = np.where(block_kept, number_of_kept + np.cumsum(block_kept) - 1, -1)
+        number_of_kept += int(block_kept.sum())
+    del lowest_cells, highest_cells
+    os.remove(os.path.join(directory, 'lowest_cells.npy'))
+    os.remove(os.path.join(directory, 'highest_cells.npy'))
+
+    return [(int(start), int(count)) for start, count in zip(starts, counts) if count > 0], number_of_kept
+
+
+# Simplifie un maillage dont les sommets 'locked_vertices' sont verrouillés
+# Retourne également l'indice, dans 'vertices', du sommet verrouillé représenté par chaque sommet du résultat (-1 sinon)
+def simplify_constrained(vertices, faces, ratio, locked_vertices):
+    from mesh_simplification import SurfaceMeshSimplification
+    cgal_mesh = SurfaceMeshSimplification(vertices, faces, ratio)
+    cgal_mesh.set_constrained_vertices(np.ascontiguousarray(locked_vertices, dtype=np.int32))
+    cgal_mesh.triangulated_surface_mesh_simplification()
+    return cgal_mesh.get_vertices(), cgal_mesh.get_faces(), cgal_mesh.get_original_vertex_indices(), cgal_mesh.get_statistics()
+
+
+# Simplification d'un bloc, exécutée dans un processus du pool : seules les faces du bloc et leurs sommets sont lus depuis les
+# fichiers projetés en mémoire. Le résultat est écrit dans le dossier de travail avec l'indice d'origine de ses sommets
+# verrouillés ('original_indices', -1 pour un sommet créé par la simplification)
+# Retourne les statistiques du code C++, le nombre de sommets créés et le nombre de faces du bloc simplifié
+def simplify_chunk(directory, index, start, count, ratio):
+    vertices, faces = load_buffers(directory)
+    order = np.load(os.path.join(directory, 'order.npy'), mmap_mode='r')
+    locked = np.load(os.path.join(directory, 'locked.npy'), mmap_mode='r')
+
+    # Les faces d'une cellule sont rangées par indice : elles sont lues dans l'ordre du fichier (accès séquentiels)
+    chunk_faces = faces[np.asarray(order[start:start + count])]
+    used_vertices, local_faces = np.unique(chunk_faces, return_inverse=True)
+    chunk_vertices = np.ascontiguousarray(vertices[used_vertices])
+    local_faces = np.ascontiguousarray(local_faces.reshape(-1, 3), dtype=np.int32)
+    locked_vertices = np.flatnonzero(locked[used_vertices])
+
+    result_vertices, result_faces, original_indices, statistics = simplify_constrained(chunk_vertices, local_faces, ratio, locked_vertices)
+    original_indices = np.where(original_indices >= 0, used_vertices[np.maximum(original_indices, 0)], -1)
+    np.savez(os.path.join(directory, 'chunk_{}.npz'.format(index)), vertices=result_vertices, faces=result_faces, original_indices=original_indices)
+    return statistics, int((original_indices < 0).sum()), len(result_faces)
+
+
+# Simplifie les blocs sur les processus de 'executor' : retourne, pour chaque bloc, le résultat de simplify_chunk
+def simplify_chunks(executor, directory, chunks, ratio):
+    futures = [executor.submit(simplify_chunk, directory, index, start, count, ratio) for index, (start, count) in enumerate(chunks)]
+    return [future.result() for future in futures]
+
+
+# Recoud les blocs simplifiés sans charger le maillage entier : les sommets conservés (voir partition_mesh) sont suivis des
+# sommets créés par chaque bloc, les faces conservées des faces de chaque bloc, dont les sommets verrouillés sont désignés
+# par leur indice d'origine
+# Retourne le nombre de sommets et de faces du résultat et ses blocs (paires (sommets, triangles)), produits à la demande :
+# tous les sommets précèdent les triangles
+def assemble_chunks(directory, results, number_of_kept):
+    number_of_vertices = number_of_kept + sum(new_vertices for _, new_vertices, _ in results)
+    cells = np.load(os.path.join(directory, 'cells.npy'), mmap_mode='r')
+    number_of_faces = sum(chunk_faces for _, _, chunk_faces in results)
+    for start in range(0, len(cells), BLOCK_SIZE):
+        number_of_faces += int((np.asarray(cells[start:start + BLOCK_SIZE]) < 0).sum())
+    return number_of_vertices, number_of_faces, assembled_blocks(directory, len(results), number_of_kept)
+
+
+# Blocs du maillage recousu, lus un à un depuis le dossier de travail (voir assemble_chunks)
+def assembled_blocks(directory, number_of_chunks, number_of_kept):
+    vertices, faces = load_buffers(directory)
+    cells = np.load(os.path.join(directory, 'cells.npy'), mmap_mode='r')
+    kept_index = np.load(os.path.join(directory, 'kept_index.npy'), mmap_mode='r')
+
+    for start in range(0, len(vertices), BLOCK_SIZE):
+        yield np.asarray(vertices[start:start + BLOCK_SIZE])[np.asarray(kept_index[start:start + BLOCK_SIZE]) >= 0], EMPTY_FACES
+    for index in range(number_of_chunks):
+        with np.load(os.path.join(directory, 'chunk_{}.npz'.format(index))) as chunk:
+            yield chunk['vertices'][chunk['original_indices'] < 0], EMPTY_FACES
+
+    for start in range(0, len(faces), BLOCK_SIZE):
+        block = np.asarray(faces[start:start + BLOCK_SIZE])[np.asarray(cells[start:start + BLOCK_SIZE]) < 0]
+        if len(block) > 0:
+            yield EMPTY_VERTICES, np.asarray(kept_index[block.ravel()]).reshape(-1, 3)
+    offset = number_of_kept
+    for index in range(number_of_chunks):
+        with np.load(os.path.join(directory, 'chunk_{}.npz'.format(index))) as chunk:
+            original_indices = chunk['original_indices']
+            created = original_indices < 0
+            vertex_map = np.empty(len(original_indices), dtype=np.int32)
+            vertex_map[created] = offset + np.arange(int(created.sum()))
+            vertex_map[~created] = kept_index[original_indices[~created]]
+            offset += int(created.sum())
+            yield EMPTY_VERTICES, vertex_map[chunk['faces']]
@@ -0,0 +1,210 @@
+# Mesures de performance des modules de simplification et de segmentation sur des maillages synthétiques
+# Chaque cas (maillage, taille, traitement) est exécuté dans un processus dédié à travers le code des extensions, importé avec
+# des modules 'bpy' et 'bmesh' factices : les durées des étapes Python (extraction, application du résultat) et des phases
+# du code C++ sont enregistrées avec le débit (faces par seconde) et le pic de mémoire résidente dans un fichier JSON
+#
+# Exemples :
+#   python benchmark.py --module-path ../build --output resultats.json
+#   python benchmark.py --sizes 10000 100000 --baseline reference.json --tolerance 0.15
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+BENCHMARKS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+# Dossiers des extensions, importées comme de simples modules Python, et des modules qu'elles partagent
+ADDONS_DIRECTORIES = [os.path.join(BENCHMARKS_DIRECTORY, '..', 'Triangulated_Surface_Mesh_Simplification'),
+                      os.path.join(BENCHMARKS_DIRECTORY, '..', 'Triangulated_Surface_Mesh_Segmentation'),
+                      os.path.join(BENCHMARKS_DIRECTORY, '..', 'Common')]
+
+DEFAULT_SIZES = [10000, 100000, 1000000, 5000000]
+# Au-delà de ce nombre de faces, le lancer de rayons du calcul des valeurs SDF rend la mesure trop longue
+DEFAULT_MAX_SEGMENTATION_FACES = 1000000
+
+
+# Pic de mémoire résidente du processus courant, en mégaoctets (None si la plateforme ne le fournit pas)
+def peak_rss_megabytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est exprimé en kilooctets sous Linux et en octets sous macOS
+    return peak_rss / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak_rss / 1024.0
+
+
+# Prépare l'import des extensions dans le processus courant
+def import_addons(module_paths):
+    for path in module_paths + ADDONS_DIRECTORIES:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    import fake_bpy
+    fake_bpy.install()
+
+
+def run_simplification(object, context, addon, timings):
+    with addon.PhaseTimer(timings, 'extraction'):
+        vertices, faces, _ = addon.extract_mesh_buffers(object)
+    simplified_mesh_vertices, simplified_mesh_faces, _, statistics = addon.simplify_buffers(vertices, faces, context.scene.simplification_properties.decimation_factor)
+    with addon.PhaseTimer(timings, 'application'):
+        addon.apply_simplified_mesh(context, object, simplified_mesh_vertices, simplified_mesh_faces)
+    return statistics, len(simplified_mesh_faces) // 3
+
+
+def run_segmentation(object, context, addon, timings):
+    job = addon.prepare_segmentation(context, object, timings=timings)
+    segments_ids, nb_segments = addon.run_segmentation(job)
+    with addon.PhaseTimer(timings, 'application'):
+        addon.display_segments(context, object.data, segments_ids, nb_segments)
+    return addon.job_statistics(job), nb_segments
+
+
+# Exécute un cas de mesure dans le processus courant (processus dédié) et retourne son résultat
+def run_case(case, module_paths):
+    import_addons(module_paths)
+    import fake_bpy
+    import synthetic_meshes
+
+    generation_start_time = time.perf_counter()
+    vertices, faces = synthetic_meshes.GENERATORS[case['mesh']](case['target_faces'])
+    object = fake_bpy.FakeObject(case['mesh'], fake_bpy.mesh_from_buffers(case['mesh'], vertices, faces))
+    generation_time = (time.perf_counter() - generation_start_time) * 1000.0
+    rss_before = peak_rss_megabytes()
+
+    timings = {}
+    start_time = time.perf_counter()
+    if case['operation'] == 'simplify':
+        import triangulated_surface_mesh_simplification as addon
+        properties = fake_bpy.default_properties(addon.SimplificationProperties, decimation_factor=case['ratio'])
+        context = fake_bpy.fake_context(object, simplification_properties=properties)
+        statistics, output_size = run_simplification(object, context, addon, timings)
+    else:
+        import mesh_segmentation as addon
+        properties = fake_bpy.default_properties(addon.SegmentationProperties, display_mode='ATTRIBUTE')
+        context = fake_bpy.fake_context(object, segmentation_properties=properties)
+        statistics, output_size = run_segmentation(object, context, addon, timings)
+    total_time = (time.perf_counter() - start_time) * 1000.0
+
+    algorithm_time = statistics['timings_ms'].get('algorithm', 0.0)
+    return {
+        'mesh': case['mesh'],
+        'operation': case['operation'],
+        'target_faces': case['target_faces'],
+        'faces': len(faces),
+        'vertices': len(vertices),
+        # nombre de faces du maillage simplifié ou nombre de segments
+        'output_size': int(output_size),
+        'generation_ms': generation_time,
+        'total_ms': total_time,
+        'python_timings_ms': dict(timings),
+        'timings_ms': dict(statistics['timings_ms']),
+        'sizes': dict(statistics['sizes']),
+        'counts': dict(statistics.get('counts', {})),
+        'faces_per_second': len(faces) / (total_time / 1000.0) if total_time > 0 else None,
+        'algorithm_faces_per_second': len(faces) / (algorithm_time / 1000.0) if algorithm_time > 0 else None,
+        'rss_before_mb': rss_before,
+        'peak_rss_mb': peak_rss_megabytes(),
+    }
+
+
+# Exécute un cas dans un nouveau processus : le pic de mémoire mesuré est propre au cas
+def run_case_in_subprocess(case, module_paths):
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(run_case, (case, module_paths))
+
+
+# Versions des modules compilés, enregistrées avec les résultats
+def module_versions(module_paths):
+    import_addons(module_paths)
+    versions = {}
+    for name in ('mesh_simplification', 'surface_mesh_segmentation'):
+        try:
+            versions[name] = getattr(__import__(name), '__version__', 'inconnue')
+        except ImportError:
+            versions[name] = None
+    return versions
+
+
+# Compare les résultats à ceux d'une référence : retourne la liste des cas dont la durée totale dépasse celle de la référence
+# de plus de 'tolerance' (proportion)
+def compare_with_baseline(results, baseline, tolerance):
+    reference_cases = {(case['mesh'], case['operation'], case['target_faces']): case for case in baseline['cases']}
+    regressions = []
+    print('{:<10} {:<9} {:>9} {:>12} {:>12} {:>8}'.format('maillage', 'traitement', 'faces', 'référence', 'mesure', 'ratio'))
+    for case in results['cases']:
+        reference = reference_cases.get((case['mesh'], case['operation'], case['target_faces']))
+        if reference is None:
+            continue
+        ratio = case['total_ms'] / reference['total_ms'] if reference['total_ms'] > 0 else float('inf')
+        print('{:<10} {:<9} {:>9} {:>10.1f}ms {:>10.1f}ms {:>8.2f}'.format(case['mesh'], case['operation'], case['faces'], reference['total_ms'], case['total_ms'], ratio))
+        if ratio > 1.0 + tolerance:
+            regressions.append(case)
+    return regressions
+
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(description='Mesures de performance de la simplification et de la segmentation sur des maillages synthétiques')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='nombres de faces visés')
+    parser.add_argument('--meshes', nargs='+', default=['icosphere', 'torus', 'assembly'], choices=['icosphere', 'torus', 'assembly'], help='maillages synthétiques')
+    parser.add_argument('--operations', nargs='+', default=['simplify', 'segment'], choices=['simplify', 'segment'], help='traitements mesurés')
+    parser.add_argument('--ratio', type=float, default=0.25, help='facteur de décimation de la simplification')
+    parser.add_argument('--max-segmentation-faces', type=int, default=DEFAULT_MAX_SEGMENTATION_FACES, help='nombre de faces au-delà duquel la segmentation n\'est pas mesurée')
+    parser.add_argument('--repeat', type=int, default=1, help='nombre d\'exécutions de chaque cas (la plus rapide est conservée)')
+    parser.add_argument('--module-path', action='append', default=[], help='dossier contenant les modules Python compilés (répétable)')
+    parser.add_argument('--output', default='benchmark_results.json', help='fichier JSON des résultats')
+    parser.add_argument('--baseline', default=None, help='fichier JSON de référence auquel comparer les résultats')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='ralentissement toléré par rapport à la référence (0.1 : 10 %%)')
+    return parser.parse_args(arguments)
+
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+    module_paths = [os.path.abspath(path) for path in arguments.module_path]
+
+    results = {
+        'environment': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'modules': module_versions(module_paths),
+        },
+        'cases': [],
+    }
+    for operation in arguments.operations:
+        for mesh in arguments.meshes:
+            for size in arguments.sizes:
+                if operation == 'segment' and size > arguments.max_segmentation_faces:
+                    continue
+                case = {'mesh': mesh, 'operation': operation, 'target_faces': size, 'ratio': arguments.ratio}
+                runs = [run_case_in_subprocess(case, module_paths) for _ in range(max(1, arguments.repeat))]
+                result = min(runs, key=lambda run: run['total_ms'])
+                results['cases'].append(result)
+                print('{:<10} {:<9} {:>9} faces : {:>10.1f} ms, {:>12.0f} faces/s, pic mémoire {} Mo'.format(
+                    mesh, operation, result['faces'], result['total_ms'], result['faces_per_second'] or 0.0,
+                    '{:.0f}'.format(result['peak_rss_mb']) if result['peak_rss_mb'] is not None else '?'))
+
+    with open(arguments.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    print('Résultats écrits dans {}'.format(arguments.output))
+
+    if arguments.baseline:
+        with open(arguments.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare_with_baseline(results, baseline, arguments.tolerance)
+        if regressions:
+            print('{} cas plus lents que la référence de plus de {:.0%}'.format(len(regressions), arguments.tolerance))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# Modules 'bpy' et 'bmesh' minimaux permettant d'importer et d'exécuter le code des extensions sans Blender
+# Seules les parties utilisées par les mesures de performance sont reproduites : collections de données des maillages
+# (foreach_get / foreach_set sur des tableaux numpy), attributs, matériaux, objets et enregistrement des classes
+
+import sys
+import types
+
+import numpy as np
+
+
+# Collection d'éléments d'un maillage (sommets, coins, polygones) : chaque propriété est stockée dans un tableau numpy
+class FakeCollection:
+    def __init__(self, properties):
+        # properties : {nom : (type numpy, nombre de composantes)}
+        self.properties = properties
+        self.count = 0
+        self.values = {name: np.zeros((0, width), dtype=dtype) for name, (dtype, width) in properties.items()}
+
+    def __len__(self):
+        return self.count
+
+    def add(self, count):
+        self.count += count
+        for name, (dtype, width) in self.properties.items():
+            values = np.zeros((self.count, width), dtype=dtype)
+            values[:len(self.values[name])] = self.values[name]
+            self.values[name] = values
+
+    def clear(self):
+        self.count = 0
+        self.values = {name: np.zeros((0, width), dtype=dtype) for name, (dtype, width) in self.properties.items()}
+
+    def foreach_get(self, name, buffer):
+        buffer[...] = self.values[name].reshape(buffer.shape)
+
+    def foreach_set(self, name, buffer):
+        dtype, width = self.properties[name]
+        self.values[name] = np.array(buffer, dtype=dtype).reshape(self.count, width)
+
+
+class FakeAttribute:
+    def __init__(self, name, data_type, domain, count):
+        self.name = name
+        self.data_type = data_type
+        self.domain = domain
+        self.data = FakeCollection({'color': (np.float32, 4), 'value': (np.float32, 1)})
+        self.data.add(count)
+
+
+class FakeAttributes(dict):
+    def __init__(self, mesh):
+        super().__init__()
+        self.mesh = mesh
+
+    def new(self, name, type, domain):
+        count = len(self.mesh.polygons) if domain == 'FACE' else len(self.mesh.vertices)
+        self[name] = FakeAttribute(name, type, domain, count)
+        return self[name]
+
+    def remove(self, attribute):
+        del self[attribute.name]
+
+
+class FakeMaterials(list):
+    def find(self, name):
+        for index, material in enumerate(self):
+            if material.name == name:
+                return index
+        return -1
+
+
+class FakeMesh:
+    def __init__(self, name):
+        self.name = name
+        self.vertices = FakeCollection({'co': (np.float32, 3)})
+        self.loops = FakeCollection({'vertex_index': (np.int32, 1)})
+        self.polygons = FakeCollection({'loop_start': (np.int32, 1), 'loop_total': (np.int32, 1),
+                                        'material_index': (np.int32, 1), 'use_smooth': (np.bool_, 1)})
+        self.attributes = FakeAttributes(self)
+        self.materials = FakeMaterials()
+
+    def clear_geometry(self):
+        self.vertices.clear()
+        self.loops.clear()
+        self.polygons.clear()
+        self.attributes.clear()
+
+    def update(self):
+        pass
+
+    def validate(self):
+        return False
+
+
+# Crée un maillage à partir de tableaux de sommets (N, 3) et de faces triangulaires (M, 3)
+def mesh_from_buffers(name, vertices, faces):
+    mesh = FakeMesh(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set('co', vertices.ravel())
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set('vertex_index', faces.ravel())
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set('loop_start', np.arange(0, faces.size, 3, dtype=np.int32))
+    mesh.polygons.foreach_set('loop_total', np.full(len(faces), 3, dtype=np.int32))
+    return mesh
+
+
+class FakeObject:
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+        self.type = 'MESH'
+        self.mode = 'OBJECT'
+        self.users_collection = []
+        self.matrix_world = np.identity(4)
+
+    def update_from_editmode(self):
+        pass
+
+    def select_set(self, state):
+        pass
+
+
+class FakeMaterial:
+    def __init__(self, name):
+        self.name = name
+        self.diffuse_color = (1.0, 1.0, 1.0, 1.0)
+
+
+class FakeDataCollection(dict):
+    def __init__(self, factory):
+        super().__init__()
+        self.factory = factory
+
+    def new(self, name, *args):
+        self[name] = self.factory(name, *args)
+        return self[name]
+
+    def remove(self, item):
+        self.pop(item.name, None)
+
+
+# Propriété Blender : la valeur par défaut est conservée pour construire les propriétés de la scène
+def fake_property(**parameters):
+    return parameters
+
+
+# Retourne une instance d'un PropertyGroup des extensions dont les propriétés valent leur valeur par défaut
+def default_properties(property_group, **overrides):
+    values = {name: annotation.get('default') for name, annotation in property_group.__annotations__.items()}
+    values.update(overrides)
+    return types.SimpleNamespace(**values)
+
+
+# Contexte d'exécution des fonctions des extensions : scène portant les propriétés et objet actif
+def fake_context(active_object=None, **scene_properties):
+    return types.SimpleNamespace(mode='OBJECT', active_object=active_object, selected_objects=[active_object] if active_object else [],
+                                 scene=types.SimpleNamespace(**scene_properties), workspace=None, window_manager=None)
+
+
+# Installe les modules 'bpy' et 'bmesh' factices dans sys.modules (avant l'import des extensions)
+def install():
+    bpy = types.ModuleType('bpy')
+    bpy.types = types.SimpleNamespace(Operator=object, Panel=object, PropertyGroup=object, Scene=types.SimpleNamespace())
+    bpy.props = types.SimpleNamespace(**{name: fake_property for name in ('BoolProperty', 'IntProperty', 'FloatProperty', 'EnumProperty',
+                                                                          'StringProperty', 'PointerProperty')})
+    bpy.data = types.SimpleNamespace(meshes=FakeDataCollection(FakeMesh), objects=FakeDataCollection(FakeObject),
+                                     materials=FakeDataCollection(FakeMaterial))
+    bpy.path = types.SimpleNamespace(abspath=lambda path: path)
+    bpy.app = types.SimpleNamespace(version_string='fake', handlers=types.SimpleNamespace(depsgraph_update_post=[]))
+    bpy.utils = types.SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
+    bpy.ops = types.SimpleNamespace(object=types.SimpleNamespace(mode_set=lambda mode: None))
+
+    # Le mode 'Edition' n'est pas simulé : bmesh n'est utilisé qu'à travers lui
+    bmesh = types.ModuleType('bmesh')
+    def edit_mode_not_supported(*args, **kwargs):
+        raise NotImplementedError('Le mode \'Edition\' n\'est pas disponible hors de Blender')
+    bmesh.new = bmesh.from_edit_mesh = bmesh.update_edit_mesh = edit_mode_not_supported
+
+    sys.modules['bpy'] = bpy
+    sys.modules['bmesh'] = bmesh
+    return bpy
@@ -0,0 +1,93 @@
+# Génération déterministe des maillages synthétiques utilisés par les mesures de performance
+# Chaque générateur retourne les coordonnées des sommets (tableau (N, 3) float32) et les faces triangulaires (tableau (M, 3) int32)
+
+import math
+
+import numpy as np
+
+
+# Icosphère : icosaèdre dont chaque triangle est subdivisé en quatre 'subdivisions' fois (20 * 4^n faces)
+def icosphere(subdivisions):
+    t = (1.0 + math.sqrt(5.0)) / 2.0
+    vertices = np.array([[-1, t, 0], [1, t, 0], [-1, -t, 0], [1, -t, 0],
+                         [0, -1, t], [0, 1, t], [0, -1, -t], [0, 1, -t],
+                         [t, 0, -1], [t, 0, 1], [-t, 0, -1], [-t, 0, 1]], dtype=np.float64)
+    faces = np.array([[0, 11, 5], [0, 5, 1], [0, 1, 7], [0, 7, 10], [0, 10, 11],
+                      [1, 5, 9], [5, 11, 4], [11, 10, 2], [10, 7, 6], [7, 1, 8],
+                      [3, 9, 4], [3, 4, 2], [3, 2, 6], [3, 6, 8], [3, 8, 9],
+                      [4, 9, 5], [2, 4, 11], [6, 2, 10], [8, 6, 7], [9, 8, 1]], dtype=np.int64)
+
+    for _ in range(subdivisions):
+        # Chaque arête (codée par ses deux sommets triés) reçoit un unique sommet milieu, partagé par ses deux faces
+        edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+        edges.sort(axis=1)
+        edge_keys = edges[:, 0] * len(vertices) + edges[:, 1]
+        unique_keys, inverse = np.unique(edge_keys, return_inverse=True)
+        midpoints = (vertices[unique_keys // len(vertices)] + vertices[unique_keys % len(vertices)]) / 2.0
+        ab, bc, ca = (len(vertices) + inverse.reshape(3, -1))
+        a, b, c = faces.T
+        vertices = np.concatenate([vertices, midpoints])
+        faces = np.concatenate([np.stack([a, ab, ca], axis=1), np.stack([b, bc, ab], axis=1),
+                                np.stack([c, ca, bc], axis=1), np.stack([ab, bc, ca], axis=1)])
+
+    vertices /= np.linalg.norm(vertices, axis=1)[:, np.newaxis]
+    return vertices.astype(np.float32), faces.astype(np.int32)
+
+
+# Niveau de subdivision de l'icosphère dont le nombre de faces est le plus proche de 'target_faces'
+def icosphere_subdivisions(target_faces):
+    return max(0, int(round(math.log(max(target_faces, 20) / 20.0, 4))))
+
+
+# Tore bruité : grille de 'major_segments' x 'minor_segments' quadrilatères coupés en deux triangles,
+# dont les sommets sont déplacés le long de la normale d'un bruit uniforme d'amplitude 'noise' (graine fixe)
+def noisy_torus(major_segments, minor_segments, major_radius=1.0, minor_radius=0.3, noise=0.01, seed=0):
+    u = np.linspace(0.0, 2.0 * math.pi, major_segments, endpoint=False)
+    v = np.linspace(0.0, 2.0 * math.pi, minor_segments, endpoint=False)
+    u, v = np.meshgrid(u, v, indexing='ij')
+    radius = minor_radius + np.random.default_rng(seed).uniform(-noise, noise, size=u.shape)
+    vertices = np.stack([(major_radius + radius * np.cos(v)) * np.cos(u),
+                         (major_radius + radius * np.cos(v)) * np.sin(u),
+                         radius * np.sin(v)], axis=-1).reshape(-1, 3)
+
+    i, j = np.meshgrid(np.arange(major_segments), np.arange(minor_segments), indexing='ij')
+    a = i * minor_segments + j
+    b = ((i + 1) % major_segments) * minor_segments + j
+    c = ((i + 1) % major_segments) * minor_segments + (j + 1) % minor_segments
+    d = i * minor_segments + (j + 1) % minor_segments
+    faces = np.concatenate([np.stack([a, b, c], axis=-1).reshape(-1, 3), np.stack([a, c, d], axis=-1).reshape(-1, 3)])
+    return vertices.astype(np.float32), faces.astype(np.int32)
+
+
+# Tore bruité d'environ 'target_faces' faces (le grand cercle comporte trois fois plus de segments que le petit)
+def noisy_torus_of_size(target_faces, seed=0):
+    minor_segments = max(3, int(round(math.sqrt(target_faces / 6.0))))
+    major_segments = max(3, int(round(target_faces / (2.0 * minor_segments))))
+    return noisy_torus(major_segments, minor_segments, seed=seed)
+
+
+# Assemblage de 'components' pièces disjointes (alternativement icosphères et tores bruités) réparties sur une grille,
+# totalisant environ 'target_faces' faces
+def assembly(target_faces, components=16, seed=0):
+    side = int(math.ceil(components ** (1.0 / 3.0)))
+    vertices_list = []
+    faces_list = []
+    offset = 0
+    for index in range(components):
+        if index % 2 == 0:
+            vertices, faces = icosphere(icosphere_subdivisions(target_faces / components))
+        else:
+            vertices, faces = noisy_torus_of_size(target_faces / components, seed=seed + index)
+        position = np.array([index % side, (index // side) % side, index // (side * side)], dtype=np.float32) * 3.0
+        vertices_list.append(vertices + position)
+        faces_list.append(faces + offset)
+        offset += len(vertices)
+    return np.concatenate(vertices_list), np.concatenate(faces_list).astype(np.int32)
+
+
+# Maillages disponibles, indexés par leur nom : chaque générateur prend un nombre de faces visé
+GENERATORS = {
+    'icosphere': lambda target_faces: icosphere(icosphere_subdivisions(target_faces)),
+    'torus': noisy_torus_of_size,
+    'assembly': assembly,
+}
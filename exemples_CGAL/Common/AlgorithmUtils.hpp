@@ -0,0 +1,50 @@
+#ifndef ALGORITHMUTILS_HPP
+#define ALGORITHMUTILS_HPP
+
+#include <vector>
+#include <thread>
+#include <atomic>
+#include <algorithm>
+#include <cstddef>
+
+// Outils communs aux algorithmes des modules de simplification et de segmentation
+
+//Répartit les indices [0, n) en blocs contigus traités chacun par un thread
+//(number_of_threads : 1 pour un traitement séquentiel, 0 pour utiliser tous les coeurs)
+template <class Function>
+void parallel_for(std::size_t n, unsigned int number_of_threads, Function function){
+    unsigned int workers = number_of_threads == 0 ? std::max(1u, std::thread::hardware_concurrency()) : number_of_threads;
+    workers = static_cast<unsigned int>(std::min<std::size_t>(workers, std::max<std::size_t>(n, 1)));
+    if(workers <= 1){
+        function(0, n);
+        return;
+    }
+
+    std::vector<std::thread> threads;
+    threads.reserve(workers);
+    const std::size_t block_size = (n + workers - 1) / workers;
+    for(std::size_t begin = 0; begin < n; begin += block_size){
+        threads.emplace_back(function, begin, std::min(n, begin + block_size));
+    }
+    for(std::thread& thread : threads){
+        thread.join();
+    }
+}
+
+// Prédicat d'arrêt interrompant l'algorithme dès qu'une annulation est demandée, sinon délègue au prédicat d'arrêt 'Base'
+template <class Base>
+class Cancellable_stop_predicate{
+    public:
+    Cancellable_stop_predicate(const Base& base, const std::atomic<bool>* cancel_requested) : m_base(base), m_cancel_requested(cancel_requested){}
+
+    template <class ... Args>
+    bool operator()(const Args& ... args) const{
+        return m_cancel_requested->load(std::memory_order_relaxed) || m_base(args...);
+    }
+
+    private:
+    Base m_base;
+    const std::atomic<bool>* m_cancel_requested;
+};
+
+#endif
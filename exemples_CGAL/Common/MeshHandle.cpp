@@ -0,0 +1,260 @@
+#include "MeshHandle.hpp"
+
+#include <algorithm>
+
+namespace py = pybind11;
+
+MeshHandle::MeshHandle() : m_surface_mesh(), m_revision(0), m_busy(false){
+}
+
+MeshHandle::MeshHandle(const Float_array& vertices, const Int_array& faces) : m_surface_mesh(), m_revision(0), m_busy(false){
+    this->build(vertices, faces);
+}
+
+void MeshHandle::build(const Float_array& vertices, const Int_array& faces){
+    Lock lock(*this);
+    Clock::time_point start_time = Clock::now();
+    //Les tableaux doivent être à plat (3N) ou de dimensions (N, 3)
+    if(vertices.size() % 3 != 0 || (vertices.ndim() != 1 && (vertices.ndim() != 2 || vertices.shape(1) != 3))){
+        throw std::runtime_error("Le tableau des sommets doit être de dimensions (N, 3) ou à plat (3N)...");
+    }
+    if(faces.size() % 3 != 0 || (faces.ndim() != 1 && (faces.ndim() != 2 || faces.shape(1) != 3))){
+        throw std::runtime_error("Le tableau des faces doit être de dimensions (M, 3) ou à plat (3M)...");
+    }
+
+    const std::size_t number_of_vertices = vertices.size() / 3;
+    const std::size_t number_of_faces = faces.size() / 3;
+    //Lecture directe des buffers numpy, sans passer par des std::vector intermédiaires
+    const float* vertices_data = vertices.data();
+    const std::int32_t* faces_data = faces.data();
+
+    m_timings["conversion"] += elapsed_milliseconds(start_time);
+
+    //Les buffers restent référencés par l'appelant : le GIL peut être relâché pendant la construction du maillage
+    py::gil_scoped_release release;
+    start_time = Clock::now();
+
+    m_surface_mesh.clear();
+    m_input_faces.clear();
+    m_input_faces.reserve(number_of_faces);
+    //Réservation de l'espace mémoire du maillage en amont (un maillage triangulé fermé possède 3F/2 arêtes)
+    m_surface_mesh.reserve(number_of_vertices, number_of_faces * 3 / 2, number_of_faces);
+
+    //Le maillage étant vide, le i-ème sommet ajouté a pour descripteur vertex_descriptor(i)
+    for(std::size_t i = 0; i < number_of_vertices; ++i){
+        m_surface_mesh.add_vertex(Point_3(vertices_data[3 * i], vertices_data[3 * i + 1], vertices_data[3 * i + 2]));
+    }
+
+    for(std::size_t i = 0; i < number_of_faces; ++i){
+        //Récupération des indices des sommets de la face courante
+        const std::int32_t* face_indices = faces_data + 3 * i;
+        for(int j = 0; j < 3; ++j){
+            if(face_indices[j] < 0 || static_cast<std::size_t>(face_indices[j]) >= number_of_vertices){
+                throw std::runtime_error("La face " + std::to_string(i) + " référence un sommet inexistant...");
+            }
+        }
+
+        //Et création de la face du maillage à partir de ces derniers : une face qui rendrait le maillage non manifold n'est pas
+        //ajoutée, l'indice du triangle de chaque face ajoutée est conservé (le maillage étant vide, la k-ième face ajoutée a
+        //pour descripteur face_descriptor(k))
+        if(m_surface_mesh.add_face(vertex_descriptor(face_indices[0]), vertex_descriptor(face_indices[1]), vertex_descriptor(face_indices[2])) != Surface_mesh::null_face()){
+            m_input_faces.push_back(static_cast<std::int32_t>(i));
+        }
+    }
+
+    m_timings["mesh_build"] = elapsed_milliseconds(start_time);
+    ++m_revision;
+    this->record_size("peak_vertices", m_surface_mesh.num_vertices());
+    this->record_size("peak_edges", m_surface_mesh.num_edges());
+    this->record_size("peak_faces", m_surface_mesh.num_faces());
+    this->record_size("mesh_bytes", estimated_mesh_bytes(m_surface_mesh));
+    this->record_size("rejected_faces", number_of_faces - m_input_faces.size());
+}
+
+Surface_mesh& MeshHandle::surface_mesh(){
+    return m_surface_mesh;
+}
+
+const Surface_mesh& MeshHandle::surface_mesh() const{
+    return m_surface_mesh;
+}
+
+void MeshHandle::compact(){
+    // Compactage du maillage : les éléments supprimés sont retirés et les indices des sommets et des faces deviennent
+    // contigus (de 0 à n - 1). Les propriétés des éléments conservés suivent leur élément
+    if(m_surface_mesh.has_garbage()){
+        const Clock::time_point start_time = Clock::now();
+        m_surface_mesh.collect_garbage();
+        m_timings["remap"] = elapsed_milliseconds(start_time);
+    }
+}
+
+void MeshHandle::geometry_changed(){
+    //Les propriétés calculées à partir de l'ancienne géométrie ne sont plus valides : elles sont supprimées
+    //afin qu'aucun traitement ultérieur ne les réutilise
+    auto sdf_property_map = m_surface_mesh.property_map<face_descriptor, double>(SDF_PROPERTY_NAME);
+    if(sdf_property_map.second){
+        m_surface_mesh.remove_property_map(sdf_property_map.first);
+    }
+    auto segment_property_map = m_surface_mesh.property_map<face_descriptor, std::size_t>(SEGMENT_PROPERTY_NAME);
+    if(segment_property_map.second){
+        m_surface_mesh.remove_property_map(segment_property_map.first);
+    }
+    m_input_faces.clear();
+    ++m_revision;
+}
+
+std::size_t MeshHandle::revision() const{
+    return m_revision;
+}
+
+bool MeshHandle::is_busy() const{
+    return m_busy.load();
+}
+
+std::size_t MeshHandle::number_of_vertices() const{
+    return m_surface_mesh.number_of_vertices();
+}
+
+std::size_t MeshHandle::number_of_faces() const{
+    return m_surface_mesh.number_of_faces();
+}
+
+void MeshHandle::record_size(const std::string& name, std::size_t size){
+    m_sizes[name] = std::max(m_sizes[name], size);
+}
+
+void MeshHandle::acquire(){
+    std::unique_lock<std::mutex> guard(m_mutex);
+    if(m_busy && m_owner == std::this_thread::get_id()){
+        throw std::runtime_error("Le maillage est déjà utilisé par un traitement en cours dans ce thread...");
+    }
+    m_released.wait(guard, [this]{ return !m_busy.load(); });
+    m_busy = true;
+    m_owner = std::this_thread::get_id();
+}
+
+void MeshHandle::release(){
+    {
+        std::lock_guard<std::mutex> guard(m_mutex);
+        m_busy = false;
+        m_owner = std::thread::id();
+    }
+    m_released.notify_one();
+}
+
+MeshHandle::Lock::Lock(MeshHandle& mesh_handle) : m_mesh_handle(mesh_handle){
+    //Un thread qui détient le GIL le relâche pendant l'attente : le traitement en cours (qui reprend le GIL pour retourner
+    //ses résultats) et les autres threads Python ne sont pas bloqués
+    if(PyGILState_Check()){
+        py::gil_scoped_release release;
+        m_mesh_handle.acquire();
+    }
+    else{
+        m_mesh_handle.acquire();
+    }
+}
+
+MeshHandle::Lock::~Lock(){
+    m_mesh_handle.release();
+}
+
+py::array_t<float> MeshHandle::get_vertices(){
+    Lock lock(*this);
+    this->compact();
+    const Clock::time_point start_time = Clock::now();
+
+    //Création d'un tableau numpy (N, 3) qui va contenir les coordonnées des sommets du maillage
+    py::array_t<float> vertices(std::vector<py::ssize_t>{static_cast<py::ssize_t>(m_surface_mesh.number_of_vertices()), 3});
+    float* vertices_data = vertices.mutable_data();
+
+    for(const auto& vd : m_surface_mesh.vertices()) {
+        const Point_3& point = m_surface_mesh.point(vd);
+        *vertices_data++ = static_cast<float>(point.x());
+        *vertices_data++ = static_cast<float>(point.y());
+        *vertices_data++ = static_cast<float>(point.z());
+    }
+
+    m_timings["export"] += elapsed_milliseconds(start_time);
+    return vertices;
+}
+
+py::array_t<std::int32_t> MeshHandle::get_faces(){
+    Lock lock(*this);
+    this->compact();
+    const Clock::time_point start_time = Clock::now();
+
+    //Création d'un tableau numpy (M, 3) qui va contenir les indices des sommets des faces du maillage
+    py::array_t<std::int32_t> faces(std::vector<py::ssize_t>{static_cast<py::ssize_t>(m_surface_mesh.number_of_faces()), 3});
+    std::int32_t* faces_data = faces.mutable_data();
+
+    // Le maillage étant compacté, l'indice d'un sommet correspond directement à sa position dans le tableau des sommets
+    for(const auto& face : m_surface_mesh.faces()) {
+        for(const auto& v : vertices_around_face(m_surface_mesh.halfedge(face), m_surface_mesh)) {
+            *faces_data++ = static_cast<std::int32_t>(v.idx());
+        }
+    }
+
+    m_timings["export"] += elapsed_milliseconds(start_time);
+    return faces;
+}
+
+py::array_t<std::int32_t> MeshHandle::get_input_faces(){
+    Lock lock(*this);
+    this->compact();
+
+    //Tableau numpy (M,) de l'indice du triangle d'origine de chaque face, dans l'ordre de get_faces (après une modification de
+    //la géométrie, chaque face correspond à la face de même rang exportée par get_faces)
+    const std::size_t number_of_faces = m_surface_mesh.number_of_faces();
+    py::array_t<std::int32_t> input_faces(static_cast<py::ssize_t>(number_of_faces));
+    std::int32_t* input_faces_data = input_faces.mutable_data();
+    for(std::size_t i = 0; i < number_of_faces; ++i){
+        input_faces_data[i] = m_input_faces.empty() ? static_cast<std::int32_t>(i) : m_input_faces[i];
+    }
+    return input_faces;
+}
+
+py::dict MeshHandle::get_surface_mesh_data(){
+    //Structure de données retournée à Blender, directement exploitable par foreach_set
+    py::dict surface_mesh_data;
+    surface_mesh_data["vertices"] = this->get_vertices();
+    surface_mesh_data["faces"] = this->get_faces();
+    return surface_mesh_data;
+}
+
+py::dict MeshHandle::get_statistics() const{
+    //Durées de la construction du maillage et des exports (conversion, mesh_build, remap, export) en millisecondes,
+    //tailles maximales du maillage et nombre de modifications de sa géométrie
+    py::dict statistics;
+    statistics["timings_ms"] = m_timings;
+    statistics["sizes"] = m_sizes;
+    statistics["revision"] = m_revision;
+    return statistics;
+}
+
+const std::map<std::string, double>& MeshHandle::timings() const{
+    return m_timings;
+}
+
+const std::map<std::string, std::size_t>& MeshHandle::sizes() const{
+    return m_sizes;
+}
+
+void register_mesh_handle(py::module_& module){
+    if(py::detail::get_type_info(typeid(MeshHandle)) != nullptr){
+        module.attr("MeshHandle") = py::type::of<MeshHandle>();
+        return;
+    }
+
+    py::class_<MeshHandle, std::shared_ptr<MeshHandle>>(module, "MeshHandle")
+        .def(py::init<const Float_array&, const Int_array&>(), py::arg("vertices"), py::arg("faces"))
+        .def("number_of_vertices", &MeshHandle::number_of_vertices)
+        .def("number_of_faces", &MeshHandle::number_of_faces)
+        .def("revision", &MeshHandle::revision)
+        .def("is_busy", &MeshHandle::is_busy)
+        .def("get_vertices", &MeshHandle::get_vertices)
+        .def("get_faces", &MeshHandle::get_faces)
+        .def("get_input_faces", &MeshHandle::get_input_faces)
+        .def("get_surface_mesh_data", &MeshHandle::get_surface_mesh_data)
+        .def("get_statistics", &MeshHandle::get_statistics);
+}
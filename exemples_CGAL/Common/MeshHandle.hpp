@@ -0,0 +1,124 @@
+#ifndef MESHHANDLE_HPP
+#define MESHHANDLE_HPP
+
+#include <vector>
+#include <chrono>
+#include <map>
+#include <memory>
+#include <string>
+#include <cstdint>
+#include <atomic>
+#include <mutex>
+#include <condition_variable>
+#include <thread>
+#include <stdexcept>
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
+
+#include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
+#include <CGAL/Surface_mesh.h>
+
+// Types partagés par les modules de simplification et de segmentation : un MeshHandle créé par l'un des modules
+// peut être transmis à l'autre, ce qui suppose que les deux modules utilisent exactement le même type de maillage
+typedef CGAL::Exact_predicates_inexact_constructions_kernel      Kernel;
+typedef Kernel::Point_3                                          Point_3;
+typedef CGAL::Surface_mesh<Point_3>                              Surface_mesh;
+typedef Surface_mesh::Vertex_index                               vertex_descriptor;
+typedef Surface_mesh::Face_index                                 face_descriptor;
+typedef Surface_mesh::Edge_index                                 edge_descriptor;
+// Tableaux numpy contigus lus en place (aucune copie si le tableau est déjà de ce type)
+typedef pybind11::array_t<float, pybind11::array::c_style | pybind11::array::forcecast>        Float_array;
+typedef pybind11::array_t<std::int32_t, pybind11::array::c_style | pybind11::array::forcecast> Int_array;
+
+// Propriétés des faces calculées par la segmentation à partir de la géométrie du maillage (valeurs SDF et identifiants des segments)
+const char* const SDF_PROPERTY_NAME = "f:sdf";
+const char* const SEGMENT_PROPERTY_NAME = "f:sid";
+
+typedef std::chrono::steady_clock                                Clock;
+
+// Durée écoulée depuis 'start_time', en millisecondes
+inline double elapsed_milliseconds(const Clock::time_point& start_time){
+    return std::chrono::duration<double, std::milli>(Clock::now() - start_time).count();
+}
+
+// Estimation de la mémoire occupée par la connectivité et les positions d'un Surface_mesh (éléments supprimés compris)
+inline std::size_t estimated_mesh_bytes(const Surface_mesh& surface_mesh){
+    const std::size_t index_size = sizeof(vertex_descriptor);
+    // sommets : position, demi-arête incidente, marqueur de suppression
+    return surface_mesh.num_vertices() * (sizeof(Point_3) + index_size + sizeof(bool))
+        // demi-arêtes : face, sommet cible, demi-arêtes suivante et précédente
+        + surface_mesh.num_halfedges() * 4 * index_size
+        // arêtes : marqueur de suppression
+        + surface_mesh.num_edges() * sizeof(bool)
+        // faces : demi-arête incidente, marqueur de suppression
+        + surface_mesh.num_faces() * (index_size + sizeof(bool));
+}
+
+// Maillage CGAL persistant, construit une seule fois à partir des tableaux de Blender puis partagé par les algorithmes de
+// simplification et de segmentation, qui le modifient ou l'annotent en place : plusieurs traitements peuvent ainsi être
+// enchaînés sans quitter le code C++, le maillage n'étant exporté vers Blender qu'à la fin
+class MeshHandle{
+    public:
+    MeshHandle();
+    MeshHandle(const Float_array& vertices, const Int_array& faces);
+    void build(const Float_array& vertices, const Int_array& faces);
+    Surface_mesh& surface_mesh();
+    const Surface_mesh& surface_mesh() const;
+    void compact();
+    void geometry_changed();
+    std::size_t revision() const;
+    bool is_busy() const;
+    std::size_t number_of_vertices() const;
+    std::size_t number_of_faces() const;
+    pybind11::array_t<float> get_vertices();
+    pybind11::array_t<std::int32_t> get_faces();
+    pybind11::array_t<std::int32_t> get_input_faces();
+    pybind11::dict get_surface_mesh_data();
+    pybind11::dict get_statistics() const;
+    const std::map<std::string, double>& timings() const;
+    const std::map<std::string, std::size_t>& sizes() const;
+
+    // Réserve le maillage pour la durée d'un traitement : deux traitements ne s'exécutent pas en même temps (depuis des
+    // threads Python différents) sur le même maillage, le second attendant la fin du premier. Le GIL est relâché pendant
+    // l'attente : le traitement en cours peut en avoir besoin pour se terminer. La réservation n'est pas réentrante : un
+    // thread qui réserve de nouveau un maillage qu'il détient déjà attendrait indéfiniment, une exception est levée
+    class Lock{
+        public:
+        explicit Lock(MeshHandle& mesh_handle);
+        ~Lock();
+        Lock(const Lock&) = delete;
+        Lock& operator=(const Lock&) = delete;
+
+        private:
+        MeshHandle& m_mesh_handle;
+    };
+
+    private:
+    void record_size(const std::string& name, std::size_t size);
+    void acquire();
+    void release();
+
+    Surface_mesh m_surface_mesh;
+    // Nombre de modifications de la géométrie depuis la construction du maillage
+    std::size_t m_revision;
+    // Indice, dans le tableau des faces fourni à build, du triangle dont est issue chaque face du maillage : les triangles
+    // refusés par add_face (triangles dupliqués ou arêtes non manifold, que la fusion des sommets peut produire) n'ont pas de
+    // face. Vide une fois la géométrie modifiée, les faces correspondant alors à celles exportées par get_faces
+    std::vector<std::int32_t> m_input_faces;
+    // Réservation du maillage par un traitement et thread qui le détient (modifiés sous la protection de 'm_mutex', libération
+    // signalée par 'm_released')
+    std::atomic<bool> m_busy;
+    std::thread::id m_owner;
+    std::mutex m_mutex;
+    std::condition_variable m_released;
+    // Statistiques de performance : durée de la construction et des exports (en millisecondes) et tailles maximales
+    std::map<std::string, double> m_timings;
+    std::map<std::string, std::size_t> m_sizes;
+};
+
+// Ajoute la classe MeshHandle au module Python 'module'. Si elle a déjà été enregistrée par l'autre module (compilé avec la
+// même version de pybind11), le type existant est simplement exposé : les deux modules partagent alors le même type Python
+void register_mesh_handle(pybind11::module_& module);
+
+#endif
@@ -0,0 +1,70 @@
+# Statistiques des exécutions des extensions de simplification et de segmentation : mémorisation de la dernière exécution,
+# journal JSON et résumé affiché dans le panneau de chaque extension
+
+import json
+from datetime import datetime
+
+import bpy
+
+# Nombres d'éléments affichés dans le résumé, dans cet ordre, lorsque le code C++ ou l'extension les fournit
+COUNT_LABELS = (('removed_edges', 'arêtes contractées'), ('components', 'composantes'),
+                ('number_of_segments', 'segments'), ('proxy_faces', 'faces du proxy'))
+
+
+# Statistiques de la dernière exécution d'un algorithme ('last', affichées dans le panneau) pour l'extension de version
+# 'addon_version'
+class ExecutionStatistics:
+    def __init__(self, addon_version):
+        self.addon_version = '.'.join(str(number) for number in addon_version)
+        self.last = {}
+
+    # Mémorise les statistiques d'une exécution (durées des étapes Python et statistiques du code C++) et les ajoute au
+    # journal JSON (une ligne par exécution) si l'utilisateur l'a activé dans les propriétés 'properties' de l'extension
+    def record(self, properties, operation, object_name, python_timings, cpp_statistics):
+        statistics = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'blender_version': bpy.app.version_string,
+            'addon_version': self.addon_version,
+            'operation': operation,
+            'object': object_name,
+            'python_timings_ms': dict(python_timings),
+            'timings_ms': dict(cpp_statistics['timings_ms']),
+            'sizes': dict(cpp_statistics['sizes']),
+            'counts': dict(cpp_statistics.get('counts', {})),
+            'error': dict(cpp_statistics.get('error', {})),
+        }
+        self.last.clear()
+        self.last.update(statistics)
+
+        if properties.log_statistics and properties.log_path:
+            with open(bpy.path.abspath(properties.log_path), 'a', encoding='utf-8') as log_file:
+                log_file.write(json.dumps(statistics) + '\n')
+
+
+# Affiche un résumé des statistiques d'une exécution (durées des étapes, tailles maximales du maillage, nombres d'éléments et
+# erreur géométrique si elle a été mesurée)
+def draw_statistics(layout, statistics):
+    if not statistics:
+        layout.label(text='Aucune exécution')
+        return
+    layout.label(text='Dernière exécution : {}'.format(statistics['object']))
+    column = layout.column(align=True)
+    for name, duration in statistics['python_timings_ms'].items():
+        column.label(text='{} : {:.1f} ms'.format(name, duration))
+    for name, duration in statistics['timings_ms'].items():
+        column.label(text='{} : {:.1f} ms'.format(name, duration))
+    sizes = statistics['sizes']
+    column.label(text='sommets : {}, faces : {}'.format(sizes.get('peak_vertices', 0), sizes.get('peak_faces', 0)))
+    column.label(text='mémoire du maillage : {:.1f} Mo'.format(sizes.get('mesh_bytes', 0) / (1024.0 * 1024.0)))
+    counts = statistics.get('counts', {})
+    for name, label in COUNT_LABELS:
+        if name in counts:
+            column.label(text='{} : {}'.format(label, counts[name]))
+    # erreur géométrique du maillage simplifié (distances dans l'unité de l'objet et relativement à sa boîte englobante)
+    error = statistics.get('error')
+    if error:
+        diagonal = error.get('bbox_diagonal', 0.0)
+        relative = ' ({:.3%})'.format(error['hausdorff'] / diagonal) if diagonal > 0 else ''
+        column.label(text='Hausdorff : {:.6g}{}'.format(error['hausdorff'], relative))
+        column.label(text='vers l\'origine : {:.6g}, depuis l\'origine : {:.6g}'.format(error['hausdorff_to_original'], error['hausdorff_from_original']))
+        column.label(text='RMS : {:.6g} ({} échantillons)'.format(error['rms'], int(error['samples'])))
@@ -0,0 +1,249 @@
+# Conversion des maillages en tableaux numpy lus par les modules compilés, commune aux extensions de simplification et de
+# segmentation et à la chaîne de traitement en ligne de commande : triangulation en éventail des polygones, fusion des sommets
+# superposés et empreinte de la géométrie
+
+import hashlib
+
+import numpy as np
+
+# Distance en deçà de laquelle deux sommets sont fusionnés (même tolérance que bmesh.ops.remove_doubles)
+WELD_DISTANCE = 0.0001
+
+# Décalages vers les cellules voisines d'une cellule de la grille : chaque paire de cellules voisines n'est visitée qu'une
+# fois (la cellule elle-même et 13 des 26 voisines, les 13 autres étant les opposées de celles-ci)
+NEIGHBOUR_OFFSETS = np.array([(0, 0, 0)] + [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)
+                                            if (x, y, z) > (0, 0, 0)], dtype=np.int64)
+
+
+# Triangule en éventail les polygones décrits par 'loop_start', 'loop_total' et les indices des sommets des coins
+# Retourne les faces triangulaires (tableau (M, 3) int32) et, pour chaque triangle, l'indice du polygone dont il est issu
+def fan_triangulate(loop_start, loop_total, loop_vertices):
+    # Un polygone de n sommets donne n - 2 triangles (v0, vk, vk+1)
+    triangles_per_polygon = np.maximum(loop_total - 2, 0)
+    triangle_polygons = np.repeat(np.arange(len(loop_start), dtype=np.int32), triangles_per_polygon)
+    # rang de chaque triangle au sein de son polygone
+    first_triangle = np.cumsum(triangles_per_polygon) - triangles_per_polygon
+    rank = np.arange(len(triangle_polygons), dtype=np.int32) - np.repeat(first_triangle, triangles_per_polygon).astype(np.int32)
+
+    first_loop = loop_start[triangle_polygons]
+    faces = np.empty((len(triangle_polygons), 3), dtype=np.int32)
+    faces[:, 0] = loop_vertices[first_loop]
+    faces[:, 1] = loop_vertices[first_loop + rank + 1]
+    faces[:, 2] = loop_vertices[first_loop + rank + 2]
+    return faces, triangle_polygons
+
+
+# Relie les sommets deux à deux selon les paires 'edges' (tableau (E, 2)) par union-find vectorisé : les racines de chaque
+# paire sont reliées (la plus grande à la plus petite), puis les chemins sont compressés par sauts de pointeurs, jusqu'à ce que
+# toutes les paires relient des sommets de même racine
+# Retourne la racine de chaque sommet, qui est le plus petit indice de son groupe
+def union_find_roots(edges, number_of_vertices):
+    parent = np.arange(number_of_vertices, dtype=np.int64)
+    while True:
+        roots = parent[edges]
+        linked = roots[:, 0] != roots[:, 1]
+        if not linked.any():
+            return parent
+        roots = np.sort(roots[linked], axis=1)
+        np.minimum.at(parent, roots[:, 1], roots[:, 0])
+        # Compression des chemins : chaque sommet pointe directement vers sa racine
+        while True:
+            grand_parent = parent[parent]
+            if np.array_equal(grand_parent, parent):
+                break
+            parent = grand_parent
+
+
+# Retourne l'indice dans 'cells' (tableau (K, 3) de cellules distinctes) de chacune des cellules 'queries', ou -1 si elle
+# n'en fait pas partie. Les deux tableaux sont triés ensemble : une cellule recherchée suit immédiatement son égale
+def find_cells(cells, queries):
+    merged = np.concatenate([cells, queries])
+    # tri stable : à coordonnées égales, la cellule de 'cells' (placée en tête) précède les cellules recherchées
+    order = np.lexsort((merged[:, 2], merged[:, 1], merged[:, 0]))
+    is_cell = order < len(cells)
+    # position, dans l'ordre trié, de la dernière cellule de 'cells' rencontrée
+    last_cell = np.maximum.accumulate(np.where(is_cell, np.arange(len(order)), -1))
+    query_positions = np.nonzero(~is_cell)[0]
+    candidates = order[np.maximum(last_cell[query_positions], 0)]
+    found = (last_cell[query_positions] >= 0) & np.all(merged[candidates] == merged[order[query_positions]], axis=1)
+
+    result = np.full(len(queries), -1, dtype=np.int64)
+    result[order[query_positions] - len(cells)] = np.where(found, candidates, -1)
+    return result
+
+
+# Paires de sommets distants d'au plus 'distance' : les sommets sont rangés dans une grille de pas 'distance', si bien que deux
+# sommets proches appartiennent à la même cellule ou à deux cellules voisines ; seules ces paires de sommets sont comparées
+def close_vertex_pairs(vertices, distance):
+    cells = np.floor(vertices / distance).astype(np.int64)
+    # Les cellules sont numérotées par un entier unique lorsque la grille (bordée d'une cellule de chaque côté) le permet ;
+    # sinon (maillage très étendu par rapport à 'distance') les cellules voisines sont recherchées par coordonnées
+    cells -= cells.min(axis=0) - 1
+    extents = cells.max(axis=0) + 2
+    linear_keys = float(extents[0]) * float(extents[1]) * float(extents[2]) < 2.0 ** 62
+    if linear_keys:
+        strides = np.array([extents[1] * extents[2], extents[2], 1], dtype=np.int64)
+        unique_keys, vertex_cells, cell_counts = np.unique(cells @ strides, return_inverse=True, return_counts=True)
+    else:
+        unique_cells, vertex_cells, cell_counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    # Sommets rangés par cellule : chaque cellule occupe une plage contiguë de 'cell_vertices'
+    cell_vertices = np.argsort(vertex_cells.reshape(-1), kind='stable')
+    cell_starts = np.cumsum(cell_counts) - cell_counts
+
+    pairs = []
+    squared_distance = np.float64(distance) ** 2
+    for offset in NEIGHBOUR_OFFSETS:
+        if not offset.any():
+            neighbours = np.arange(len(cell_counts))
+        elif linear_keys:
+            neighbour_keys = unique_keys + offset @ strides
+            positions = np.minimum(np.searchsorted(unique_keys, neighbour_keys), len(unique_keys) - 1)
+            neighbours = np.where(unique_keys[positions] == neighbour_keys, positions, -1)
+        else:
+            neighbours = find_cells(unique_cells, unique_cells + offset)
+        first_cells = np.nonzero(neighbours >= 0)[0]
+        second_cells = neighbours[first_cells]
+        # toutes les paires (sommet de la première cellule, sommet de la seconde)
+        pair_counts = cell_counts[first_cells] * cell_counts[second_cells]
+        pair_cells = np.repeat(np.arange(len(first_cells)), pair_counts)
+        rank = np.arange(len(pair_cells)) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+        second_counts = cell_counts[second_cells][pair_cells]
+        first = cell_vertices[cell_starts[first_cells][pair_cells] + rank // second_counts]
+        second = cell_vertices[cell_starts[second_cells][pair_cells] + rank % second_counts]
+        if not offset.any():
+            # au sein d'une même cellule, chaque paire n'est comparée qu'une fois
+            first, second = first[first < second], second[first < second]
+        difference = vertices[first].astype(np.float64) - vertices[second]
+        close = np.einsum('ij,ij->i', difference, difference) <= squared_distance
+        pairs.append(np.stack([first[close], second[close]], axis=1))
+    return np.concatenate(pairs)
+
+
+# Recherche, pour chacun des points 'queries', le plus proche des points 'points' parmi ceux de la cellule du point cherché et
+# des 26 cellules voisines d'une grille de pas 'step' dont l'origine est 'lower'
+# Retourne le carré de la distance au plus proche et son indice (infini et -1 si ces cellules ne contiennent aucun point)
+def grid_nearest_points(points, queries, lower, step):
+    nearest = np.full(len(queries), -1, dtype=np.int64)
+    best_distances = np.full(len(queries), np.inf)
+    # Grille bordée d'une cellule de chaque côté : une cellule voisine a toujours une clé valide
+    cells = np.floor((points - lower) / step).astype(np.int64) + 1
+    query_cells = np.floor((queries - lower) / step).astype(np.int64) + 1
+    extents = np.maximum(cells.max(axis=0), query_cells.max(axis=0)) + 2
+    strides = np.array([extents[1] * extents[2], extents[2], 1], dtype=np.int64)
+    # Points rangés par cellule, et cellules distinctes des points cherchés (recherchées une seule fois, dans l'ordre)
+    cell_keys, point_cells, cell_counts = np.unique(cells @ strides, return_inverse=True, return_counts=True)
+    order = np.argsort(point_cells.reshape(-1), kind='stable')
+    cell_starts = np.cumsum(cell_counts) - cell_counts
+    query_keys, query_key_indices = np.unique(query_cells @ strides, return_inverse=True)
+    query_key_indices = query_key_indices.reshape(-1)
+
+    for offset in np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)], dtype=np.int64):
+        neighbour_keys = query_keys + offset @ strides
+        positions = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+        exists = cell_keys[positions] == neighbour_keys
+        starts = cell_starts[positions][query_key_indices]
+        counts = np.where(exists, cell_counts[positions], 0)[query_key_indices]
+        pair_queries = np.repeat(np.arange(len(queries)), counts)
+        if len(pair_queries) == 0:
+            continue
+        rank = np.arange(len(pair_queries)) - np.repeat(np.cumsum(counts) - counts, counts)
+        candidates = order[starts[pair_queries] + rank]
+        difference = points[candidates] - queries[pair_queries]
+        distances = np.einsum('ij,ij->i', difference, difference)
+        # Les paires sont rangées par point : la plus petite distance de chaque groupe est obtenue sans tri
+        found = np.flatnonzero(counts)
+        group_distances = np.minimum.reduceat(distances, (np.cumsum(counts) - counts)[found])
+        closer = np.zeros(len(queries), dtype=bool)
+        closer[found] = group_distances < best_distances[found]
+        best_distances[found] = np.minimum(best_distances[found], group_distances)
+        selected = closer[pair_queries] & (distances == best_distances[pair_queries])
+        nearest[pair_queries[selected]] = candidates[selected]
+    return best_distances, nearest
+
+
+# Retourne, pour chacun des points 'queries' (tableau (Q, 3)), l'indice du plus proche des points 'points' (tableau (P, 3))
+# Les points sont rangés dans une grille dont le pas est d'abord l'espacement moyen de points répartis sur une surface, et le
+# plus proche est cherché parmi ceux de la cellule du point et des 26 cellules voisines (voir grid_nearest_points). Tout point
+# extérieur à ces cellules est à plus d'un pas du point cherché : le plus proche trouvé à moins d'un pas est exact. Les autres
+# points (voisinage vide ou plus clairsemé, comme dans un nuage de points volumique) sont cherchés de nouveau dans une grille de
+# pas double, jusqu'à ce que le pas dépasse la diagonale de la boîte englobante, les 27 cellules contenant alors tous les points
+def nearest_points(points, queries):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+    nearest = np.full(len(queries), -1, dtype=np.int64)
+    if len(points) == 0 or len(queries) == 0:
+        return nearest
+    lower = np.minimum(points.min(axis=0), queries.min(axis=0))
+    upper = np.maximum(points.max(axis=0), queries.max(axis=0))
+    step = float(np.linalg.norm(upper - lower)) / np.sqrt(len(points)) or 1.0
+
+    pending = np.arange(len(queries))
+    while len(pending) > 0:
+        best_distances, nearest[pending] = grid_nearest_points(points, queries[pending], lower, step)
+        pending = pending[best_distances > step * step]
+        step *= 2.0
+    return nearest
+
+
+# Fusionne les sommets distants d'au plus 'distance' (de proche en proche, comme bmesh.ops.remove_doubles)
+# Les triangles devenus dégénérés sont supprimés ; retourne les sommets fusionnés, les faces réindexées et le masque des triangles conservés
+def weld_vertices(vertices, faces, distance):
+    if distance <= 0.0 or len(vertices) == 0:
+        return vertices, faces, np.ones(len(faces), dtype=bool)
+    vertex_roots = union_find_roots(close_vertex_pairs(vertices, distance), len(vertices))
+    # Chaque groupe est représenté par son sommet de plus petit indice : les sommets conservés gardent leur ordre d'origine
+    # et un maillage sans doublons n'est pas renuméroté
+    representatives = vertex_roots == np.arange(len(vertices))
+    rank = (np.cumsum(representatives) - 1).astype(np.int32)
+    vertex_map = rank[vertex_roots]
+
+    faces = vertex_map[faces]
+    kept = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    return vertices[representatives], faces[kept], kept
+
+
+# Récupère, sans modifier le maillage de l'objet Blender, les tableaux numpy des coordonnées des sommets (float32) et des
+# indices des sommets des faces triangulées (int32) ainsi que l'indice du polygone d'origine de chaque triangle
+# Avec 'weld_distance' nul, les sommets ne sont pas fusionnés et leurs indices restent ceux du maillage de l'objet
+def extract_mesh_buffers(object, weld_distance=WELD_DISTANCE):
+    if not object or object.type != 'MESH':
+        raise RuntimeError('Aucun maillage n\'est sélectionné')
+    # En mode 'Edition', les modifications en cours sont d'abord reportées dans le maillage
+    if object.mode == 'EDIT':
+        object.update_from_editmode()
+    mesh = object.data
+
+    vertices = np.empty((len(mesh.vertices) * 3), dtype=np.float32)
+    mesh.vertices.foreach_get('co', vertices)
+    # Les polygones peuvent avoir un nombre quelconque de sommets : ils sont décrits par leur premier coin et leur nombre de coins
+    loop_start = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('loop_start', loop_start)
+    loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get('loop_total', loop_total)
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', loop_vertices)
+
+    faces, triangle_polygons = fan_triangulate(loop_start, loop_total, loop_vertices)
+    vertices, faces, kept = weld_vertices(vertices.reshape(-1, 3), faces, weld_distance)
+    # Les tableaux numpy (float32 et int32 contigus) sont lus en place par le code C++, sans conversion intermédiaire
+    return np.ascontiguousarray(vertices).ravel(), np.ascontiguousarray(faces).ravel(), triangle_polygons[kept]
+
+
+# Rapporte aux polygones d'origine les identifiants des segments des faces d'un maillage CGAL : 'input_faces'
+# (MeshHandle.get_input_faces) donne le triangle dont est issue chaque face, les triangles refusés à la construction du maillage
+# (doublons ou arêtes non manifold) n'ayant pas de face. Chaque polygone prend le segment de son premier triangle conservé
+# (l'affectation en ordre inverse laisse la dernière écriture au premier), 0 s'il n'en a aucun
+def polygon_segments_ids(segments_ids, input_faces, triangle_polygons, number_of_polygons):
+    if len(segments_ids) != len(input_faces):
+        raise RuntimeError('Le nombre de segments ({}) ne correspond pas au nombre de faces du maillage ({})'.format(len(segments_ids), len(input_faces)))
+    polygons_segments_ids = np.zeros(number_of_polygons, dtype=np.uint32)
+    polygons_segments_ids[triangle_polygons[input_faces][::-1]] = segments_ids[::-1]
+    return polygons_segments_ids
+
+
+# Retourne une empreinte de la géométrie d'un maillage (les tableaux numpy contigus sont lus sans copie)
+def geometry_hash(vertices, faces):
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(vertices)
+    hasher.update(faces)
+    return hasher.hexdigest()
@@ -0,0 +1,83 @@
+# Registre de session des maillages CGAL persistants (MeshHandle) partagés par les extensions de simplification et de segmentation
+# Chaque objet est associé au plus à un maillage, identifié par le nom de l'objet et l'empreinte des tableaux (sommets, faces) dont
+# il est issu : tant que la géométrie de l'objet ne change pas, le maillage déjà construit est réutilisé par l'une ou l'autre des
+# extensions sans nouvelle conversion. Un objet simplifié puis segmenté n'est ainsi converti qu'une seule fois
+# Les extensions appliquent à l'objet le résultat de chaque traitement (l'objet Blender doit refléter la simplification) : les
+# tableaux sont donc exportés après chaque traitement, puis extraits et hachés de nouveau avant le suivant pour retrouver le
+# maillage. Seule la conversion en maillage CGAL est évitée ; l'enchaînement sans export intermédiaire reste celui des scripts,
+# qui transmettent directement le MeshHandle d'un algorithme à l'autre
+#
+# Le module, présent dans l'archive de chacune des deux extensions, est installé une seule fois dans le dossier des extensions :
+# importé par les deux, il leur fournit le même registre
+#
+# Le type MeshHandle est enregistré une seule fois auprès de Pybind11 (par le premier module importé) et réutilisé par l'autre :
+# un maillage n'est transmis d'un module à l'autre que si les deux ont été compilés avec les mêmes versions de Pybind11 et de
+# CGAL (et le même compilateur). Sinon chaque module enregistre son propre type et un maillage de l'autre module n'est pas
+# réutilisé : il est reconstruit à partir des tableaux de l'objet
+
+import threading
+from collections import OrderedDict
+
+from mesh_buffers import geometry_hash
+
+# Nombre maximal de maillages conservés (un maillage CGAL occupe plusieurs fois la taille des tableaux de Blender)
+MAX_ENTRIES = 4
+
+
+# Maillages conservés par nom d'objet, du moins au plus récemment utilisé
+class MeshHandleRegistry:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        # nom de l'objet : (empreinte de la géométrie, maillage)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Le registre est consulté depuis les threads de calcul des extensions
+        self.lock = threading.Lock()
+
+    # Retourne le maillage de l'objet 'name' dont la géométrie correspond à 'vertices' et 'faces', construit par 'factory'
+    # (la classe MeshHandle de l'un des modules compilés) s'il n'est pas déjà présent dans le registre avec le même type
+    # Un traitement qui modifie le maillage en place le demande en 'exclusive' : il est alors retiré du registre jusqu'à ce que
+    # le traitement l'y replace avec sa nouvelle géométrie (register). Un maillage en cours d'utilisation n'est jamais partagé
+    def acquire(self, name, vertices, faces, factory, exclusive=False):
+        key = geometry_hash(vertices, faces)
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None and entry[0] == key and isinstance(entry[1], factory) and not entry[1].is_busy():
+                self.hits += 1
+                if exclusive:
+                    del self.entries[name]
+                else:
+                    self.entries.move_to_end(name)
+                return entry[1]
+            self.misses += 1
+        mesh_handle = factory(vertices, faces)
+        if not exclusive:
+            self.register(name, mesh_handle, vertices, faces)
+        return mesh_handle
+
+    # Associe à l'objet 'name' un maillage dont la géométrie correspond à 'vertices' et 'faces' (par exemple le maillage
+    # simplifié en place, dont les tableaux viennent d'être appliqués à l'objet)
+    def register(self, name, mesh_handle, vertices, faces):
+        key = geometry_hash(vertices, faces)
+        with self.lock:
+            self.entries[name] = (key, mesh_handle)
+            self.entries.move_to_end(name)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def discard(self, name):
+        with self.lock:
+            self.entries.pop(name, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+
+registry = MeshHandleRegistry(MAX_ENTRIES)
@@ -0,0 +1,18 @@
+# Chronométrage des étapes Python des extensions de simplification et de segmentation
+
+import time
+
+
+# Chronomètre une étape Python et cumule sa durée (en millisecondes) dans le dictionnaire 'timings' sous le nom 'name'
+class PhaseTimer:
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings[self.name] = self.timings.get(self.name, 0.0) + (time.perf_counter() - self.start_time) * 1000.0
+        return False
@@ -0,0 +1,93 @@
+# Cache disque des résultats des algorithmes, commun aux extensions de simplification et de segmentation (chacune l'utilise avec
+# son propre dossier et ses propres clés)
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+
+# Cache disque des résultats, adressé par le contenu : chaque entrée est un dossier nommé d'après l'empreinte des tableaux du
+# maillage, des paramètres de l'algorithme et de la version du module, contenant un fichier .npy par tableau résultat
+# Les entrées sont relues en mémoire mappée et les moins récemment utilisées sont supprimées au-delà de la taille maximale
+class ResultCache:
+    def __init__(self, default_directory):
+        self.default_directory = default_directory
+        self.directory = default_directory
+        self.max_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # Les compteurs sont mis à jour depuis les threads de calcul
+        self.lock = threading.Lock()
+
+    def configure(self, directory, max_bytes):
+        self.directory = directory or self.default_directory
+        self.max_bytes = max_bytes
+
+    # Retourne la clé d'une entrée à partir des tableaux d'entrée et des paramètres (valeurs dont la représentation est stable)
+    @staticmethod
+    def key(arrays, parameters):
+        hasher = hashlib.blake2b(digest_size=20)
+        for array in arrays:
+            hasher.update(np.ascontiguousarray(array))
+        hasher.update(repr(parameters).encode('utf-8'))
+        return hasher.hexdigest()
+
+    # Retourne le dictionnaire des tableaux de l'entrée (en mémoire mappée) ou None si elle n'existe pas
+    def get(self, key):
+        path = os.path.join(self.directory, key)
+        try:
+            result = {os.path.splitext(name)[0]: np.load(os.path.join(path, name), mmap_mode='r')
+                      for name in os.listdir(path) if name.endswith('.npy')}
+            # La date de modification du dossier sert d'horodatage d'accès pour l'éviction
+            os.utime(path)
+        except (OSError, ValueError):
+            result = None
+        with self.lock:
+            if result:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return result or None
+
+    def put(self, key, arrays):
+        os.makedirs(self.directory, exist_ok=True)
+        # L'entrée est écrite dans un dossier temporaire puis renommée : une entrée n'est jamais lue à moitié écrite
+        temporary_path = tempfile.mkdtemp(prefix=key + '.', suffix='.tmp', dir=self.directory)
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(temporary_path, name + '.npy'), np.asarray(array))
+            os.replace(temporary_path, os.path.join(self.directory, key))
+        except OSError:
+            # Entrée déjà écrite par un autre calcul ou disque plein : le résultat n'est simplement pas mis en cache
+            shutil.rmtree(temporary_path, ignore_errors=True)
+        self.evict()
+
+    # Supprime les entrées les moins récemment utilisées jusqu'à ce que la taille du cache ne dépasse plus la taille maximale
+    def evict(self):
+        entries = []
+        total_size = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir() or entry.name.endswith('.tmp'):
+                continue
+            size = sum(file.stat().st_size for file in os.scandir(entry.path))
+            entries.append((entry.stat().st_mtime, size, entry.path))
+            total_size += size
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.is_dir():
+                    shutil.rmtree(entry.path, ignore_errors=True)
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
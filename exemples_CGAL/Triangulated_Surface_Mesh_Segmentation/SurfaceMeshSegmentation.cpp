@@ -1,86 +1,435 @@
 #include "SurfaceMeshSegmentation.hpp"
 
 namespace py = pybind11;
+namespace SMS = CGAL::Surface_mesh_simplification;
 
-SurfaceMeshSegmentation::SurfaceMeshSegmentation(py::dict data) : m_surface_mesh(), m_segments_data(){
-    //Toutes les données, provenant de notre structure de données python, sont castées vers leurs types C++ idoines
-    const std::vector<double> vertices = data["vertices"].cast<std::vector<double>>();
-    const std::vector<int> faces = data["faces"].cast<std::vector<int>>();
-    m_clusters = data["clusters"].cast<int>();
-    m_smoothness = data["smoothness"].cast<float>();
+namespace {
+    //Maillage partagé fourni au constructeur : il doit exister avant que la référence au maillage ne soit initialisée
+    const std::shared_ptr<MeshHandle>& checkedMeshHandle(const std::shared_ptr<MeshHandle>& mesh_handle){
+        if(!mesh_handle){
+            throw std::runtime_error("Aucun maillage n'a été fourni...");
+        }
+        return mesh_handle;
+    }
+}
+
+SurfaceMeshSegmentation::SurfaceMeshSegmentation(py::dict data) : m_mesh_handle(std::make_shared<MeshHandle>()), m_surface_mesh(m_mesh_handle->surface_mesh()), m_proxy_mesh(), m_proxy_faces(), m_segment_on_proxy(false), m_number_of_segments(0), m_clusters(data["clusters"].cast<int>()), m_smoothness(data["smoothness"].cast<float>()), m_phase(PHASE_IDLE), m_processed_faces(0), m_total_faces(0), m_cancel_requested(false){
+    //Conversion des données Python en tableaux numpy contigus (sans copie s'ils le sont déjà)
+    const Clock::time_point start_time = Clock::now();
+    const Float_array vertices = data["vertices"].cast<Float_array>();
+    const Int_array faces = data["faces"].cast<Int_array>();
+    m_timings["conversion"] += elapsed_milliseconds(start_time);
 
-    //création d'un tableau de vector_descriptor qui va contenir les informations des coordonnées des sommets du maillage
-    std::vector<vertex_descriptor> vertices_descriptor;
-    //et réservation de l'espace mémoire adéquat
-    vertices_descriptor.reserve(vertices.size() / 3);
+    this->buildSurfaceMesh(vertices, faces);
+}
+
+SurfaceMeshSegmentation::SurfaceMeshSegmentation(const Float_array& vertices, const Int_array& faces, int clusters, float smoothness) : m_mesh_handle(std::make_shared<MeshHandle>()), m_surface_mesh(m_mesh_handle->surface_mesh()), m_proxy_mesh(), m_proxy_faces(), m_segment_on_proxy(false), m_number_of_segments(0), m_clusters(clusters), m_smoothness(smoothness), m_phase(PHASE_IDLE), m_processed_faces(0), m_total_faces(0), m_cancel_requested(false){
+    this->buildSurfaceMesh(vertices, faces);
+}
 
-    for(int i = 0; i < vertices.size(); i+=3){
-        vertex_descriptor v = m_surface_mesh.add_vertex(Point_3(vertices[i], vertices[i+1], vertices[i+2]));
-        vertices_descriptor.push_back(v);
+SurfaceMeshSegmentation::SurfaceMeshSegmentation(std::shared_ptr<MeshHandle> mesh_handle, int clusters, float smoothness) : m_mesh_handle(checkedMeshHandle(mesh_handle)), m_surface_mesh(m_mesh_handle->surface_mesh()), m_proxy_mesh(), m_proxy_faces(), m_segment_on_proxy(false), m_number_of_segments(0), m_clusters(clusters), m_smoothness(smoothness), m_phase(PHASE_IDLE), m_processed_faces(0), m_total_faces(0), m_cancel_requested(false){
+    //Le maillage est déjà construit (et éventuellement simplifié) : seule sa taille courante est enregistrée
+    this->recordSize("peak_vertices", m_surface_mesh.number_of_vertices());
+    this->recordSize("peak_edges", m_surface_mesh.number_of_edges());
+    this->recordSize("peak_faces", m_surface_mesh.number_of_faces());
+    this->recordSize("mesh_bytes", estimated_mesh_bytes(m_surface_mesh));
+}
+
+std::shared_ptr<MeshHandle> SurfaceMeshSegmentation::getMeshHandle() const{
+    return m_mesh_handle;
+}
+
+void SurfaceMeshSegmentation::buildSurfaceMesh(const Float_array& vertices, const Int_array& faces){
+    //Le maillage est construit par MeshHandle, dont les durées et les tailles sont reprises dans les statistiques
+    m_mesh_handle->build(vertices, faces);
+    for(const auto& timing : m_mesh_handle->timings()){
+        m_timings[timing.first] += timing.second;
+    }
+    for(const auto& size : m_mesh_handle->sizes()){
+        this->recordSize(size.first, size.second);
     }
+}
 
-    for(int i = 0; i < faces.size(); i+=3){
-        //Récupération des indices des sommets de la face courante
-        std::vector<int> face_indices(faces.begin() + i, faces.begin() + i + 3);
+void SurfaceMeshSegmentation::checkTriangleMesh(){
+    const Clock::time_point start_time = Clock::now();
+    const bool is_triangle_mesh = CGAL::is_triangle_mesh(m_surface_mesh);
+    m_timings["is_triangle_mesh"] = elapsed_milliseconds(start_time);
 
-        //Et création de la face du maillage à partir de ces derniers
-        m_surface_mesh.add_face(vertices_descriptor[face_indices[0]], vertices_descriptor[face_indices[1]], vertices_descriptor[face_indices[2]]);
+    if(!is_triangle_mesh)
+    {
+        throw std::runtime_error("Le maillage n'est pas composé que de faces triangulaires...");
     }
 }
 
+void SurfaceMeshSegmentation::recordSize(const std::string& name, std::size_t size){
+    m_sizes[name] = std::max(m_sizes[name], size);
+}
+
 void SurfaceMeshSegmentation::triangulated_surface_mesh_segmentation(){
+    this->computeSdfValues(DEFAULT_CONE_ANGLE, DEFAULT_NUMBER_OF_RAYS, true, 0);
+    this->resegment(m_clusters, m_smoothness);
+}
 
-    if(!CGAL::is_triangle_mesh(m_surface_mesh))
+void SurfaceMeshSegmentation::computeSdfValues(double cone_angle, std::size_t number_of_rays, bool postprocess, unsigned int number_of_threads){
+    MeshHandle::Lock lock(*m_mesh_handle);
+    //Les faces sont parcourues par indice : le maillage partagé, éventuellement simplifié, est compacté au préalable
+    m_mesh_handle->compact();
+    this->checkTriangleMesh();
+    if(number_of_rays == 0){
+        throw std::runtime_error("Le nombre de rayons doit être strictement positif...");
+    }
+    //Une annulation demandée avant le démarrage laisse le maillage (et ses éventuelles valeurs SDF) inchangé
+    if(m_cancel_requested){
+        return;
+    }
+
+    const Clock::time_point start_time = Clock::now();
+    //Les valeurs SDF sont calculées sur le maillage complet : la segmentation ne passe plus par un maillage proxy
+    this->clearProxy();
+    m_timings.erase("proxy");
+    m_timings.erase("transfer");
+    Facet_double_map sdf_property_map = m_surface_mesh.add_property_map<face_descriptor, double>(SDF_PROPERTY_NAME).first;
+
+    bool completed;
     {
-        throw std::runtime_error("Le maillage n'est pas composé que de faces triangulaires...");
+        //Le calcul n'accède à aucun objet Python : le GIL est relâché pour ne pas bloquer l'interpréteur
+        py::gil_scoped_release release;
+        this->startPhase(PHASE_SDF, num_faces(m_surface_mesh));
+        completed = SurfaceMeshSegmentation::sdfValues(m_surface_mesh, sdf_property_map, cone_angle, number_of_rays, postprocess, number_of_threads, m_cancel_requested, m_processed_faces);
     }
+    //Des valeurs SDF partiellement calculées ne doivent pas être segmentées : la propriété est supprimée
+    if(!completed){
+        m_surface_mesh.remove_property_map(sdf_property_map);
+        return;
+    }
+
+    m_timings["sdf"] = elapsed_milliseconds(start_time);
+    m_timings["algorithm"] = m_timings["sdf"];
+    this->recordSize("property_map_bytes", num_faces(m_surface_mesh) * sizeof(double));
+}
+
+void SurfaceMeshSegmentation::computeProxySdfValues(std::size_t face_budget, bool full_resolution_smoothing, double cone_angle, std::size_t number_of_rays, bool postprocess, unsigned int number_of_threads){
+    //Si le maillage possède déjà moins de faces que le budget, le proxy n'apporterait rien
+    if(num_faces(m_surface_mesh) <= face_budget){
+        this->computeSdfValues(cone_angle, number_of_rays, postprocess, number_of_threads);
+        return;
+    }
+    MeshHandle::Lock lock(*m_mesh_handle);
+    m_mesh_handle->compact();
+    this->checkTriangleMesh();
+    if(number_of_rays == 0 || face_budget == 0){
+        throw std::runtime_error("Le nombre de rayons et le budget de faces du proxy doivent être strictement positifs...");
+    }
+
+    if(m_cancel_requested){
+        return;
+    }
+
+    const Clock::time_point start_time = Clock::now();
+    bool completed = false;
+    {
+        py::gil_scoped_release release;
+
+        //Construction du proxy : copie du maillage puis décimation jusqu'au budget de faces
+        //(un maillage triangulé possède environ 3F/2 arêtes)
+        this->startPhase(PHASE_PROXY, 0);
+        Clock::time_point phase_start_time = Clock::now();
+        m_proxy_mesh = m_surface_mesh;
+        this->recordSize("proxy_mesh_bytes", estimated_mesh_bytes(m_proxy_mesh));
+        Cancellable_stop_predicate<SMS::Edge_count_stop_predicate<Surface_mesh>> stop(SMS::Edge_count_stop_predicate<Surface_mesh>(face_budget * 3 / 2), &m_cancel_requested);
+        SMS::edge_collapse(m_proxy_mesh, stop);
+        m_proxy_mesh.collect_garbage();
+        m_timings["proxy"] = elapsed_milliseconds(phase_start_time);
 
-    std::chrono::steady_clock::time_point start_time = std::chrono::steady_clock::now();
-    Facet_double_map sdf_property_map;
-    sdf_property_map = m_surface_mesh.add_property_map<face_descriptor, double>("f:sdf").first;
+        //Calcul des valeurs SDF sur le proxy uniquement
+        Facet_double_map proxy_sdf_property_map = m_proxy_mesh.add_property_map<face_descriptor, double>(SDF_PROPERTY_NAME).first;
+        if(!m_cancel_requested){
+            this->startPhase(PHASE_SDF, num_faces(m_proxy_mesh));
+            phase_start_time = Clock::now();
+            completed = SurfaceMeshSegmentation::sdfValues(m_proxy_mesh, proxy_sdf_property_map, cone_angle, number_of_rays, postprocess, number_of_threads, m_cancel_requested, m_processed_faces);
+            m_timings["sdf"] = elapsed_milliseconds(phase_start_time);
+        }
 
+        //Chaque face du maillage complet est associée à la face du proxy la plus proche de son barycentre
+        //(la propriété du maillage complet n'est créée qu'une fois les valeurs du proxy entièrement calculées)
+        if(completed && !m_cancel_requested){
+            this->startPhase(PHASE_TRANSFER, num_faces(m_surface_mesh));
+            phase_start_time = Clock::now();
+            Facet_double_map sdf_property_map = m_surface_mesh.add_property_map<face_descriptor, double>(SDF_PROPERTY_NAME).first;
+            AABB_tree tree(faces(m_proxy_mesh).first, faces(m_proxy_mesh).second, m_proxy_mesh);
+            tree.accelerate_distance_queries();
+            m_proxy_faces.assign(num_faces(m_surface_mesh), face_descriptor());
+
+            parallel_for(num_faces(m_surface_mesh), number_of_threads, [&](std::size_t begin, std::size_t end){
+                //Les faces sont traitées par blocs, entre lesquels l'annulation est vérifiée et la progression mise à jour
+                for(std::size_t block = begin; block < end && !m_cancel_requested.load(std::memory_order_relaxed); block += TRANSFER_BLOCK_SIZE){
+                    const std::size_t block_end = std::min(end, block + TRANSFER_BLOCK_SIZE);
+                    for(std::size_t i = block; i < block_end; ++i){
+                        const face_descriptor fd(static_cast<Surface_mesh::size_type>(i));
+                        const auto h = m_surface_mesh.halfedge(fd);
+                        const Point_3 centroid = CGAL::centroid(m_surface_mesh.point(m_surface_mesh.source(h)),
+                                                                m_surface_mesh.point(m_surface_mesh.target(h)),
+                                                                m_surface_mesh.point(m_surface_mesh.target(m_surface_mesh.next(h))));
+                        const face_descriptor proxy_face = tree.closest_point_and_primitive(centroid).second;
+                        m_proxy_faces[i] = proxy_face;
+                        //Les valeurs SDF du proxy sont transférées sur le maillage complet
+                        sdf_property_map[fd] = proxy_sdf_property_map[proxy_face];
+                    }
+                    m_processed_faces.fetch_add(block_end - block, std::memory_order_relaxed);
+                }
+            });
+            m_timings["transfer"] = elapsed_milliseconds(phase_start_time);
+            //Un transfert interrompu laisserait des faces sans valeur SDF : la propriété est supprimée
+            completed = !m_cancel_requested;
+            if(!completed){
+                m_surface_mesh.remove_property_map(sdf_property_map);
+            }
+        }
+    }
+    if(!completed){
+        this->clearProxy();
+        return;
+    }
+    //Sans lissage sur le maillage complet, la segmentation est calculée sur le proxy puis transférée
+    m_segment_on_proxy = !full_resolution_smoothing;
+
+    m_timings["algorithm"] = elapsed_milliseconds(start_time);
+    m_counts["proxy_faces"] = num_faces(m_proxy_mesh);
+    this->recordSize("property_map_bytes", num_faces(m_surface_mesh) * (sizeof(double) + sizeof(face_descriptor)) + num_faces(m_proxy_mesh) * sizeof(double));
+}
+
+bool SurfaceMeshSegmentation::sdfValues(const Surface_mesh& mesh, Facet_double_map sdf_property_map, double cone_angle, std::size_t number_of_rays, bool postprocess, unsigned int number_of_threads, const std::atomic<bool>& cancel_requested, std::atomic<std::size_t>& processed_faces){
     // compute SDF values
-    // We can't use default parameters for number of rays, and cone angle
-    // and the postprocessing
-    CGAL::sdf_values(m_surface_mesh, sdf_property_map, 2.0 / 3.0 * CGAL_PI, 25, true);
+    // Les valeurs brutes sont calculées par la fonction publique CGAL::sdf_values, répartie entre les threads par Intel TBB si
+    // le module a été compilé avec (Parallel_if_available_tag), séquentielle sinon. Le calcul n'étant pas interruptible,
+    // l'annulation n'est prise en compte qu'une fois toutes les valeurs calculées. Les mêmes valeurs sont obtenues quel que
+    // soit le nombre de threads, le post-traitement (lissage et normalisation) étant appliqué une fois les valeurs brutes calculées
+
+    // number_of_threads : 1 pour un calcul séquentiel, 0 pour utiliser tous les coeurs, n pour n threads
+#ifdef CGAL_LINKED_WITH_TBB
+    if(number_of_threads != 1){
+        tbb::task_arena arena(number_of_threads == 0 ? static_cast<int>(tbb::task_arena::automatic) : static_cast<int>(number_of_threads));
+        arena.execute([&](){
+            CGAL::sdf_values<CGAL::Parallel_if_available_tag>(mesh, sdf_property_map, cone_angle, number_of_rays, false);
+        });
+    }
+    else
+#endif
+    {
+        CGAL::sdf_values<CGAL::Sequential_tag>(mesh, sdf_property_map, cone_angle, number_of_rays, false);
+    }
+    processed_faces = num_faces(mesh);
 
+    if(cancel_requested){
+        return false;
+    }
+    if(postprocess){
+        CGAL::sdf_values_postprocessing(mesh, sdf_property_map);
+    }
+    return true;
+}
+
+void SurfaceMeshSegmentation::clearProxy(){
+    m_proxy_mesh.clear();
+    m_proxy_faces.clear();
+    m_segment_on_proxy = false;
+}
+
+py::dict SurfaceMeshSegmentation::getStatistics() const{
+    //Durées des phases (conversion, mesh_build, is_triangle_mesh, proxy, sdf, transfer, segmentation, algorithm, export)
+    //en millisecondes, tailles maximales des allocations (nombres d'éléments et octets) et nombres d'éléments produits
+    //(proxy_faces, number_of_segments)
+    py::dict statistics;
+    statistics["timings_ms"] = m_timings;
+    statistics["sizes"] = m_sizes;
+    statistics["counts"] = m_counts;
+    return statistics;
+}
+
+std::string SurfaceMeshSegmentation::getPhase() const{
+    switch(m_phase.load()){
+        case PHASE_PROXY:
+            return "proxy";
+        case PHASE_SDF:
+            return "sdf";
+        case PHASE_TRANSFER:
+            return "transfer";
+        case PHASE_SEGMENTATION:
+            return "segmentation";
+        case PHASE_DONE:
+            return "done";
+        default:
+            return "idle";
+    }
+}
+
+void SurfaceMeshSegmentation::startPhase(Segmentation_phase phase, std::size_t total_faces){
+    //Le compteur est remis à zéro avant que la nouvelle phase ne soit visible depuis le thread principal
+    m_processed_faces = 0;
+    m_total_faces = total_faces;
+    m_phase = phase;
+}
+
+std::pair<std::size_t, std::size_t> SurfaceMeshSegmentation::getProgress() const{
+    //Nombre de faces traitées par la phase courante et nombre total de faces de cette phase
+    //(0 pour les phases dont la progression n'est pas suivie : décimation du proxy et segmentation)
+    return std::make_pair(m_processed_faces.load(), m_total_faces.load());
+}
+
+void SurfaceMeshSegmentation::cancel(){
+    //L'annulation est prise en compte entre deux phases, pendant la décimation du proxy et le transfert des valeurs SDF
+    m_cancel_requested = true;
+}
+
+bool SurfaceMeshSegmentation::isCancelled() const{
+    return m_cancel_requested.load();
+}
+
+std::size_t SurfaceMeshSegmentation::resegment(int clusters, float smoothness){
+    //Seule cette étape dépend des paramètres 'clusters' et 'smoothness' : les valeurs SDF déjà calculées sont réutilisées
+    MeshHandle::Lock lock(*m_mesh_handle);
+    const std::pair<Facet_double_map, bool> sdf_property_map = m_surface_mesh.property_map<face_descriptor, double>(SDF_PROPERTY_NAME);
+    if(!sdf_property_map.second){
+        throw std::runtime_error("Les valeurs SDF du maillage n'ont pas encore été calculées...");
+    }
+    m_clusters = clusters;
+    m_smoothness = smoothness;
+
+    const Clock::time_point start_time = Clock::now();
     // create a property-map for segment-ids
-    Facet_int_map segment_property_map = m_surface_mesh.add_property_map<face_descriptor,std::size_t>("f:sid").first;
+    Facet_int_map segment_property_map = m_surface_mesh.add_property_map<face_descriptor,std::size_t>(SEGMENT_PROPERTY_NAME).first;
 
-    // segment the mesh using default parameters for number of levels, and smoothing lambda
-    // Any other scalar values can be used instead of using SDF values computed using the CGAL function
-    std::size_t number_of_segments = CGAL::segmentation_from_sdf_values(m_surface_mesh, sdf_property_map, segment_property_map, m_clusters, m_smoothness);
-    std::chrono::steady_clock::time_point end_time = std::chrono::steady_clock::now();
-    std::cout << "Number of segments: " << number_of_segments << std::endl;
-    std::cout << "Time elapsed: " << std::chrono::duration_cast<std::chrono::milliseconds>(end_time - start_time).count() << "ms" << std::endl;
+    if(m_cancel_requested){
+        return m_number_of_segments;
+    }
 
-    m_segments_data["number_of_segments"] = number_of_segments;  
+    {
+        py::gil_scoped_release release;
+        this->startPhase(PHASE_SEGMENTATION, 0);
+        if(m_segment_on_proxy){
+            //Segmentation du proxy puis transfert des identifiants des segments vers les faces du maillage complet
+            Facet_double_map proxy_sdf_property_map = m_proxy_mesh.property_map<face_descriptor, double>(SDF_PROPERTY_NAME).first;
+            Facet_int_map proxy_segment_property_map = m_proxy_mesh.add_property_map<face_descriptor, std::size_t>(SEGMENT_PROPERTY_NAME).first;
+            m_number_of_segments = CGAL::segmentation_from_sdf_values(m_proxy_mesh, proxy_sdf_property_map, proxy_segment_property_map, m_clusters, m_smoothness);
+
+            for(const auto& fd : faces(m_surface_mesh)){
+                segment_property_map[fd] = proxy_segment_property_map[m_proxy_faces[fd.idx()]];
+            }
+        }
+        else{
+            // segment the mesh using default parameters for number of levels, and smoothing lambda
+            // Any other scalar values can be used instead of using SDF values computed using the CGAL function
+            m_number_of_segments = CGAL::segmentation_from_sdf_values(m_surface_mesh, sdf_property_map.first, segment_property_map, m_clusters, m_smoothness);
+        }
+        m_phase = PHASE_DONE;
+    }
+    //La segmentation pouvant être recalculée à partir des mêmes valeurs SDF, 'algorithm' ne cumule que le calcul SDF et la dernière segmentation
+    m_timings["segmentation"] = elapsed_milliseconds(start_time);
+    double algorithm_time = 0.0;
+    for(const char* phase : {"proxy", "sdf", "transfer", "segmentation"}){
+        const auto timing = m_timings.find(phase);
+        if(timing != m_timings.end()){
+            algorithm_time += timing->second;
+        }
+    }
+    m_timings["algorithm"] = algorithm_time;
+    m_counts["number_of_segments"] = m_number_of_segments;
+    this->recordSize("property_map_bytes", num_faces(m_surface_mesh) * (sizeof(double) + sizeof(std::size_t)));
 
-    this->updateSegmentsIds();
+    return m_number_of_segments;
 }
 
-void SurfaceMeshSegmentation::updateSegmentsIds(){
+py::array_t<double> SurfaceMeshSegmentation::getSdfValues(){
+    MeshHandle::Lock lock(*m_mesh_handle);
+    const std::pair<Facet_double_map, bool> sdf_property_map = m_surface_mesh.property_map<face_descriptor, double>(SDF_PROPERTY_NAME);
+    if(!sdf_property_map.second){
+        throw std::runtime_error("Les valeurs SDF du maillage n'ont pas encore été calculées...");
+    }
+
+    //Tableau numpy contenant une valeur SDF par face, dans l'ordre des faces du maillage d'entrée
+    py::array_t<double> sdf_values(static_cast<py::ssize_t>(num_faces(m_surface_mesh)));
+    double* sdf_values_data = sdf_values.mutable_data();
+
+    for(const auto& fd : faces(m_surface_mesh)){
+        *sdf_values_data++ = sdf_property_map.first[fd];
+    }
+
+    return sdf_values;
+}
+
+void SurfaceMeshSegmentation::setSdfValues(const Double_array& sdf_values){
+    MeshHandle::Lock lock(*m_mesh_handle);
+    m_mesh_handle->compact();
+    if(sdf_values.size() != static_cast<py::ssize_t>(num_faces(m_surface_mesh))){
+        throw std::runtime_error("Le nombre de valeurs SDF ne correspond pas au nombre de faces du maillage...");
+    }
+
+    //Chargement de valeurs SDF déjà calculées (par exemple depuis un cache) : le lancer de rayons est alors évité
+    Facet_double_map sdf_property_map = m_surface_mesh.add_property_map<face_descriptor, double>(SDF_PROPERTY_NAME).first;
+    this->clearProxy();
+    const double* sdf_values_data = sdf_values.data();
+
+    for(const auto& fd : faces(m_surface_mesh)){
+        sdf_property_map[fd] = *sdf_values_data++;
+    }
+}
+
+py::array_t<std::uint32_t> SurfaceMeshSegmentation::getSegmentsIds(){
     //Récupération de la property_map contenant les identifiants des segments obtenus
-    const auto& segment_property_map = m_surface_mesh.property_map<face_descriptor, std::size_t>("f:sid").first;
-    std::vector<size_t> segments_ids;
-    segments_ids.reserve(num_faces(m_surface_mesh));
+    MeshHandle::Lock lock(*m_mesh_handle);
+    const std::pair<Facet_int_map, bool> segment_property_map = m_surface_mesh.property_map<face_descriptor, std::size_t>(SEGMENT_PROPERTY_NAME);
+    if(!segment_property_map.second){
+        throw std::runtime_error("La segmentation du maillage n'a pas encore été calculée...");
+    }
+
+    const Clock::time_point start_time = Clock::now();
+    //Tableau numpy contenant un identifiant de segment par face, dans l'ordre des faces du maillage d'entrée
+    py::array_t<std::uint32_t> segments_ids(static_cast<py::ssize_t>(num_faces(m_surface_mesh)));
+    std::uint32_t* segments_ids_data = segments_ids.mutable_data();
 
     for(const auto& fd : faces(m_surface_mesh)){
-        segments_ids.push_back(segment_property_map[fd]);
+        *segments_ids_data++ = static_cast<std::uint32_t>(segment_property_map.first[fd]);
     }
 
-    m_segments_data["segments_ids"] = segments_ids;
+    m_timings["export"] = elapsed_milliseconds(start_time);
+    return segments_ids;
 }
 
 py::dict SurfaceMeshSegmentation::getSegmentsData(){
-    return m_segments_data;
+    py::dict segments_data;
+    segments_data["number_of_segments"] = m_number_of_segments;
+    segments_data["segments_ids"] = this->getSegmentsIds();
+    return segments_data;
 }
 
 PYBIND11_MODULE(surface_mesh_segmentation, handle){
     handle.doc() = "Classe implémentant l'algorithme 'Triangulated Surface Mesh Segmentation' de Ilker O. Yaz and Sébastien Loriot.";
+    // Version du module : elle intervient dans la clé du cache des résultats des extensions
+    handle.attr("__version__") = SURFACE_MESH_SEGMENTATION_VERSION;
+    // Maillage partagé avec le module de simplification
+    register_mesh_handle(handle);
 
     py::class_<SurfaceMeshSegmentation>(handle, "SurfaceMeshSegmentation")
         .def(py::init<py::dict>())
+        .def(py::init<std::shared_ptr<MeshHandle>, int, float>(), py::arg("mesh_handle").none(false), py::arg("clusters"), py::arg("smoothness"))
+        .def(py::init<const Float_array&, const Int_array&, int, float>(), py::arg("vertices"), py::arg("faces"), py::arg("clusters"), py::arg("smoothness"))
+        .def("getMeshHandle", &SurfaceMeshSegmentation::getMeshHandle)
         .def("triangulated_surface_mesh_segmentation", &SurfaceMeshSegmentation::triangulated_surface_mesh_segmentation)
-        .def("getSegmentsData", &SurfaceMeshSegmentation::getSegmentsData);
+        .def("computeSdfValues", &SurfaceMeshSegmentation::computeSdfValues,
+             py::arg("cone_angle") = DEFAULT_CONE_ANGLE, py::arg("number_of_rays") = DEFAULT_NUMBER_OF_RAYS,
+             py::arg("postprocess") = true, py::arg("number_of_threads") = 0)
+        .def("computeProxySdfValues", &SurfaceMeshSegmentation::computeProxySdfValues,
+             py::arg("face_budget"), py::arg("full_resolution_smoothing") = true,
+             py::arg("cone_angle") = DEFAULT_CONE_ANGLE, py::arg("number_of_rays") = DEFAULT_NUMBER_OF_RAYS,
+             py::arg("postprocess") = true, py::arg("number_of_threads") = 0)
+        .def("resegment", &SurfaceMeshSegmentation::resegment, py::arg("clusters"), py::arg("smoothness"))
+        .def("getSdfValues", &SurfaceMeshSegmentation::getSdfValues)
+        .def("setSdfValues", &SurfaceMeshSegmentation::setSdfValues, py::arg("sdf_values"))
+        .def("getSegmentsIds", &SurfaceMeshSegmentation::getSegmentsIds)
+        .def("getSegmentsData", &SurfaceMeshSegmentation::getSegmentsData)
+        .def("getStatistics", &SurfaceMeshSegmentation::getStatistics)
+        .def("getPhase", &SurfaceMeshSegmentation::getPhase)
+        .def("getProgress", &SurfaceMeshSegmentation::getProgress)
+        .def("cancel", &SurfaceMeshSegmentation::cancel)
+        .def("isCancelled", &SurfaceMeshSegmentation::isCancelled);
 }
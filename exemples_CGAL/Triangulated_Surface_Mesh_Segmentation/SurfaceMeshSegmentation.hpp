@@ -3,37 +3,116 @@
 
 #include <vector>
 #include <chrono>
-#include <iostream>
+#include <map>
+#include <cstdint>
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 #include <stdexcept>
+#include <thread>
+#include <algorithm>
+#include <atomic>
+#include <string>
+#include <memory>
+#include <utility>
+
+#include "MeshHandle.hpp"
+#include "AlgorithmUtils.hpp"
 
-#include <CGAL/Exact_predicates_inexact_constructions_kernel.h>
-#include <CGAL/Surface_mesh.h>
 #include <CGAL/mesh_segmentation.h>
 #include <CGAL/Polygon_mesh_processing/IO/polygon_mesh_io.h>
 #include <CGAL/property_map.h>
+#include <CGAL/AABB_tree.h>
+#include <CGAL/AABB_traits.h>
+#include <CGAL/AABB_face_graph_triangle_primitive.h>
+#include <CGAL/Surface_mesh_simplification/edge_collapse.h>
+#include <CGAL/Surface_mesh_simplification/Policies/Edge_collapse/Edge_count_stop_predicate.h>
+
+#include <CGAL/tags.h>
 
-typedef CGAL::Exact_predicates_inexact_constructions_kernel      Kernel;
-typedef Kernel::Point_3                                          Point_3;
-typedef CGAL::Surface_mesh<Point_3>                              Surface_mesh;
-typedef boost::graph_traits<Surface_mesh>::vertex_descriptor     vertex_descriptor;
-typedef boost::graph_traits<Surface_mesh>::face_descriptor       face_descriptor;
+#ifdef CGAL_LINKED_WITH_TBB
+#include <tbb/task_arena.h>
+#endif
+
+// Le noyau, le type de maillage et les tableaux numpy sont définis par MeshHandle.hpp, partagé avec le module de simplification
 typedef Surface_mesh::Property_map<face_descriptor,double>       Facet_double_map;
 typedef Surface_mesh::Property_map<face_descriptor, std::size_t> Facet_int_map;
+typedef CGAL::AABB_face_graph_triangle_primitive<Surface_mesh>   AABB_primitive;
+typedef CGAL::AABB_traits<Kernel, AABB_primitive>                AABB_traits;
+typedef CGAL::AABB_tree<AABB_traits>                             AABB_tree;
+typedef pybind11::array_t<double, pybind11::array::c_style | pybind11::array::forcecast>       Double_array;
+
+// Version du module, à incrémenter à chaque modification des résultats de l'algorithme
+const char* const SURFACE_MESH_SEGMENTATION_VERSION = "2.2.0";
+
+// Paramètres par défaut du calcul des valeurs SDF (angle du cône et nombre de rayons lancés par face)
+const double DEFAULT_CONE_ANGLE = 2.0 / 3.0 * CGAL_PI;
+const std::size_t DEFAULT_NUMBER_OF_RAYS = 25;
+// Nombre de faces transférées du proxy au maillage complet d'un seul tenant (entre deux vérifications de l'annulation)
+const std::size_t TRANSFER_BLOCK_SIZE = 256;
+
+// Phases successives de l'algorithme, consultables depuis un autre thread pour rendre compte de la progression
+enum Segmentation_phase{
+    PHASE_IDLE = 0,
+    PHASE_PROXY,
+    PHASE_SDF,
+    PHASE_TRANSFER,
+    PHASE_SEGMENTATION,
+    PHASE_DONE
+};
 
 class SurfaceMeshSegmentation{
     public:
     explicit SurfaceMeshSegmentation(pybind11::dict data);
+    SurfaceMeshSegmentation(const Float_array& vertices, const Int_array& faces, int clusters, float smoothness);
+    SurfaceMeshSegmentation(std::shared_ptr<MeshHandle> mesh_handle, int clusters, float smoothness);
+    std::shared_ptr<MeshHandle> getMeshHandle() const;
     void triangulated_surface_mesh_segmentation();
-    void updateSegmentsIds();
+    void computeSdfValues(double cone_angle, std::size_t number_of_rays, bool postprocess, unsigned int number_of_threads);
+    void computeProxySdfValues(std::size_t face_budget, bool full_resolution_smoothing, double cone_angle, std::size_t number_of_rays, bool postprocess, unsigned int number_of_threads);
+    std::size_t resegment(int clusters, float smoothness);
+    pybind11::array_t<double> getSdfValues();
+    void setSdfValues(const Double_array& sdf_values);
+    pybind11::array_t<std::uint32_t> getSegmentsIds();
     pybind11::dict getSegmentsData();
+    pybind11::dict getStatistics() const;
+    std::string getPhase() const;
+    std::pair<std::size_t, std::size_t> getProgress() const;
+    void cancel();
+    bool isCancelled() const;
 
     private:
-    Surface_mesh m_surface_mesh;
-    pybind11::dict m_segments_data;
+    void buildSurfaceMesh(const Float_array& vertices, const Int_array& faces);
+    void clearProxy();
+    void checkTriangleMesh();
+    void recordSize(const std::string& name, std::size_t size);
+    void startPhase(Segmentation_phase phase, std::size_t total_faces);
+    static bool sdfValues(const Surface_mesh& mesh, Facet_double_map sdf_property_map, double cone_angle, std::size_t number_of_rays, bool postprocess, unsigned int number_of_threads, const std::atomic<bool>& cancel_requested, std::atomic<std::size_t>& processed_faces);
+
+    // Maillage segmenté en place : construit par le constructeur à partir des tableaux fournis, ou partagé avec d'autres
+    // traitements (simplification) lorsqu'un MeshHandle est fourni. Les valeurs SDF et les segments y sont stockés
+    // comme propriétés des faces, supprimées par MeshHandle dès que sa géométrie est modifiée
+    std::shared_ptr<MeshHandle> m_mesh_handle;
+    Surface_mesh& m_surface_mesh;
+    // Maillage décimé sur lequel sont calculées les valeurs SDF en mode proxy,
+    // et face du proxy la plus proche de chacune des faces du maillage complet
+    Surface_mesh m_proxy_mesh;
+    std::vector<face_descriptor> m_proxy_faces;
+    bool m_segment_on_proxy;
+    std::size_t m_number_of_segments;
     int m_clusters;
     float m_smoothness;
+    // Phase courante, nombre de faces traitées par cette phase (calcul SDF et transfert) sur son nombre total de faces
+    // et demande d'annulation, consultés depuis le thread Python principal pendant les calculs
+    std::atomic<int> m_phase;
+    std::atomic<std::size_t> m_processed_faces;
+    std::atomic<std::size_t> m_total_faces;
+    std::atomic<bool> m_cancel_requested;
+    // Statistiques de performance : durée de chaque phase (en millisecondes), tailles maximales des allocations
+    // et nombres d'éléments produits
+    std::map<std::string, double> m_timings;
+    std::map<std::string, std::size_t> m_sizes;
+    std::map<std::string, std::size_t> m_counts;
 };
 
 #endif
@@ -1,7 +1,7 @@
 bl_info = {
     'name': 'Ilker O. Yaz and Sébastien Loriot \'Triangulated Surface Mesh Segmentation\' implementation algorithm',
     'author': 'Richard Leestmans',
-    'version': (2, 0),
+    'version': (2, 1),
     'blender': (4, 0, 0),
     'location': 'VIEW3D > UI > Segmentation',
     'description': 'Implémentation de l\'algorithme de Segmentation (décomposition d\'un maillage en sous-maillages plus petits et significatifs) utilisant la \'function Shape Diameter\' (SDF) pour Blender.',
@@ -11,105 +11,358 @@ bl_info = {
 }
 
 import bpy
-import bmesh
 import numpy as np
-import random
+import colorsys
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import surface_mesh_segmentation
 from surface_mesh_segmentation import SurfaceMeshSegmentation
+# Modules communs aux deux extensions (dossier Common), installés à côté des modules compilés
+from execution_statistics import ExecutionStatistics, draw_statistics
+from mesh_buffers import extract_mesh_buffers, geometry_hash, polygon_segments_ids
+from phase_timer import PhaseTimer
+from result_cache import ResultCache
+# Registre des maillages CGAL partagés avec l'extension de simplification
+import mesh_handle_registry
 
-# Permet de trianguler un maillage en fonction du contexte utilisé
-def triangulate_mesh(context, object):
-    if not object or object.type != 'MESH':
-        raise RuntimeError('Aucun maillage n\'est sélectionné')
-    else:
-        mesh = object.data
-        # Si nous nous situons en mode 'Objet'
-        if(context.mode == 'OBJECT'):
-            bm = bmesh.new()
-            bm.from_mesh(mesh)
-        # Sinon si nous nous situons en mode 'Edition'
-        elif(context.mode == 'EDIT_MESH'):
-            bm = bmesh.from_edit_mesh(mesh)
-        # Sinon nous ne nous situons ni en mode 'Objet' ni en mode 'Edition'
+# Masque des polygones sélectionnés du maillage (les sélections du mode 'Edition' y sont reportées par extract_mesh_buffers)
+def polygon_selection(mesh):
+    selection = np.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get('select', selection)
+    return selection
+
+
+# Restreint un maillage aux triangles de 'region' (masque) : les sommets inutilisés sont retirés et les faces renumérotées
+def restrict_to_region(vertices, faces, region):
+    used_vertices, local_faces = np.unique(faces.reshape(-1, 3)[region], return_inverse=True)
+    return np.ascontiguousarray(vertices.reshape(-1, 3)[used_vertices]).ravel(), np.ascontiguousarray(local_faces, dtype=np.int32).ravel()
+
+
+# Statistiques de la dernière exécution de l'algorithme, affichées dans le panneau
+execution_statistics = ExecutionStatistics(bl_info['version'])
+
+
+# Cache LRU des valeurs SDF calculées, indexé par le nom de l'objet et l'empreinte de sa géométrie
+class SdfCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        sdf_values = self.entries.get(key)
+        # L'entrée consultée devient la plus récemment utilisée
+        if sdf_values is not None:
+            self.entries.move_to_end(key)
+        return sdf_values
+
+    def put(self, key, sdf_values):
+        self.entries[key] = sdf_values
+        self.entries.move_to_end(key)
+        # Éviction des entrées les moins récemment utilisées
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+# Nombre maximal de maillages dont les valeurs SDF sont conservées en mémoire
+SDF_CACHE_MAX_ENTRIES = 8
+sdf_cache = SdfCache(SDF_CACHE_MAX_ENTRIES)
+
+
+# Version des résultats (module C++ et extension) : une nouvelle version invalide les entrées du cache
+RESULTS_VERSION = (getattr(surface_mesh_segmentation, '__version__', 'inconnue'), bl_info['version'])
+result_cache = ResultCache(os.path.join(tempfile.gettempdir(), 'mesh_segmentation_cache'))
+
+
+# Retourne le cache des résultats configuré selon les propriétés de la scène, ou None s'il est désactivé
+def get_result_cache(context):
+    properties = context.scene.segmentation_properties
+    if not properties.use_result_cache:
+        return None
+    result_cache.configure(bpy.path.abspath(properties.cache_directory), properties.cache_size * 1024 * 1024)
+    return result_cache
+
+
+# Statistiques d'une exécution servie par le cache : ni la conversion du maillage ni l'algorithme n'ont été exécutés
+def cached_statistics(start_time):
+    return {'timings_ms': {'cache_load': (time.perf_counter() - start_time) * 1000.0}, 'sizes': {}, 'counts': {}}
+
+
+# Maillage CGAL de l'objet 'object_name' tiré du registre partagé avec l'extension de simplification : un objet qui vient d'y être
+# simplifié est segmenté sans nouvelle conversion (None si l'objet n'est pas nommé ou si le module compilé ne le permet pas)
+def acquire_mesh_handle(object_name, vertices, faces):
+    if object_name is None or not hasattr(surface_mesh_segmentation, 'MeshHandle'):
+        return None
+    return mesh_handle_registry.registry.acquire(object_name, vertices, faces, surface_mesh_segmentation.MeshHandle)
+
+
+# Prépare la segmentation d'un objet depuis le thread principal : extraction des tableaux du maillage et lecture des propriétés
+# Retourne un dictionnaire contenant tout ce dont run_segmentation a besoin, sans référence à bpy
+# 'timings' reçoit les durées des étapes Python de la segmentation (extraction des tableaux, application du résultat)
+def prepare_segmentation(context, object, timings=None):
+    timings = {} if timings is None else timings
+    # Nous commençons par préparer les données à envoyer au code C++ à savoir les indices des sommets par face et les coordonnées des sommets
+    # Le maillage de l'objet est triangulé à la lecture, sans être modifié
+    with PhaseTimer(timings, 'extraction'):
+        vertices, faces, triangle_polygons = extract_mesh_buffers(object)
+
+    # Nous récupérons ensuite les deux propriétés de l'algorithme 'clusters' et 'smoothness'
+    properties = context.scene.segmentation_properties
+
+    # En mode 'Edition', seules les faces sélectionnées peuvent être segmentées : les autres ne sont pas envoyées au code C++
+    selected_polygons = None
+    if properties.selection_only and object.mode == 'EDIT':
+        with PhaseTimer(timings, 'extraction'):
+            selected_polygons = polygon_selection(object.data)
+            region = selected_polygons[triangle_polygons]
+            if not region.any():
+                raise RuntimeError('Aucune face n\'est sélectionnée')
+            vertices, faces = restrict_to_region(vertices, faces, region)
+            triangle_polygons = triangle_polygons[region]
+    # Paramètres du lancer de rayons utilisés pour le calcul des valeurs SDF
+    sdf_parameters = {
+        'cone_angle': properties.cone_angle,
+        'number_of_rays': properties.number_of_rays,
+        'postprocess': properties.postprocess,
+        # 1 : calcul séquentiel, 0 : l'ensemble des coeurs disponibles, n : n threads
+        'number_of_threads': properties.threads if properties.parallel else 1,
+    }
+    # Le mode proxy n'est utilisé que si le maillage dépasse le budget de faces du proxy
+    use_proxy = properties.use_proxy and len(faces) // 3 > properties.proxy_face_budget
+
+    # Les valeurs SDF ne dépendent que de la géométrie et des paramètres du lancer de rayons : si elles ont déjà été calculées
+    # pour ce maillage, elles sont rechargées depuis le cache et seule la segmentation (clusters, finesse) est recalculée
+    # En mode proxy sans lissage, la segmentation est calculée sur le proxy lui-même : les valeurs SDF transférées ne sont pas mises en cache
+    use_cache = not use_proxy or properties.proxy_smoothing
+    cache_key = (object.name, geometry_hash(vertices, faces), properties.number_of_rays, properties.cone_angle, properties.postprocess,
+                 properties.proxy_face_budget if use_proxy else 0)
+
+    # Un résultat déjà présent dans le cache disque est réutilisé sans conversion du maillage ni exécution de l'algorithme
+    # (la correspondance entre triangles et polygones fait partie de la clé : le résultat est exprimé par polygone)
+    start_time = time.perf_counter()
+    cache = get_result_cache(context)
+    result_key = None
+    cached_result = None
+    if cache is not None:
+        result_key = ResultCache.key((vertices, faces, triangle_polygons),
+                                     ('segmentation', properties.clusters, properties.smoothness, properties.number_of_rays, properties.cone_angle,
+                                      properties.postprocess, use_proxy, properties.proxy_face_budget if use_proxy else 0,
+                                      properties.proxy_smoothing if use_proxy else True, RESULTS_VERSION))
+        result = cache.get(result_key)
+        if result is not None:
+            cached_result = (result['segments_ids'], int(result['number_of_segments']))
+
+    # Une sélection, restreinte à ses faces, ne correspond pas au maillage de l'objet : elle n'utilise pas le registre
+    mesh_handle = None
+    cgal_mesh = None
+    if cached_result is None:
+        mesh_handle = acquire_mesh_handle(object.name if selected_polygons is None else None, vertices, faces)
+        if mesh_handle is None:
+            cgal_mesh = SurfaceMeshSegmentation(vertices, faces, properties.clusters, properties.smoothness)
         else:
-            bpy.ops.object.mode_set(mode='OBJECT')
-            
-        # On vérifie que la maillage ne possède pas de doublons en supprimant les sommets qui se superposent
-        bmesh.ops.remove_doubles(bm, verts=bm.verts[:], dist=0.0001)
-        # et on triangule l'ensemble des faces du maillage
-        bmesh.ops.triangulate(bm, faces=bm.faces[:])
-        
-        # On met à jour le mesh dans le viewport selon le mode dans lequel nous nous situons
-        # si nous nous trouvons en mode 'Objet'
-        if(context.mode == 'OBJECT'):
-            bm.to_mesh(mesh)
-            bm.free()
-        # sinon nous nous trouvons en mode 'Edition'
+            cgal_mesh = SurfaceMeshSegmentation(mesh_handle, properties.clusters, properties.smoothness)
+
+    return {
+        'cgal_mesh': cgal_mesh,
+        # maillage partagé et nombre de modifications de sa géométrie lors de la préparation : il ne doit pas être simplifié
+        # avant le début de la segmentation
+        'mesh_handle': mesh_handle,
+        'mesh_revision': mesh_handle.revision() if mesh_handle is not None else None,
+        'sdf_parameters': sdf_parameters,
+        'clusters': properties.clusters,
+        'smoothness': properties.smoothness,
+        'use_proxy': use_proxy,
+        'proxy_face_budget': properties.proxy_face_budget,
+        'proxy_smoothing': properties.proxy_smoothing,
+        'use_cache': use_cache,
+        'cache_key': cache_key,
+        'object_name': object.name,
+        'timings': timings,
+        # correspondance entre les triangles envoyés au code C++ et les polygones du maillage de l'objet
+        'triangle_polygons': triangle_polygons,
+        'number_of_polygons': len(object.data.polygons),
+        # polygones sélectionnés (None si l'ensemble du maillage est segmenté) : seuls leurs segments sont affichés
+        'selected_polygons': selected_polygons,
+        'result_cache': cache,
+        'result_key': result_key,
+        'cached_result': cached_result,
+        'cached_statistics': cached_statistics(start_time) if cached_result is not None else None,
+    }
+
+
+# Retourne les statistiques de la segmentation : celles du code C++ ou, pour un résultat issu du cache, celles de sa lecture
+def job_statistics(job):
+    if job['cgal_mesh'] is None:
+        return job['cached_statistics']
+    return job['cgal_mesh'].getStatistics()
+
+
+# Exécute la segmentation préparée par prepare_segmentation et retourne les identifiants des segments des polygones de l'objet
+# et leur nombre (None si la segmentation a été annulée). Cette fonction n'accède pas à bpy : elle peut être exécutée depuis un thread secondaire
+def run_segmentation(job):
+    if job['cached_result'] is not None:
+        return job['cached_result']
+    if job['mesh_handle'] is not None and job['mesh_handle'].revision() != job['mesh_revision']:
+        raise RuntimeError('Le maillage a été modifié depuis la préparation de la segmentation')
+    cgal_mesh = job['cgal_mesh']
+    sdf_values = sdf_cache.get(job['cache_key']) if job['use_cache'] else None
+    if sdf_values is not None:
+        cgal_mesh.setSdfValues(sdf_values)
+    else:
+        if job['use_proxy']:
+            cgal_mesh.computeProxySdfValues(job['proxy_face_budget'], job['proxy_smoothing'], **job['sdf_parameters'])
         else:
-            bmesh.update_edit_mesh(mesh)
-
-
-def mesh_segmentation(context, object):
-    # Récupération du maillage de l'objet courant
-    mesh = object.data  
-    # Nous commençons par préparer les données à envoyer au code C++ à savoir la liste des indices des sommets par face et les coordonnées des sommets ainsi que le facteur de décimation de l'algorithme
-    # Nous créons pour cela une structure de données sous la forme d'un dictionnaire python
-    data = {}
-    # commençons par les indices des sommets des faces
-    faces = np.zeros((len(mesh.polygons) * 3), dtype=np.int32)
-    mesh.polygons.foreach_get('vertices', faces)
-    data['faces'] = faces
-    
-    vertices = np.zeros((len(mesh.vertices) * 3), dtype=np.float32)
-    mesh.vertices.foreach_get('co', vertices)
-    # et pour les coordonnées des sommets du maillage
-    data['vertices'] = vertices
+            cgal_mesh.computeSdfValues(**job['sdf_parameters'])
+        # Des valeurs SDF issues d'un calcul annulé ne doivent pas être mises en cache
+        if cgal_mesh.isCancelled():
+            return None
+        if job['use_cache']:
+            sdf_cache.put(job['cache_key'], cgal_mesh.getSdfValues())
+    cgal_mesh.resegment(job['clusters'], job['smoothness'])
+    if cgal_mesh.isCancelled():
+        return None
 
-    # Nous récupérons ensuite les deux propriétés de l'algorithme 'clusters' et 'smoothness'
+    # Récupération des données issues de la segmentation du maillage
+    segments_data = cgal_mesh.getSegmentsData()
+    # Récupération du tableau des identifiants des segments obtenus et du nombre de segments obtenus, rapportés aux polygones
+    # de l'objet à travers les triangles effectivement ajoutés au maillage CGAL
+    polygons_segments_ids = polygon_segments_ids(segments_data.get('segments_ids'), cgal_mesh.getMeshHandle().get_input_faces(),
+                                                 job['triangle_polygons'], job['number_of_polygons'])
+    if job['result_cache'] is not None:
+        job['result_cache'].put(job['result_key'], {'segments_ids': polygons_segments_ids,
+                                                    'number_of_segments': np.array(segments_data.get('number_of_segments'))})
+    return polygons_segments_ids, segments_data.get('number_of_segments')
+
+
+# Affiche les segments obtenus sur le maillage selon le mode choisi par l'utilisateur
+# Si 'selected_polygons' est fourni, seules les faces sélectionnées sont modifiées
+def display_segments(context, mesh, segments_ids, nb_segments, selected_polygons=None):
     properties = context.scene.segmentation_properties
-    data['clusters'] = properties.clusters
-    data['smoothness'] = properties.smoothness
-    
-    cgal_mesh = SurfaceMeshSegmentation(data)
+    if properties.display_mode == 'ATTRIBUTE':
+        write_segments_colors(mesh, segments_ids, nb_segments, selected_polygons)
+    else:
+        # Les matériaux des faces non sélectionnées sont conservés : ils ne sont jamais supprimés lors de la segmentation d'une sélection
+        assign_segments_materials(mesh, segments_ids, nb_segments, properties.delete_materials and selected_polygons is None, selected_polygons)
+
+
+# Affiche le résultat d'une segmentation sur le maillage de l'objet et mémorise les statistiques de l'exécution
+# Les identifiants des segments sont déjà rapportés aux polygones du maillage de l'objet
+def apply_segmentation(context, object, job, result):
+    segments_ids, nb_segments = result
+    with PhaseTimer(job['timings'], 'application'):
+        # Les données du maillage modifiées en mode 'Edition' seraient écrasées à la sortie de ce mode
+        edit_mode = object.mode == 'EDIT'
+        if edit_mode:
+            bpy.ops.object.mode_set(mode='OBJECT')
+        display_segments(context, object.data, segments_ids, nb_segments, job['selected_polygons'])
+        # Une sélection segmentée est généralement suivie d'autres éditions : le mode 'Edition' est rétabli
+        if edit_mode and job['selected_polygons'] is not None:
+            bpy.ops.object.mode_set(mode='EDIT')
+    execution_statistics.record(context.scene.segmentation_properties, 'segmentation', job['object_name'], job['timings'], job_statistics(job))
+
+
+def mesh_segmentation(context, object, timings=None):
+    job = prepare_segmentation(context, object, timings=timings)
     try:
-        cgal_mesh.triangulated_surface_mesh_segmentation()
+        result = run_segmentation(job)
     except Exception as err:
         raise err
-    
-    # Récupération des données issues de la segmentation du maillage
-    segments_data = cgal_mesh.getSegmentsData()
-    
-    # Récupération du tableau des identifiants des segments obtenus
-    segments_ids = segments_data.get('segments_ids')
-    # Récupération du nombre de segments obtenus
-    nb_segments = segments_data.get('number_of_segments')
 
-    # Vérification si l'utilisateur a souhaité supprimer les matériaux déjà associés au maillage
-    if properties.delete_materials:
-        mesh.materials.clear()
+    apply_segmentation(context, object, job, result)
 
-    #Récupération du nombre de matériaux déjà associés au maillage (servira d'offset pour affecter le bon matériau à la bonne face)
-    nb_materials = len(mesh.materials)
 
-    # Création des matériaux en fonction du nombre de segments
-    for _ in range(nb_segments):
-        # Création d'une couleur aléatoire
-        red = random.random()
-        green = random.random()
-        blue = random.random()
+# Nom de l'attribut de couleur (domaine 'FACE') utilisé par le mode d'affichage 'ATTRIBUTE'
+SEGMENTS_ATTRIBUTE_NAME = 'segments_colors'
 
-        color = (red, green, blue, 1.0)
 
-        material = bpy.data.materials.new(name="Material")
+# Retourne une palette déterministe de couleurs RGBA (tableau (n, 4) float32), la couleur d'un segment ne dépendant que de son indice
+def segments_palette(nb_segments):
+    # Les teintes sont réparties selon le nombre d'or afin que deux segments consécutifs aient des couleurs bien distinctes
+    hues = (np.arange(nb_segments) * 0.618033988749895) % 1.0
+    palette = np.empty((nb_segments, 4), dtype=np.float32)
+    palette[:, :3] = [colorsys.hsv_to_rgb(hue, 0.65, 0.9) for hue in hues]
+    palette[:, 3] = 1.0
+    return palette
 
+
+# Retourne le matériau associé à l'indice d'un segment, en le créant uniquement s'il n'existe pas encore dans le fichier
+def get_segment_material(index, color):
+    name = 'Segment.{:03d}'.format(index)
+    material = bpy.data.materials.get(name)
+    if material is None:
+        material = bpy.data.materials.new(name=name)
         # Définition de la couleur du matériau
         material.diffuse_color = color
+    return material
 
-        # affectation du nouveau matériau au maillage
-        mesh.materials.append(material)
-    
-    # Parcours des faces du maillage et affectation du matériau correspondant à l'indice du segment obtenu
-    for face, id in zip(mesh.polygons, segments_ids):
-        face.material_index = id + nb_materials
+
+# Affecte à chaque face (ou à chaque face sélectionnée) le matériau de son segment en une seule écriture (foreach_set)
+def assign_segments_materials(mesh, segments_ids, nb_segments, delete_materials, selected_polygons=None):
+    # Vérification si l'utilisateur a souhaité supprimer les matériaux déjà associés au maillage
+    if delete_materials:
+        mesh.materials.clear()
+
+    palette = segments_palette(nb_segments)
+    # Tableau de correspondance entre l'indice d'un segment et l'emplacement de son matériau dans le maillage
+    material_slots = np.empty(nb_segments, dtype=np.int32)
+    for index in range(nb_segments):
+        material = get_segment_material(index, palette[index])
+        # Les matériaux de segments déjà associés au maillage (exécutions précédentes) sont réutilisés
+        slot = mesh.materials.find(material.name)
+        if slot == -1:
+            mesh.materials.append(material)
+            slot = len(mesh.materials) - 1
+        material_slots[index] = slot
+
+    material_indices = material_slots[segments_ids]
+    if selected_polygons is not None:
+        # Les faces non sélectionnées conservent leur matériau
+        current_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get('material_index', current_indices)
+        material_indices = np.where(selected_polygons, material_indices, current_indices)
+    mesh.polygons.foreach_set('material_index', material_indices)
+    mesh.update()
+
+
+# Écrit la couleur du segment de chaque face (ou de chaque face sélectionnée) dans un attribut de couleur du domaine 'FACE',
+# sans créer de matériau
+def write_segments_colors(mesh, segments_ids, nb_segments, selected_polygons=None):
+    attribute = mesh.attributes.get(SEGMENTS_ATTRIBUTE_NAME)
+    # Un attribut du même nom mais de type ou de domaine différent est recréé
+    if attribute is not None and (attribute.data_type != 'FLOAT_COLOR' or attribute.domain != 'FACE'):
+        mesh.attributes.remove(attribute)
+        attribute = None
+    if attribute is None:
+        attribute = mesh.attributes.new(name=SEGMENTS_ATTRIBUTE_NAME, type='FLOAT_COLOR', domain='FACE')
+
+    colors = segments_palette(nb_segments)[segments_ids]
+    if selected_polygons is not None:
+        # Les faces non sélectionnées conservent leur couleur
+        current_colors = np.empty((len(mesh.polygons), 4), dtype=np.float32)
+        attribute.data.foreach_get('color', current_colors.ravel())
+        colors = np.where(selected_polygons[:, np.newaxis], colors, current_colors)
+    attribute.data.foreach_set('color', colors.ravel())
+    mesh.update()
+
+
+# Préréglages du calcul des valeurs SDF : (nombre de rayons, angle du cône, post-traitement)
+SDF_PRESETS = {
+    'PREVIEW': (10, 2.0 / 3.0 * math.pi, False),
+    'BALANCED': (25, 2.0 / 3.0 * math.pi, True),
+    'HIGH_QUALITY': (50, 2.0 / 3.0 * math.pi, True),
+}
+
+
+# Applique les paramètres du préréglage sélectionné aux propriétés du calcul des valeurs SDF
+def update_sdf_preset(self, context):
+    if self.sdf_preset in SDF_PRESETS:
+        self.number_of_rays, self.cone_angle, self.postprocess = SDF_PRESETS[self.sdf_preset]
 
 
 # classe contenant les propriétés utilisées dans l'algorithme de segmentation
@@ -132,12 +385,132 @@ class SegmentationProperties(bpy.types.PropertyGroup):
         max=1.0,  # Valeur maximale
         step=5,  # Incrémentation pour le curseur (une valeur 'step' de 5 pour une FloatProperty indique un pas de 0.05)
     )
+    # propriété sur le préréglage (compromis vitesse/qualité) du calcul des valeurs SDF
+    sdf_preset: bpy.props.EnumProperty(
+        name='qualité SDF',
+        description='Préréglage du calcul des valeurs SDF',
+        items=[
+            ('PREVIEW', 'Aperçu', 'Peu de rayons et pas de post-traitement : calcul rapide'),
+            ('BALANCED', 'Équilibré', 'Paramètres par défaut de CGAL'),
+            ('HIGH_QUALITY', 'Haute qualité', 'Davantage de rayons par face : calcul plus lent mais plus précis'),
+            ('CUSTOM', 'Personnalisé', 'Paramètres définis manuellement'),
+        ],
+        default='BALANCED',
+        update=update_sdf_preset,
+    )
+    # propriété sur le nombre de rayons lancés par face lors du calcul des valeurs SDF
+    number_of_rays: bpy.props.IntProperty(
+        name='rayons',
+        description='Nombre de rayons lancés par face lors du calcul des valeurs SDF',
+        default=25,  # Valeur par défaut
+        min=1,  # Valeur minimale
+        max=200,  # Valeur maximale
+    )
+    # propriété sur l'angle d'ouverture du cône dans lequel les rayons sont lancés
+    cone_angle: bpy.props.FloatProperty(
+        name='angle du cône',
+        description='Angle d\'ouverture du cône dans lequel les rayons sont lancés',
+        default=2.0 / 3.0 * math.pi,  # Valeur par défaut
+        min=0.01,  # Valeur minimale
+        max=math.pi,  # Valeur maximale
+        subtype='ANGLE',
+    )
+    # propriété permettant d'activer le post-traitement (lissage et normalisation) des valeurs SDF
+    postprocess: bpy.props.BoolProperty(
+        name='post-traitement',
+        description='Lissage et normalisation des valeurs SDF',
+        default=True
+    )
+    # propriété permettant de répartir le calcul des valeurs SDF sur plusieurs coeurs
+    parallel: bpy.props.BoolProperty(
+        name='calcul parallèle',
+        description='Répartit le calcul des valeurs SDF sur plusieurs threads (nécessite un module compilé avec Intel TBB)',
+        default=True
+    )
+    # propriété sur le nombre de threads utilisés par le calcul parallèle
+    threads: bpy.props.IntProperty(
+        name='threads',
+        description='Nombre de threads du calcul parallèle (0 : l\'ensemble des coeurs disponibles)',
+        default=0,  # Valeur par défaut
+        min=0,  # Valeur minimale
+        max=256,  # Valeur maximale
+    )
+    # propriété permettant de segmenter un maillage décimé (proxy) puis de transférer les segments sur le maillage complet
+    use_proxy: bpy.props.BoolProperty(
+        name='segmentation sur proxy',
+        description='Calcule les valeurs SDF sur une version décimée du maillage puis transfère les segments sur les faces d\'origine',
+        default=False
+    )
+    # propriété sur le nombre de faces du maillage proxy
+    proxy_face_budget: bpy.props.IntProperty(
+        name='faces du proxy',
+        description='Nombre de faces visé pour le maillage proxy',
+        default=200000,  # Valeur par défaut
+        min=1000,  # Valeur minimale
+        max=10000000,  # Valeur maximale
+    )
+    # propriété permettant de calculer la coupe de graphe (lissage des frontières) sur le maillage complet
+    proxy_smoothing: bpy.props.BoolProperty(
+        name='lissage pleine résolution',
+        description='Calcule la segmentation (coupe de graphe) sur le maillage complet à partir des valeurs SDF transférées du proxy',
+        default=True
+    )
+    # propriété sur le mode d'affichage des segments obtenus
+    display_mode: bpy.props.EnumProperty(
+        name='affichage',
+        description='Mode d\'affichage des segments obtenus',
+        items=[
+            ('MATERIALS', 'Matériaux', 'Un matériau par segment, affecté aux faces du segment'),
+            ('ATTRIBUTE', 'Attribut couleur', 'Couleur des segments écrite dans un attribut de couleur des faces, sans créer de matériau'),
+        ],
+        default='MATERIALS',
+    )
+    # propriété limitant la segmentation aux faces sélectionnées en mode 'Edition'
+    selection_only: bpy.props.BoolProperty(
+        name='sélection uniquement',
+        description='En mode \'Edition\', segmente uniquement les faces sélectionnées (les autres faces ne sont pas modifiées)',
+        default=False,
+    )
     #propriété permettant de demander à l'utilisateur s'il souhaite supprimer les matériaux déjà associés au maillage
     delete_materials: bpy.props.BoolProperty(
         name='suppression matériaux ?',
         description='Suppression des matériaux déjà associés au maillage',
         default=False
     )
+    # propriété permettant de conserver les résultats sur disque afin de ne pas recalculer une segmentation déjà réalisée
+    use_result_cache: bpy.props.BoolProperty(
+        name='cache des résultats',
+        description='Réutilise le résultat d\'une segmentation déjà calculée pour le même maillage et les mêmes paramètres',
+        default=False
+    )
+    # propriété sur le dossier du cache (vide : dossier temporaire du système)
+    cache_directory: bpy.props.StringProperty(
+        name='dossier du cache',
+        description='Dossier dans lequel les résultats sont conservés (vide : dossier temporaire du système)',
+        default='',
+        subtype='DIR_PATH',
+    )
+    # propriété sur la taille maximale du cache
+    cache_size: bpy.props.IntProperty(
+        name='taille du cache (Mo)',
+        description='Taille au-delà de laquelle les résultats les moins récemment utilisés sont supprimés',
+        default=1024,  # Valeur par défaut
+        min=1,  # Valeur minimale
+        max=1048576,  # Valeur maximale
+    )
+    # propriété permettant d'ajouter les statistiques de chaque exécution à un journal JSON (une ligne par exécution)
+    log_statistics: bpy.props.BoolProperty(
+        name='journal JSON',
+        description='Ajoute les durées et tailles de chaque exécution au fichier journal (une ligne JSON par exécution)',
+        default=False
+    )
+    # propriété sur le chemin du fichier journal
+    log_path: bpy.props.StringProperty(
+        name='fichier journal',
+        description='Fichier dans lequel les statistiques sont ajoutées',
+        default='',
+        subtype='FILE_PATH',
+    )
 
 
 class VIEW3D_OT_segment_mesh(bpy.types.Operator):
@@ -148,11 +521,96 @@ class VIEW3D_OT_segment_mesh(bpy.types.Operator):
     def execute(self, context):
         # récupération de l'objet actif dans la scène
         object = context.active_object
-        triangulate_mesh(context, object)
         mesh_segmentation(context, object)
         return {'FINISHED'}
 
 
+# Libellés des phases de l'algorithme affichés dans la barre d'état
+SEGMENTATION_PHASES = {
+    'idle': 'préparation',
+    'proxy': 'décimation du proxy',
+    'sdf': 'calcul des valeurs SDF',
+    'transfer': 'transfert des valeurs SDF',
+    'segmentation': 'segmentation',
+    'done': 'terminé',
+}
+
+
+class VIEW3D_OT_clear_segmentation_cache(bpy.types.Operator):
+    """Supprime l'ensemble des résultats conservés dans le cache disque"""
+    bl_idname = 'wm.clear_segmentation_cache'
+    bl_label = 'Vider le cache'
+
+    def execute(self, context):
+        properties = context.scene.segmentation_properties
+        result_cache.configure(bpy.path.abspath(properties.cache_directory), properties.cache_size * 1024 * 1024)
+        result_cache.clear()
+        return {'FINISHED'}
+
+
+class VIEW3D_OT_segment_mesh_modal(bpy.types.Operator):
+    """Exécute l'algorithme de segmentation en arrière-plan sans bloquer l'interface (Échap pour annuler)"""
+    bl_idname = 'wm.segment_mesh_modal'
+    bl_label = 'Segmentation en arrière-plan'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def invoke(self, context, event):
+        # récupération de l'objet actif dans la scène
+        object = context.active_object
+        self.object_name = object.name
+        # Le maillage de l'objet n'est pas modifié avant la fin de l'algorithme : en cas d'annulation il reste intact
+        self.job = prepare_segmentation(context, object)
+        # Un résultat déjà présent dans le cache disque est affiché immédiatement
+        if self.job['cached_result'] is not None:
+            apply_segmentation(context, object, self.job, self.job['cached_result'])
+            return {'FINISHED'}
+        self.result = None
+        self.error = None
+
+        # Les calculs C++ relâchent le GIL : l'interface de Blender reste réactive pendant leur exécution
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.timer = context.window_manager.event_timer_add(0.1, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def run(self):
+        try:
+            self.result = run_segmentation(self.job)
+        except Exception as err:
+            self.error = err
+
+    def modal(self, context, event):
+        # Demande d'annulation : l'algorithme s'interrompt à la prochaine étape, le maillage n'est pas modifié
+        if event.type == 'ESC':
+            self.job['cgal_mesh'].cancel()
+            return {'RUNNING_MODAL'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        if self.thread.is_alive():
+            cgal_mesh = self.job['cgal_mesh']
+            phase = SEGMENTATION_PHASES.get(cgal_mesh.getPhase(), '')
+            # avancement en faces des phases qui le suivent (calcul SDF et transfert des valeurs du proxy)
+            processed_faces, total_faces = cgal_mesh.getProgress()
+            if total_faces > 0:
+                phase = '{} {:.0%} ({} / {} faces)'.format(phase, min(processed_faces / total_faces, 1.0), processed_faces, total_faces)
+            context.workspace.status_text_set('Segmentation : {} (Échap pour annuler)'.format(phase))
+            return {'RUNNING_MODAL'}
+
+        context.window_manager.event_timer_remove(self.timer)
+        context.workspace.status_text_set(None)
+        if self.error is not None:
+            self.report({'ERROR'}, str(self.error))
+            return {'CANCELLED'}
+        if self.result is None:
+            self.report({'INFO'}, 'Segmentation annulée')
+            return {'CANCELLED'}
+
+        apply_segmentation(context, bpy.data.objects[self.object_name], self.job, self.result)
+        return {'FINISHED'}
+
+
 class VIEW3D_PT_segmentation_panel(bpy.types.Panel):
     bl_label = 'Segmentation d\'un maillage triangulé'  # Titre du panneau latéral
     bl_idname = 'VIEW3D_PT_segmentation_panel'
@@ -168,15 +626,59 @@ class VIEW3D_PT_segmentation_panel(bpy.types.Panel):
         box = self.layout.box()
         box.prop(properties, 'clusters')
         box.prop(properties, 'smoothness')
-        box.prop(properties, 'delete_materials')
+        box.prop(properties, 'selection_only')
+        # paramètres du calcul des valeurs SDF, modifiables uniquement en mode personnalisé
+        box = self.layout.box()
+        box.prop(properties, 'sdf_preset')
+        column = box.column()
+        column.enabled = properties.sdf_preset == 'CUSTOM'
+        column.prop(properties, 'number_of_rays')
+        column.prop(properties, 'cone_angle')
+        column.prop(properties, 'postprocess')
+        column = box.column()
+        column.prop(properties, 'parallel')
+        row = column.row()
+        row.enabled = properties.parallel
+        row.prop(properties, 'threads')
+        # paramètres du mode proxy pour les maillages volumineux
+        box = self.layout.box()
+        box.prop(properties, 'use_proxy')
+        column = box.column()
+        column.enabled = properties.use_proxy
+        column.prop(properties, 'proxy_face_budget')
+        column.prop(properties, 'proxy_smoothing')
+        box = self.layout.box()
+        box.prop(properties, 'display_mode')
+        # la suppression des matériaux n'a de sens qu'en mode d'affichage par matériaux
+        row = box.row()
+        row.enabled = properties.display_mode == 'MATERIALS'
+        row.prop(properties, 'delete_materials')
         # création d'une nouvelle ligne dans laquelle nous ajoutons un bouton (instance de la classe VIEW3D_OT_segmentation_button)
         row = self.layout.row()
         # l'opérateur est référencé par un nom correspondant à la valeur de l'attribut bl_idname de la classe
         row.operator(VIEW3D_OT_segment_mesh.bl_idname, text='Segmenter le maillage')
+        row = self.layout.row()
+        row.operator(VIEW3D_OT_segment_mesh_modal.bl_idname, text='Segmenter en arrière-plan')
+        # cache disque des résultats
+        box = self.layout.box()
+        box.prop(properties, 'use_result_cache')
+        column = box.column()
+        column.enabled = properties.use_result_cache
+        column.prop(properties, 'cache_directory')
+        column.prop(properties, 'cache_size')
+        column.label(text='succès : {}, échecs : {}'.format(result_cache.hits, result_cache.misses))
+        column.operator(VIEW3D_OT_clear_segmentation_cache.bl_idname, text='Vider le cache')
+        # statistiques de la dernière exécution et journal JSON
+        box = self.layout.box()
+        draw_statistics(box, execution_statistics.last)
+        box.prop(properties, 'log_statistics')
+        row = box.row()
+        row.enabled = properties.log_statistics
+        row.prop(properties, 'log_path')
 
 
 # tuple contenant les classes à enregistrer et désinscrire dans Blender
-classes = (VIEW3D_PT_segmentation_panel, VIEW3D_OT_segment_mesh, SegmentationProperties)
+classes = (VIEW3D_PT_segmentation_panel, VIEW3D_OT_segment_mesh, VIEW3D_OT_segment_mesh_modal, VIEW3D_OT_clear_segmentation_cache, SegmentationProperties)
         
 
 def register():
@@ -190,6 +692,7 @@ def unregister():
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.segmentation_properties
+    sdf_cache.clear()
     
 if __name__ == '__main__':
     register()
@@ -3,130 +3,510 @@
 namespace SMS = CGAL::Surface_mesh_simplification;
 namespace py = pybind11;
 
-SurfaceMeshSimplification::SurfaceMeshSimplification(py::dict data) : m_surface_mesh(), m_surface_mesh_data(){
-    //On caste toutes les données provenant de notre structure de données python vers des types C++
-    const std::vector<int> faces = data["faces"].cast<std::vector<int>>();
-    const std::vector<double> vertices = data["vertices"].cast<std::vector<double>>();
-    m_stop_ratio = data["decimation_factor"].cast<double>();
+namespace {
+    //Nombre pseudo-aléatoire uniforme dans [0, 1) ne dépendant que de 'value' (splitmix64) : les échantillons sont
+    //identiques quel que soit le nombre de threads
+    double unit_random(std::uint64_t value){
+        value += 0x9E3779B97F4A7C15ULL;
+        value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9ULL;
+        value = (value ^ (value >> 27)) * 0x94D049BB133111EBULL;
+        value ^= value >> 31;
+        return static_cast<double>(value >> 11) * (1.0 / 9007199254740992.0);
+    }
 
-    //création d'un tableau de vector_descriptor qui va contenir les informations des coordonnées des sommets du maillage
-    std::vector<vertex_descriptor> vertices_descriptor;
-    //et réservation de l'espace mémoire adéquat
-    vertices_descriptor.reserve(vertices.size() / 3);
+    //Maillage partagé fourni au constructeur : il doit exister avant que la référence au maillage ne soit initialisée
+    const std::shared_ptr<MeshHandle>& checked_mesh_handle(const std::shared_ptr<MeshHandle>& mesh_handle){
+        if(!mesh_handle){
+            throw std::runtime_error("Aucun maillage n'a été fourni...");
+        }
+        return mesh_handle;
+    }
+}
 
-    for(int i = 0; i < vertices.size(); i+=3){
-        vertex_descriptor v = m_surface_mesh.add_vertex(Point_3(vertices[i], vertices[i+1], vertices[i+2]));
-        vertices_descriptor.push_back(v);
+Sampled_distances sampled_distances(const Surface_mesh& source, const AABB_tree& target_tree, std::size_t number_of_samples,
+                                    unsigned int number_of_threads, std::uint64_t seed){
+    Sampled_distances distances;
+    //Aires cumulées des faces : une face est choisie avec une probabilité proportionnelle à son aire
+    std::vector<face_descriptor> source_faces;
+    std::vector<double> cumulative_areas;
+    source_faces.reserve(source.number_of_faces());
+    cumulative_areas.reserve(source.number_of_faces());
+    double total_area = 0.0;
+    for(const auto& face : source.faces()){
+        const auto h = source.halfedge(face);
+        total_area += std::sqrt(CGAL::squared_area(source.point(source.source(h)), source.point(source.target(h)),
+                                                   source.point(source.target(source.next(h)))));
+        source_faces.push_back(face);
+        cumulative_areas.push_back(total_area);
+    }
+    if(source_faces.empty() || total_area <= 0.0 || number_of_samples == 0){
+        return distances;
     }
 
-    for(int i = 0; i < faces.size(); i+=3){
-        //Récupération des indices des sommets de la face courante
-        std::vector<int> face_indices(faces.begin() + i, faces.begin() + i + 3);
+    std::vector<double> squared_distances(number_of_samples);
+    parallel_for(number_of_samples, number_of_threads, [&](std::size_t begin, std::size_t end){
+        for(std::size_t i = begin; i < end; ++i){
+            const std::uint64_t sample = seed + 3 * static_cast<std::uint64_t>(i);
+            const std::size_t index = std::min<std::size_t>(
+                std::upper_bound(cumulative_areas.begin(), cumulative_areas.end(), unit_random(sample) * total_area) - cumulative_areas.begin(),
+                source_faces.size() - 1);
+            const auto h = source.halfedge(source_faces[index]);
+            const Point_3& p = source.point(source.source(h));
+            const Point_3& q = source.point(source.target(h));
+            const Point_3& r = source.point(source.target(source.next(h)));
+            //Coordonnées barycentriques uniformes sur le triangle
+            const double s = std::sqrt(unit_random(sample + 1));
+            const double t = unit_random(sample + 2);
+            const double a = 1.0 - s, b = s * (1.0 - t), c = s * t;
+            const Point_3 point(a * p.x() + b * q.x() + c * r.x(), a * p.y() + b * q.y() + c * r.y(), a * p.z() + b * q.z() + c * r.z());
+            squared_distances[i] = target_tree.squared_distance(point);
+        }
+    });
 
-        //Et création de la face du maillage à partir de ces derniers
-        m_surface_mesh.add_face(vertices_descriptor[face_indices[0]], vertices_descriptor[face_indices[1]], vertices_descriptor[face_indices[2]]);
+    for(double squared_distance : squared_distances){
+        distances.max_squared_distance = std::max(distances.max_squared_distance, squared_distance);
+        distances.sum_squared_distances += squared_distance;
     }
+    distances.number_of_samples = number_of_samples;
+    return distances;
 }
 
-void SurfaceMeshSimplification::triangulated_surface_mesh_simplification(){
+SurfaceMeshSimplification::SurfaceMeshSimplification(py::dict data) :
+    m_mesh_handle(std::make_shared<MeshHandle>()), m_surface_mesh(m_mesh_handle->surface_mesh()), m_stop_ratio(data["decimation_factor"].cast<double>()), m_error_samples(0), m_error_threads(0),
+    m_initial_edges(0), m_current_edges(0), m_target_edges(0), m_cancel_requested(false){
+    //Conversion des données Python en tableaux numpy contigus (sans copie s'ils le sont déjà)
+    const Clock::time_point start_time = Clock::now();
+    const Float_array vertices = data["vertices"].cast<Float_array>();
+    const Int_array faces = data["faces"].cast<Int_array>();
+    m_timings["conversion"] += elapsed_milliseconds(start_time);
+
+    this->build_surface_mesh(vertices, faces);
+}
+
+SurfaceMeshSimplification::SurfaceMeshSimplification(const Float_array& vertices, const Int_array& faces, double stop_ratio) :
+    m_mesh_handle(std::make_shared<MeshHandle>()), m_surface_mesh(m_mesh_handle->surface_mesh()), m_stop_ratio(stop_ratio), m_error_samples(0), m_error_threads(0),
+    m_initial_edges(0), m_current_edges(0), m_target_edges(0), m_cancel_requested(false){
+    this->build_surface_mesh(vertices, faces);
+}
+
+SurfaceMeshSimplification::SurfaceMeshSimplification(std::shared_ptr<MeshHandle> mesh_handle, double stop_ratio) :
+    m_mesh_handle(checked_mesh_handle(mesh_handle)), m_surface_mesh(m_mesh_handle->surface_mesh()), m_stop_ratio(stop_ratio), m_error_samples(0), m_error_threads(0),
+    m_initial_edges(0), m_current_edges(0), m_target_edges(0), m_cancel_requested(false){
+    //Le maillage est déjà construit : seule sa taille courante est enregistrée
+    this->record_size("peak_vertices", m_surface_mesh.number_of_vertices());
+    this->record_size("peak_edges", m_surface_mesh.number_of_edges());
+    this->record_size("peak_faces", m_surface_mesh.number_of_faces());
+    this->record_size("mesh_bytes", estimated_mesh_bytes(m_surface_mesh));
+}
 
-    if(!CGAL::is_triangle_mesh(m_surface_mesh))
+std::shared_ptr<MeshHandle> SurfaceMeshSimplification::get_mesh_handle() const{
+    //Le maillage simplifié peut être transmis à un autre traitement (segmentation) sans être exporté
+    return m_mesh_handle;
+}
+
+void SurfaceMeshSimplification::build_surface_mesh(const Float_array& vertices, const Int_array& faces){
+    //Le maillage est construit par MeshHandle, dont les durées et les tailles sont reprises dans les statistiques
+    m_mesh_handle->build(vertices, faces);
+    for(const auto& timing : m_mesh_handle->timings()){
+        m_timings[timing.first] += timing.second;
+    }
+    //Le maillage n'est jamais plus volumineux qu'après sa construction (l'algorithme ne fait que supprimer des éléments)
+    for(const auto& size : m_mesh_handle->sizes()){
+        this->record_size(size.first, size.second);
+    }
+}
+
+void SurfaceMeshSimplification::check_triangle_mesh(){
+    const Clock::time_point start_time = Clock::now();
+    const bool is_triangle_mesh = CGAL::is_triangle_mesh(m_surface_mesh);
+    m_timings["is_triangle_mesh"] = elapsed_milliseconds(start_time);
+
+    if(!is_triangle_mesh)
     {
         throw std::runtime_error("Le maillage n'est pas composé que de faces triangulaires...");
     }
+}
 
-    std::chrono::steady_clock::time_point start_time = std::chrono::steady_clock::now();
-    // In this example, the simplification stops when the number of undirected edges
-    // drops below 10% of the initial count
-    SMS::Edge_count_ratio_stop_predicate<Surface_mesh> stop(m_stop_ratio);
-    int r = SMS::edge_collapse(m_surface_mesh, stop);
-    std::chrono::steady_clock::time_point end_time = std::chrono::steady_clock::now();
-    std::cout << "\nFinished!\n" << r << " edges removed.\n" << m_surface_mesh.number_of_edges() << " final edges.\n";
-    std::cout << m_surface_mesh.number_of_vertices() << " final vertices.\n";
-    std::cout << "Time elapsed: " << std::chrono::duration_cast<std::chrono::milliseconds>(end_time - start_time).count() << "ms" << std::endl;
-
-    std::unordered_map<vertex_descriptor, int> remapping = this->get_indices_remapping();
-
-    // Ajout d'une propriété aux faces pour stocker les indices des sommets
-    std::pair<Surface_mesh::Property_map<face_descriptor, std::vector<int>>, bool> property = m_surface_mesh.add_property_map<face_descriptor, std::vector<int>>("f:indices");
-
-    Surface_mesh::Property_map<face_descriptor, std::vector<int>> indices_property;
-    //Si la propriété existe déjà
-    if(!property.second){
-        indices_property = m_surface_mesh.property_map<face_descriptor, std::vector<int>>("f:indices").first;
-    }else{
-        indices_property = property.first;
-    }
-
-    // Nous remplissons ensuite la propriété avec les indices des sommets pour chaque face
-    // en utilisant les demi-arêtes des faces
-    for (const auto& face : m_surface_mesh.faces()) {
-        std::vector<int>& indices = indices_property[face];
-        
-        for (const auto& v : vertices_around_face(m_surface_mesh.halfedge(face), m_surface_mesh)) {
-            indices.push_back(remapping[v]);
+void SurfaceMeshSimplification::compact_surface_mesh(){
+    // Compactage du maillage : les éléments supprimés par les contractions d'arêtes sont retirés
+    // et les indices des sommets et des faces deviennent contigus (de 0 à n - 1)
+    const Clock::time_point start_time = Clock::now();
+    m_surface_mesh.collect_garbage();
+    m_timings["remap"] = elapsed_milliseconds(start_time);
+}
+
+void SurfaceMeshSimplification::record_size(const std::string& name, std::size_t size){
+    m_sizes[name] = std::max(m_sizes[name], size);
+}
+
+void SurfaceMeshSimplification::start_progress(double stop_ratio){
+    //Nombre d'arêtes au démarrage de l'exécution et nombre d'arêtes auquel elle s'arrête (facteur de décimation effectif)
+    const std::size_t initial_edges = m_surface_mesh.number_of_edges();
+    m_target_edges = std::min(initial_edges, static_cast<std::size_t>(stop_ratio * static_cast<double>(initial_edges)));
+    m_current_edges = initial_edges;
+    m_initial_edges = initial_edges;
+}
+
+void SurfaceMeshSimplification::set_constrained_vertices(const Int_array& vertex_indices){
+    //Les indices sont ceux des sommets fournis au constructeur : les contraintes doivent être définies avant l'algorithme
+    if(m_surface_mesh.has_garbage()){
+        throw std::runtime_error("Les sommets contraints doivent être définis avant l'exécution de l'algorithme...");
+    }
+    m_constrained_vertices.assign(m_surface_mesh.num_vertices(), false);
+    const std::int32_t* indices = vertex_indices.data();
+    for(py::ssize_t i = 0; i < vertex_indices.size(); ++i){
+        if(indices[i] < 0 || static_cast<std::size_t>(indices[i]) >= m_constrained_vertices.size()){
+            throw std::runtime_error("Le sommet contraint " + std::to_string(indices[i]) + " n'existe pas...");
         }
+        m_constrained_vertices[indices[i]] = true;
     }
+}
 
-    this->update_vertices_coordinates();
-    this->update_face_indices();
+py::array_t<std::int32_t> SurfaceMeshSimplification::get_original_vertex_indices() const{
+    //Tableau numpy (N,) : pour chaque sommet du maillage simplifié, indice du sommet contraint d'origine qu'il représente
+    //(-1 pour un sommet libre). Vide si aucun sommet contraint n'a été défini
+    py::array_t<std::int32_t> original_indices(static_cast<py::ssize_t>(m_original_vertex_indices.size()));
+    std::copy(m_original_vertex_indices.begin(), m_original_vertex_indices.end(), original_indices.mutable_data());
+    return original_indices;
 }
 
-void SurfaceMeshSimplification::update_vertices_coordinates(){
-    //Création d'un tableau qui va contenir les coordonnées de nos nouveaux résultant de l'algorithme de simplification
-    std::vector<double> vertices_coordinates;
-    // réservation de l'espace mémoire adéquat
-    vertices_coordinates.reserve(num_vertices(m_surface_mesh) * 3);
+void SurfaceMeshSimplification::enable_error_metrics(std::size_t number_of_samples, unsigned int number_of_threads){
+    //Le maillage d'origine est copié au début de l'algorithme : la mesure double la mémoire occupée par le maillage
+    m_error_samples = number_of_samples;
+    m_error_threads = number_of_threads;
+}
+
+void SurfaceMeshSimplification::compute_error(){
+    //Distance de Hausdorff échantillonnée dans les deux sens (maillage simplifié vers maillage d'origine et inversement)
+    //et erreur quadratique moyenne, à l'aide d'un arbre AABB des triangles de chacun des deux maillages
+    const Clock::time_point start_time = Clock::now();
+    AABB_tree original_tree(faces(m_original_mesh).first, faces(m_original_mesh).second, m_original_mesh);
+    AABB_tree simplified_tree(faces(m_surface_mesh).first, faces(m_surface_mesh).second, m_surface_mesh);
+    //Les arbres sont construits avant les requêtes concurrentes (leur construction est sinon différée à la première requête)
+    original_tree.accelerate_distance_queries();
+    simplified_tree.accelerate_distance_queries();
 
-    //utilisation de propriétés : "location" référence les positions
-    const auto& location = m_surface_mesh.property_map<vertex_descriptor, Point_3>("v:point").first;
+    const Sampled_distances to_original = sampled_distances(m_surface_mesh, original_tree, m_error_samples, m_error_threads, 0);
+    const Sampled_distances from_original = sampled_distances(m_original_mesh, simplified_tree, m_error_samples, m_error_threads, 1ULL << 40);
 
-    for(const auto& vd : m_surface_mesh.vertices()) {
-        const std::vector<double> vertex = {location[vd][0], location[vd][1], location[vd][2]};
-        std::copy(vertex.begin(), vertex.end(), std::back_inserter(vertices_coordinates));
+    const std::size_t number_of_samples = to_original.number_of_samples + from_original.number_of_samples;
+    m_error["hausdorff_to_original"] = std::sqrt(to_original.max_squared_distance);
+    m_error["hausdorff_from_original"] = std::sqrt(from_original.max_squared_distance);
+    m_error["hausdorff"] = std::max(m_error["hausdorff_to_original"], m_error["hausdorff_from_original"]);
+    m_error["rms_to_original"] = to_original.number_of_samples > 0 ? std::sqrt(to_original.sum_squared_distances / to_original.number_of_samples) : 0.0;
+    m_error["rms"] = number_of_samples > 0 ? std::sqrt((to_original.sum_squared_distances + from_original.sum_squared_distances) / number_of_samples) : 0.0;
+    m_error["samples"] = static_cast<double>(number_of_samples);
+    //Diagonale de la boîte englobante du maillage d'origine, pour exprimer l'erreur relativement à sa taille
+    if(!m_original_mesh.is_empty()){
+        const CGAL::Bbox_3 bbox = CGAL::Polygon_mesh_processing::bbox(m_original_mesh);
+        m_error["bbox_diagonal"] = std::sqrt(CGAL::square(bbox.xmax() - bbox.xmin()) + CGAL::square(bbox.ymax() - bbox.ymin()) + CGAL::square(bbox.zmax() - bbox.zmin()));
     }
 
-    //Ajout du tableau dans la structure de données qui sera retournée à Blender
-    m_surface_mesh_data["vertices"] = vertices_coordinates;
+    this->record_size("original_mesh_bytes", estimated_mesh_bytes(m_original_mesh));
+    //La copie du maillage d'origine n'est plus utile
+    m_original_mesh.clear();
+    m_timings["error"] = elapsed_milliseconds(start_time);
 }
 
-void SurfaceMeshSimplification::update_face_indices(){
-    //Création d'un tableau qui va contenir les indices des sommets des faces résultant de l'algorithme de simplification
-    std::vector<int> face_indices;
-    // et réservation de l'espace mémoire adéquat
-    face_indices.reserve(num_faces(m_surface_mesh) * 3);
-    const auto& indices_property = m_surface_mesh.property_map<face_descriptor, std::vector<int>>("f:indices").first;
+py::dict SurfaceMeshSimplification::get_error() const{
+    //Distances mesurées (vide si la mesure de l'erreur n'a pas été activée)
+    py::dict error;
+    for(const auto& entry : m_error){
+        error[py::str(entry.first)] = entry.second;
+    }
+    return error;
+}
 
-    for(const auto& face : m_surface_mesh.faces()) {
-        const std::vector<int>& indices = indices_property[face];
-        std::copy(indices.begin(), indices.end(), std::back_inserter(face_indices));
+std::size_t SurfaceMeshSimplification::mark_constrained_edges(Edge_constraint_map& constrained_edges) const{
+    //Une arête est contrainte si elle est au bord du maillage et relie deux sommets contraints
+    //(arête partagée avec un autre bloc du maillage ou avec la partie non sélectionnée)
+    std::size_t number_of_constrained_edges = 0;
+    for(const auto& edge : m_surface_mesh.edges()){
+        const auto halfedge = m_surface_mesh.halfedge(edge);
+        if(m_surface_mesh.is_border(edge)
+           && m_constrained_vertices[m_surface_mesh.source(halfedge).idx()]
+           && m_constrained_vertices[m_surface_mesh.target(halfedge).idx()]){
+            constrained_edges[edge] = true;
+            ++number_of_constrained_edges;
+        }
     }
-    //Ajout du tableau dans la structure de données qui sera retournée à Blender
-    m_surface_mesh_data["faces"] = face_indices;
+    return number_of_constrained_edges;
+}
+
+void SurfaceMeshSimplification::triangulated_surface_mesh_simplification(){
+    //L'algorithme n'accède à aucun objet Python : le GIL est relâché afin que plusieurs maillages
+    //puissent être simplifiés en parallèle depuis des threads Python
+    py::gil_scoped_release release;
+    MeshHandle::Lock lock(*m_mesh_handle);
+
+    this->check_triangle_mesh();
+
+    if(m_error_samples > 0){
+        m_original_mesh = m_surface_mesh;
+    }
+
+    const Clock::time_point start_time = Clock::now();
+    this->start_progress(m_stop_ratio);
+    // In this example, the simplification stops when the number of undirected edges
+    // drops below 10% of the initial count
+    // (ou dès que l'annulation de l'algorithme est demandée)
+    Cancellable_stop_predicate<SMS::Edge_count_ratio_stop_predicate<Surface_mesh>> stop(SMS::Edge_count_ratio_stop_predicate<Surface_mesh>(m_stop_ratio), &m_cancel_requested);
+    Simplification_visitor visitor(&m_surface_mesh, &m_current_edges);
+    int removed_edges = 0;
+    if(m_constrained_vertices.empty()){
+        removed_edges = SMS::edge_collapse(m_surface_mesh, stop, CGAL::parameters::visitor(visitor));
+    }
+    else{
+        //Les arêtes contraintes ne sont pas contractées et les sommets contraints ne sont jamais déplacés, y compris par
+        //la contraction d'une arête intérieure reliant deux d'entre eux : les bords partagés restent identiques, au bit près,
+        //d'un bloc à l'autre
+        Edge_constraint_map constrained_edges = m_surface_mesh.add_property_map<edge_descriptor, bool>("e:is_constrained", false).first;
+        m_counts["constrained_edges"] = this->mark_constrained_edges(constrained_edges);
+        Vertex_index_map original_indices = m_surface_mesh.add_property_map<vertex_descriptor, std::int32_t>("v:original_index", -1).first;
+        for(const auto& vertex : m_surface_mesh.vertices()){
+            original_indices[vertex] = m_constrained_vertices[vertex.idx()] ? static_cast<std::int32_t>(vertex.idx()) : -1;
+        }
+        visitor.set_original_indices(original_indices);
+        Locked_vertices_placement<SMS::LindstromTurk_placement<Surface_mesh>> placement(original_indices);
+        removed_edges = SMS::edge_collapse(m_surface_mesh, stop, CGAL::parameters::visitor(visitor)
+                                                                     .edge_is_constrained_map(constrained_edges)
+                                                                     .get_placement(placement));
+        m_surface_mesh.remove_property_map(constrained_edges);
+        //Les indices des sommets ne sont plus valides après le compactage du maillage
+        m_constrained_vertices.clear();
+    }
+    m_timings["algorithm"] = elapsed_milliseconds(start_time);
+    m_counts["removed_edges"] = static_cast<std::size_t>(removed_edges);
+
+    this->compact_surface_mesh();
+    //Le compactage réordonne les propriétés avec les sommets : les indices d'origine sont relevés dans l'ordre des sommets
+    //exportés, puis la propriété est retirée du maillage (qui peut être partagé avec d'autres traitements)
+    m_original_vertex_indices.clear();
+    const std::pair<Vertex_index_map, bool> original_indices = m_surface_mesh.property_map<vertex_descriptor, std::int32_t>("v:original_index");
+    if(original_indices.second){
+        m_original_vertex_indices.reserve(m_surface_mesh.number_of_vertices());
+        for(const auto& vertex : m_surface_mesh.vertices()){
+            m_original_vertex_indices.push_back(original_indices.first[vertex]);
+        }
+        Vertex_index_map property_map = original_indices.first;
+        m_surface_mesh.remove_property_map(property_map);
+    }
+    //Les propriétés calculées sur le maillage partagé (valeurs SDF, segments) ne correspondent plus à sa géométrie
+    m_mesh_handle->geometry_changed();
+    if(m_error_samples > 0 && !m_cancel_requested.load()){
+        this->compute_error();
+    }
+}
+
+py::array_t<float> SurfaceMeshSimplification::get_vertices(){
+    //Tableau numpy (N, 3) des coordonnées des sommets résultant de l'algorithme de simplification
+    const Clock::time_point start_time = Clock::now();
+    py::array_t<float> vertices = m_mesh_handle->get_vertices();
+    m_timings["export"] += elapsed_milliseconds(start_time);
+    return vertices;
+}
+
+py::array_t<std::int32_t> SurfaceMeshSimplification::get_faces(){
+    //Tableau numpy (M, 3) des indices des sommets des faces résultant de l'algorithme de simplification
+    const Clock::time_point start_time = Clock::now();
+    py::array_t<std::int32_t> faces = m_mesh_handle->get_faces();
+    m_timings["export"] += elapsed_milliseconds(start_time);
+    return faces;
 }
 
 py::dict SurfaceMeshSimplification::get_surface_mesh_data(){
-    return m_surface_mesh_data;
+    //Structure de données retournée à Blender, directement exploitable par foreach_set
+    py::dict surface_mesh_data;
+    surface_mesh_data["vertices"] = this->get_vertices();
+    surface_mesh_data["faces"] = this->get_faces();
+    if(!m_error.empty()){
+        surface_mesh_data["error"] = this->get_error();
+    }
+    return surface_mesh_data;
+}
+
+Mesh_snapshot take_mesh_snapshot(const Surface_mesh& surface_mesh){
+    Mesh_snapshot snapshot;
+    snapshot.vertices.reserve(surface_mesh.number_of_vertices() * 3);
+    snapshot.faces.reserve(surface_mesh.number_of_faces() * 3);
+
+    //Le maillage n'étant pas compacté pendant l'algorithme, les indices des sommets restants sont renumérotés
+    //à l'aide d'un tableau indexé par l'indice des sommets (sommets supprimés compris)
+    std::vector<std::int32_t> remapping(surface_mesh.num_vertices(), -1);
+    std::int32_t new_index = 0;
+    for(const auto& vd : surface_mesh.vertices()){
+        const Point_3& point = surface_mesh.point(vd);
+        snapshot.vertices.push_back(static_cast<float>(point.x()));
+        snapshot.vertices.push_back(static_cast<float>(point.y()));
+        snapshot.vertices.push_back(static_cast<float>(point.z()));
+        remapping[vd.idx()] = new_index++;
+    }
+
+    for(const auto& face : surface_mesh.faces()){
+        for(const auto& v : vertices_around_face(surface_mesh.halfedge(face), surface_mesh)){
+            snapshot.faces.push_back(remapping[v.idx()]);
+        }
+    }
+
+    return snapshot;
+}
+
+namespace {
+    //Transfère la propriété d'un std::vector à un tableau numpy de dimensions (size / columns, columns), sans copie
+    template <class T>
+    py::array_t<T> to_numpy(std::vector<T>&& data, py::ssize_t columns){
+        std::vector<T>* owner = new std::vector<T>(std::move(data));
+        py::capsule base(owner, [](void* pointer){ delete static_cast<std::vector<T>*>(pointer); });
+        return py::array_t<T>(std::vector<py::ssize_t>{static_cast<py::ssize_t>(owner->size()) / columns, columns}, owner->data(), base);
+    }
+}
+
+py::list SurfaceMeshSimplification::simplify_lods(const std::vector<double>& ratios){
+    //Les niveaux de détail sont obtenus en une seule exécution de l'algorithme : les contractions d'arêtes se poursuivent
+    //du niveau le plus fin au plus grossier et une copie du maillage est prise au franchissement de chaque seuil
+    if(ratios.empty()){
+        return py::list();
+    }
+    for(double ratio : ratios){
+        if(ratio <= 0.0){
+            throw std::runtime_error("Les facteurs de décimation des niveaux de détail doivent être strictement positifs...");
+        }
+    }
+    //Tri des niveaux par facteur de décimation décroissant, en conservant leur position d'origine
+    std::vector<std::size_t> order(ratios.size());
+    for(std::size_t i = 0; i < order.size(); ++i){
+        order[i] = i;
+    }
+    std::sort(order.begin(), order.end(), [&ratios](std::size_t a, std::size_t b){ return ratios[a] > ratios[b]; });
+
+    std::vector<Mesh_snapshot> snapshots;
+    snapshots.reserve(ratios.size());
+    {
+        //Le maillage est réservé une fois le GIL relâché : l'attente d'un autre traitement ne bloque pas les threads Python
+        py::gil_scoped_release release;
+        MeshHandle::Lock lock(*m_mesh_handle);
+        this->check_triangle_mesh();
+
+        const Clock::time_point start_time = Clock::now();
+        //L'exécution s'arrête au niveau le plus grossier
+        this->start_progress(ratios[order.back()]);
+        //Seuils identiques à ceux de 'Edge_count_ratio_stop_predicate' : le niveau i est atteint dès que
+        //le nombre d'arêtes devient strictement inférieur à ratios[i] * nombre initial d'arêtes
+        std::vector<double> thresholds;
+        thresholds.reserve(ratios.size());
+        for(std::size_t index : order){
+            thresholds.push_back(ratios[index] * static_cast<double>(m_initial_edges.load()));
+        }
+        //Niveaux déjà atteints avant toute contraction (facteur supérieur à 1)
+        while(snapshots.size() < thresholds.size() && static_cast<double>(m_current_edges.load()) < thresholds[snapshots.size()]){
+            snapshots.push_back(take_mesh_snapshot(m_surface_mesh));
+        }
+
+        Cancellable_stop_predicate<SMS::Edge_count_ratio_stop_predicate<Surface_mesh>> stop(SMS::Edge_count_ratio_stop_predicate<Surface_mesh>(ratios[order.back()]), &m_cancel_requested);
+        Simplification_visitor visitor(&m_surface_mesh, &m_current_edges, &thresholds, &snapshots);
+        SMS::edge_collapse(m_surface_mesh, stop, CGAL::parameters::visitor(visitor));
+
+        //Niveaux non atteints (plus aucune arête ne peut être contractée) : ils correspondent au maillage final
+        while(snapshots.size() < thresholds.size()){
+            snapshots.push_back(take_mesh_snapshot(m_surface_mesh));
+        }
+        m_timings["algorithm"] = elapsed_milliseconds(start_time);
+
+        std::size_t snapshot_bytes = 0;
+        for(const Mesh_snapshot& snapshot : snapshots){
+            snapshot_bytes += snapshot.vertices.size() * sizeof(float) + snapshot.faces.size() * sizeof(std::int32_t);
+        }
+        this->record_size("lod_snapshot_bytes", snapshot_bytes);
+        this->compact_surface_mesh();
+        m_mesh_handle->geometry_changed();
+    }
+
+    const Clock::time_point start_time = Clock::now();
+
+    //Les niveaux sont retournés dans l'ordre des facteurs de décimation fournis
+    std::vector<py::object> levels(ratios.size());
+    for(std::size_t i = 0; i < order.size(); ++i){
+        py::dict level;
+        level["vertices"] = to_numpy(std::move(snapshots[i].vertices), 3);
+        level["faces"] = to_numpy(std::move(snapshots[i].faces), 3);
+        levels[order[i]] = level;
+    }
+
+    py::list result;
+    for(const py::object& level : levels){
+        result.append(level);
+    }
+    m_timings["export"] = elapsed_milliseconds(start_time);
+    return result;
 }
 
-std::unordered_map<vertex_descriptor, int> SurfaceMeshSimplification::get_indices_remapping(){
-    std::unordered_map<vertex_descriptor, int> remapping;
+py::list SurfaceMeshSimplification::simplify_lods_to_face_budgets(const std::vector<std::size_t>& face_budgets){
+    //Un maillage triangulé possède environ 3F/2 arêtes : un budget de faces correspond au même facteur de décimation des arêtes
+    const double number_of_faces = static_cast<double>(std::max<std::size_t>(m_surface_mesh.number_of_faces(), 1));
+    std::vector<double> ratios;
+    ratios.reserve(face_budgets.size());
+    for(std::size_t face_budget : face_budgets){
+        ratios.push_back(static_cast<double>(face_budget) / number_of_faces);
+    }
+    return this->simplify_lods(ratios);
+}
 
-    // Pour ré-indexer le maillage, nous allons parcourir l'ensemble des sommets du maillage
-    // et associer pour chacun d'entre eux un indice qui ira de 0 au nombre de sommets du maillage - 1
-    int new_index = 0;
-    for (const auto& vertex : m_surface_mesh.vertices()) {
-        remapping[vertex] = new_index++;
+py::dict SurfaceMeshSimplification::get_statistics() const{
+    //Durées des phases (conversion, mesh_build, is_triangle_mesh, algorithm, remap, error, export) en millisecondes,
+    //tailles maximales des allocations (nombres d'éléments et octets), nombres d'éléments traités par la dernière exécution
+    //(removed_edges, constrained_edges) et, si elle a été activée, erreur géométrique
+    py::dict statistics;
+    statistics["timings_ms"] = m_timings;
+    statistics["sizes"] = m_sizes;
+    statistics["counts"] = m_counts;
+    if(!m_error.empty()){
+        statistics["error"] = this->get_error();
     }
+    return statistics;
+}
+
+py::tuple SurfaceMeshSimplification::get_progress() const{
+    //Nombre d'arêtes supprimées et nombre d'arêtes à supprimer par l'exécution en cours (simplification ou niveaux de détail,
+    //dont l'exécution se poursuit jusqu'au niveau le plus grossier)
+    const std::size_t initial_edges = m_initial_edges.load();
+    const std::size_t removed_edges = initial_edges - std::min(initial_edges, m_current_edges.load());
+    const std::size_t target_removed_edges = initial_edges - std::min(initial_edges, m_target_edges.load());
+    return py::make_tuple(removed_edges, target_removed_edges);
+}
+
+void SurfaceMeshSimplification::cancel(){
+    //L'algorithme s'interrompt à la prochaine évaluation du prédicat d'arrêt, le maillage restant dans un état valide
+    m_cancel_requested = true;
+}
 
-    return remapping;
+bool SurfaceMeshSimplification::is_cancelled() const{
+    return m_cancel_requested.load();
 }
 
 PYBIND11_MODULE(mesh_simplification, handle){
     handle.doc() = "Classe implémentant l'algorithme 'Triangulated Surface Mesh Simplification' de Lindstrom-Turk.";
+    // Version du module : elle intervient dans la clé du cache des résultats des extensions
+    handle.attr("__version__") = MESH_SIMPLIFICATION_VERSION;
+    // Maillage partagé avec le module de segmentation
+    register_mesh_handle(handle);
 
     py::class_<SurfaceMeshSimplification>(handle, "SurfaceMeshSimplification")
         .def(py::init<py::dict>())
+        .def(py::init<std::shared_ptr<MeshHandle>, double>(), py::arg("mesh_handle").none(false), py::arg("decimation_factor"))
+        .def(py::init<const Float_array&, const Int_array&, double>(), py::arg("vertices"), py::arg("faces"), py::arg("decimation_factor"))
+        .def("get_mesh_handle", &SurfaceMeshSimplification::get_mesh_handle)
+        .def("set_constrained_vertices", &SurfaceMeshSimplification::set_constrained_vertices, py::arg("vertex_indices"))
+        .def("get_original_vertex_indices", &SurfaceMeshSimplification::get_original_vertex_indices)
+        .def("enable_error_metrics", &SurfaceMeshSimplification::enable_error_metrics, py::arg("number_of_samples"), py::arg("number_of_threads") = 0)
+        .def("get_error", &SurfaceMeshSimplification::get_error)
         .def("triangulated_surface_mesh_simplification", &SurfaceMeshSimplification::triangulated_surface_mesh_simplification)
-        .def("get_surface_mesh_data", &SurfaceMeshSimplification::get_surface_mesh_data);
+        .def("get_vertices", &SurfaceMeshSimplification::get_vertices)
+        .def("get_faces", &SurfaceMeshSimplification::get_faces)
+        .def("get_surface_mesh_data", &SurfaceMeshSimplification::get_surface_mesh_data)
+        .def("simplify_lods", &SurfaceMeshSimplification::simplify_lods, py::arg("ratios"))
+        .def("simplify_lods_to_face_budgets", &SurfaceMeshSimplification::simplify_lods_to_face_budgets, py::arg("face_budgets"))
+        .def("get_statistics", &SurfaceMeshSimplification::get_statistics)
+        .def("get_progress", &SurfaceMeshSimplification::get_progress)
+        .def("cancel", &SurfaceMeshSimplification::cancel)
+        .def("is_cancelled", &SurfaceMeshSimplification::is_cancelled);
 }
@@ -3,38 +3,199 @@
 
 #include <vector>
 #include <chrono>
-#include <iostream>
+#include <map>
+#include <string>
+#include <cstdint>
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
-#include <unordered_map>
 #include <stdexcept>
 #include <algorithm>
+#include <atomic>
+#include <thread>
+#include <cmath>
+#include <memory>
+#include <utility>
+
+#include "MeshHandle.hpp"
+#include "AlgorithmUtils.hpp"
 
-#include <CGAL/Simple_cartesian.h>
-#include <CGAL/Surface_mesh.h>
 #include <CGAL/Surface_mesh_simplification/edge_collapse.h>
+#include <CGAL/Surface_mesh_simplification/Edge_collapse_visitor_base.h>
 #include <CGAL/Surface_mesh_simplification/Policies/Edge_collapse/Edge_count_ratio_stop_predicate.h>
+#include <CGAL/Surface_mesh_simplification/Policies/Edge_collapse/LindstromTurk_placement.h>
 #include <CGAL/boost/graph/generators.h>
+#include <CGAL/AABB_tree.h>
+#include <CGAL/AABB_traits.h>
+#include <CGAL/AABB_face_graph_triangle_primitive.h>
+#include <CGAL/Polygon_mesh_processing/bbox.h>
+
+// Le noyau, le type de maillage et les tableaux numpy sont définis par MeshHandle.hpp, partagé avec le module de segmentation
+// Arêtes contraintes de l'algorithme de contraction d'arêtes (jamais contractées)
+typedef Surface_mesh::Property_map<edge_descriptor, bool> Edge_constraint_map;
+// Indice d'origine des sommets verrouillés de l'algorithme de contraction d'arêtes, jamais déplacés (-1 pour un sommet libre)
+typedef Surface_mesh::Property_map<vertex_descriptor, std::int32_t> Vertex_index_map;
+// Arbre AABB des triangles d'un maillage, utilisé pour les requêtes de distance de la mesure d'erreur
+typedef CGAL::AABB_face_graph_triangle_primitive<Surface_mesh>   AABB_primitive;
+typedef CGAL::AABB_traits<Kernel, AABB_primitive>                AABB_traits;
+typedef CGAL::AABB_tree<AABB_traits>                             AABB_tree;
+
+// Version du module, à incrémenter à chaque modification des résultats de l'algorithme
+const char* const MESH_SIMPLIFICATION_VERSION = "1.4.0";
+
+// Distances (au carré) des points échantillonnés sur un maillage à la surface d'un autre maillage
+struct Sampled_distances{
+    double max_squared_distance = 0.0;
+    double sum_squared_distances = 0.0;
+    std::size_t number_of_samples = 0;
+};
+
+// Échantillonne 'number_of_samples' points sur 'source', uniformément selon l'aire, et mesure leur distance à la surface indexée
+// par 'target_tree'. Les échantillons sont répartis sur 'number_of_threads' threads (0 : l'ensemble des coeurs)
+Sampled_distances sampled_distances(const Surface_mesh& source, const AABB_tree& target_tree, std::size_t number_of_samples,
+                                    unsigned int number_of_threads, std::uint64_t seed);
+
+// Copie compacte (indices contigus) des sommets et des faces d'un maillage, prise pendant l'algorithme de simplification
+struct Mesh_snapshot{
+    std::vector<float> vertices;
+    std::vector<std::int32_t> faces;
+};
+
+Mesh_snapshot take_mesh_snapshot(const Surface_mesh& surface_mesh);
+
+// Visiteur de l'algorithme de contraction d'arêtes : publie le nombre d'arêtes restantes après chaque contraction
+// afin que la progression puisse être consultée depuis un autre thread.
+// Si des seuils (nombres d'arêtes décroissants) sont fournis, une copie du maillage est prise dès que chacun d'eux est franchi.
+// Si des sommets verrouillés sont fournis, l'indice d'origine d'un sommet verrouillé supprimé par une contraction est reporté
+// sur le sommet conservé
+class Simplification_visitor : public CGAL::Surface_mesh_simplification::Edge_collapse_visitor_base<Surface_mesh>{
+    public:
+    Simplification_visitor(const Surface_mesh* surface_mesh, std::atomic<std::size_t>* current_edges,
+                           const std::vector<double>* thresholds = nullptr, std::vector<Mesh_snapshot>* snapshots = nullptr) :
+        m_surface_mesh(surface_mesh), m_current_edges(current_edges), m_thresholds(thresholds), m_snapshots(snapshots){}
+
+    void set_original_indices(const Vertex_index_map& original_indices){
+        m_original_indices = original_indices;
+        m_has_original_indices = true;
+    }
 
-typedef CGAL::Simple_cartesian<double>          Kernel;
-typedef Kernel::Point_3                         Point_3;
-typedef CGAL::Surface_mesh<Point_3>             Surface_mesh;
-typedef Surface_mesh::Vertex_index              vertex_descriptor;
-typedef Surface_mesh::Face_index                face_descriptor;
+    template <class Profile>
+    void OnCollapsed(const Profile& profile, vertex_descriptor kept_vertex){
+        //CGAL conserve l'un ou l'autre des deux sommets de l'arête : le verrou et l'indice d'origine suivent le sommet conservé
+        if(m_has_original_indices){
+            const std::int32_t v0_index = get(m_original_indices, profile.v0());
+            m_original_indices[kept_vertex] = v0_index >= 0 ? v0_index : get(m_original_indices, profile.v1());
+        }
+
+        const std::size_t current_edges = m_surface_mesh->number_of_edges();
+        m_current_edges->store(current_edges, std::memory_order_relaxed);
+
+        if(m_snapshots != nullptr){
+            while(m_snapshots->size() < m_thresholds->size() && static_cast<double>(current_edges) < (*m_thresholds)[m_snapshots->size()]){
+                m_snapshots->push_back(take_mesh_snapshot(*m_surface_mesh));
+            }
+        }
+    }
+
+    private:
+    const Surface_mesh* m_surface_mesh;
+    std::atomic<std::size_t>* m_current_edges;
+    const std::vector<double>* m_thresholds;
+    std::vector<Mesh_snapshot>* m_snapshots;
+    Vertex_index_map m_original_indices;
+    bool m_has_original_indices = false;
+};
+
+// Placement des sommets de l'algorithme de contraction d'arêtes laissant en place les sommets verrouillés (ceux dont l'indice
+// d'origine est renseigné) : une arête reliant
+// deux sommets verrouillés n'est pas contractée, une arête reliant un sommet verrouillé à un sommet libre est contractée sur
+// le sommet verrouillé. Les autres arêtes sont placées par 'Base'
+template <class Base>
+class Locked_vertices_placement{
+    public:
+    explicit Locked_vertices_placement(const Vertex_index_map& original_indices, const Base& base = Base()) :
+        m_original_indices(original_indices), m_base(base){}
+
+    template <class Profile>
+    auto operator()(const Profile& profile) const -> decltype(std::declval<const Base&>()(profile)){
+        const bool v0_locked = get(m_original_indices, profile.v0()) >= 0;
+        const bool v1_locked = get(m_original_indices, profile.v1()) >= 0;
+        //Aucun placement : l'arête n'est pas contractée
+        if(v0_locked && v1_locked){
+            return {};
+        }
+        if(v0_locked){
+            return profile.p0();
+        }
+        if(v1_locked){
+            return profile.p1();
+        }
+        return m_base(profile);
+    }
+
+    private:
+    Vertex_index_map m_original_indices;
+    Base m_base;
+};
 
 class SurfaceMeshSimplification{
     public:
     explicit SurfaceMeshSimplification(pybind11::dict data);
+    SurfaceMeshSimplification(const Float_array& vertices, const Int_array& faces, double stop_ratio);
+    SurfaceMeshSimplification(std::shared_ptr<MeshHandle> mesh_handle, double stop_ratio);
+    std::shared_ptr<MeshHandle> get_mesh_handle() const;
+    void set_constrained_vertices(const Int_array& vertex_indices);
+    pybind11::array_t<std::int32_t> get_original_vertex_indices() const;
+    void enable_error_metrics(std::size_t number_of_samples, unsigned int number_of_threads);
+    pybind11::dict get_error() const;
     void triangulated_surface_mesh_simplification();
-    void update_vertices_coordinates();
+    pybind11::array_t<float> get_vertices();
+    pybind11::array_t<std::int32_t> get_faces();
     pybind11::dict get_surface_mesh_data();
-    void update_face_indices();
-    std::unordered_map<vertex_descriptor, int> get_indices_remapping();
+    pybind11::list simplify_lods(const std::vector<double>& ratios);
+    pybind11::list simplify_lods_to_face_budgets(const std::vector<std::size_t>& face_budgets);
+    pybind11::dict get_statistics() const;
+    pybind11::tuple get_progress() const;
+    void cancel();
+    bool is_cancelled() const;
 
     private:
-    Surface_mesh m_surface_mesh;
-    pybind11::dict m_surface_mesh_data;
+    void build_surface_mesh(const Float_array& vertices, const Int_array& faces);
+    void check_triangle_mesh();
+    void compact_surface_mesh();
+    void record_size(const std::string& name, std::size_t size);
+    void start_progress(double stop_ratio);
+    std::size_t mark_constrained_edges(Edge_constraint_map& constrained_edges) const;
+    void compute_error();
+
+    // Maillage sur lequel l'algorithme s'exécute en place : construit par le constructeur à partir des tableaux fournis,
+    // ou partagé avec d'autres traitements (segmentation) lorsqu'un MeshHandle est fourni
+    std::shared_ptr<MeshHandle> m_mesh_handle;
+    Surface_mesh& m_surface_mesh;
     double m_stop_ratio;
+    // Sommets contraints (indexés par leur indice d'origine) : ils ne sont pas déplacés par l'algorithme et les arêtes de bord
+    // reliant deux d'entre eux sont préservées
+    std::vector<bool> m_constrained_vertices;
+    // Indice d'origine de chaque sommet du maillage simplifié (-1 pour un sommet libre), renseigné lorsque des sommets
+    // contraints ont été définis : les sommets contraints sont retrouvés sans comparer leurs coordonnées
+    std::vector<std::int32_t> m_original_vertex_indices;
+    // Mesure de l'erreur géométrique : copie du maillage d'origine (conservée pendant l'algorithme uniquement), nombre
+    // d'échantillons par sens de mesure (0 : mesure désactivée), threads utilisés et distances mesurées
+    Surface_mesh m_original_mesh;
+    std::size_t m_error_samples;
+    unsigned int m_error_threads;
+    std::map<std::string, double> m_error;
+    // Suivi de la progression (nombre d'arêtes initial, courant et visé par l'exécution en cours) et demande d'annulation,
+    // consultés depuis le thread Python principal pendant l'exécution de l'algorithme
+    std::atomic<std::size_t> m_initial_edges;
+    std::atomic<std::size_t> m_current_edges;
+    std::atomic<std::size_t> m_target_edges;
+    std::atomic<bool> m_cancel_requested;
+    // Statistiques de performance : durée de chaque phase (en millisecondes), tailles maximales des allocations
+    // et nombres d'éléments traités
+    std::map<std::string, double> m_timings;
+    std::map<std::string, std::size_t> m_sizes;
+    std::map<std::string, std::size_t> m_counts;
 };
 
 #endif
@@ -1,11 +1,11 @@
 bl_info = {
     'name': 'Lindstrom-Turk\'s \'Triangulated Surface Mesh Simplification\' implementation algorithm',
     'author': 'Richard Leestmans',
-    'version': (1, 0),
+    'version': (1, 1),
     'blender': (4, 0, 0),
     'description': 'Script permettant de simplifier le maillage d\'un objet en implémentant l\'algorithme \'Triangulated Surface Mesh Simplification\' de Lindstrom-Turk',
     'location': 'VIEW3D > UI > Mesh Simplification',
-    'warning': 'Cet algorithme ne fonctionne que sur des maillages connexes!',
+    'warning': 'Les maillages non connexes doivent être simplifiés composante par composante (mode \'composantes\')',
     'doc_url': 'https://doc.cgal.org/latest/Surface_mesh_simplification/index.html#Chapter_Triangulated_Surface_Mesh_Simplification',
     'tracker_url': '',
     'category': 'Mesh',
@@ -14,124 +14,657 @@ bl_info = {
 import bpy
 import bmesh
 import numpy as np
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import mesh_simplification
 from mesh_simplification import SurfaceMeshSimplification
+# Modules communs aux deux extensions (dossier Common), installés à côté des modules compilés
+from execution_statistics import ExecutionStatistics, draw_statistics
+from mesh_buffers import extract_mesh_buffers, nearest_points, union_find_roots
+from phase_timer import PhaseTimer
+from result_cache import ResultCache
+# Registre des maillages CGAL partagés avec l'extension de segmentation
+import mesh_handle_registry
 
-# Permet de trianguler un maillage en fonction du contexte utilisé
-def triangulate_mesh(context, object):
-    if not object or object.type != 'MESH':
-        raise RuntimeError('Aucun maillage n\'est sélectionné')
+# Statistiques de la dernière exécution de l'algorithme, affichées dans le panneau
+execution_statistics = ExecutionStatistics(bl_info['version'])
+
+
+# Version des résultats (module C++ et extension) : une nouvelle version invalide les entrées du cache
+RESULTS_VERSION = (getattr(mesh_simplification, '__version__', 'inconnue'), bl_info['version'])
+result_cache = ResultCache(os.path.join(tempfile.gettempdir(), 'mesh_simplification_cache'))
+
+
+# Retourne le cache des résultats configuré selon les propriétés de la scène, ou None s'il est désactivé
+def get_result_cache(context):
+    properties = context.scene.simplification_properties
+    if not properties.use_result_cache:
+        return None
+    result_cache.configure(bpy.path.abspath(properties.cache_directory), properties.cache_size * 1024 * 1024)
+    return result_cache
+
+
+# Clé du cache du résultat de la simplification d'un maillage (l'erreur géométrique, si elle est mesurée, est conservée avec le résultat)
+# Un maillage simplifié composante par composante l'est selon le mode choisi et, pour le mode 'GLOBAL_BUDGET', selon le budget de faces
+def simplification_cache_key(vertices, faces, decimation_factor, error_samples=0, component_mode='NONE', face_budget=0):
+    parameters = ('simplification', decimation_factor, RESULTS_VERSION)
+    if component_mode != 'NONE':
+        parameters += (('components', component_mode, face_budget if component_mode == 'GLOBAL_BUDGET' else 0),)
+    return ResultCache.key((vertices, faces), parameters + (('error', error_samples),) if error_samples > 0 else parameters)
+
+
+# Statistiques d'une exécution servie par le cache : ni la conversion du maillage ni l'algorithme n'ont été exécutés
+def cached_statistics(start_time):
+    return {'timings_ms': {'cache_load': (time.perf_counter() - start_time) * 1000.0}, 'sizes': {}, 'counts': {}}
+
+
+# Mesures de l'erreur géométrique retournées par le code C++, dans l'ordre de leur enregistrement dans le cache
+ERROR_METRICS = ('hausdorff_to_original', 'hausdorff_from_original', 'hausdorff', 'rms_to_original', 'rms', 'samples', 'bbox_diagonal')
+
+
+# Tableaux d'une entrée du cache : maillage simplifié et, si elle a été mesurée, erreur géométrique
+def cache_entry(vertices, faces, statistics):
+    entry = {'vertices': vertices, 'faces': faces}
+    if statistics.get('error'):
+        entry['error'] = np.array([statistics['error'].get(name, 0.0) for name in ERROR_METRICS])
+    return entry
+
+
+# Statistiques d'une entrée lue dans le cache, accompagnées de l'erreur géométrique qui y a été conservée
+def cache_entry_statistics(entry, start_time):
+    statistics = cached_statistics(start_time)
+    if 'error' in entry:
+        statistics['error'] = dict(zip(ERROR_METRICS, entry['error'].tolist()))
+    return statistics
+
+
+# Combine les erreurs géométriques de plusieurs maillages simplifiés séparément (composantes connexes) : les distances de
+# Hausdorff sont les plus grandes des distances et l'erreur quadratique moyenne est pondérée par le nombre d'échantillons
+def merge_errors(errors):
+    errors = [error for error in errors if error]
+    if not errors:
+        return {}
+    samples = sum(error['samples'] for error in errors)
+    merged = {name: max(error[name] for error in errors) for name in ('hausdorff_to_original', 'hausdorff_from_original', 'hausdorff')}
+    for name in ('rms_to_original', 'rms'):
+        merged[name] = (sum(error[name] ** 2 * error['samples'] for error in errors) / samples) ** 0.5 if samples > 0 else 0.0
+    merged['samples'] = samples
+    return merged
+
+
+# Maillage CGAL de l'objet 'object_name' tiré du registre partagé avec l'extension de segmentation, retiré du registre le temps
+# d'être simplifié en place (None si l'objet n'est pas nommé ou si le module compilé ne le permet pas)
+def acquire_mesh_handle(object_name, vertices, faces):
+    if object_name is None or not hasattr(mesh_simplification, 'MeshHandle'):
+        return None
+    return mesh_handle_registry.registry.acquire(object_name, vertices, faces, mesh_simplification.MeshHandle, exclusive=True)
+
+
+# Crée l'instance de l'algorithme sur le maillage partagé s'il est fourni, sinon sur un maillage construit à partir des tableaux
+def simplification_instance(mesh_handle, vertices, faces, decimation_factor):
+    if mesh_handle is None:
+        return SurfaceMeshSimplification(vertices, faces, decimation_factor)
+    return SurfaceMeshSimplification(mesh_handle, decimation_factor)
+
+
+# Replace dans le registre le maillage simplifié en place, qui correspond désormais à la géométrie appliquée à l'objet :
+# une segmentation de l'objet le réutilise sans nouvelle conversion
+def register_mesh_handle(object_name, mesh_handle, vertices, faces):
+    if mesh_handle is not None:
+        mesh_handle_registry.registry.register(object_name, mesh_handle, vertices, faces)
+
+
+# Replace dans le registre, sous la géométrie de l'objet, le maillage partagé d'un traitement qui a échoué s'il est resté intact
+# (aucune modification depuis 'revision', par exemple un maillage refusé car non triangulé) : un maillage modifié avant l'échec
+# n'y est pas replacé, la prochaine exécution en reconstruit un à partir des tableaux de l'objet
+def restore_mesh_handle(object_name, mesh_handle, revision, vertices, faces):
+    if mesh_handle is not None and mesh_handle.revision() == revision:
+        register_mesh_handle(object_name, mesh_handle, vertices, faces)
+
+
+# Exécute l'algorithme de simplification sur des tableaux de sommets et de faces et retourne le maillage simplifié,
+# la durée du calcul et les statistiques du code C++ (le résultat est lu depuis ou écrit dans 'cache' s'il est fourni)
+# Si 'error_samples' est non nul, l'erreur géométrique mesurée sur ce nombre d'échantillons est ajoutée aux statistiques
+# Si 'object_name' est fourni, le maillage CGAL de l'objet est tiré du registre partagé puis y est replacé une fois simplifié
+# Cette fonction n'accède pas à bpy : elle peut être exécutée depuis un thread secondaire (le GIL est relâché par le code C++)
+# Une exécution suivie par 'monitor' (voir SimplificationMonitor) peut être annulée : son résultat partiel n'est alors ni mis
+# en cache ni replacé dans le registre des maillages partagés
+def simplify_buffers(vertices, faces, decimation_factor, cache=None, error_samples=0, object_name=None, monitor=None):
+    start_time = time.perf_counter()
+    if cache is not None:
+        key = simplification_cache_key(vertices, faces, decimation_factor, error_samples)
+        result = cache.get(key)
+        if result is not None:
+            if monitor is not None:
+                monitor.finish(len(faces) // 3)
+            return result['vertices'], result['faces'], time.perf_counter() - start_time, cache_entry_statistics(result, start_time)
+
+    mesh_handle = acquire_mesh_handle(object_name, vertices, faces)
+    revision = mesh_handle.revision() if mesh_handle is not None else None
+    cgal_mesh = None
+    try:
+        cgal_mesh = simplification_instance(mesh_handle, vertices, faces, decimation_factor)
+        if error_samples > 0:
+            cgal_mesh.enable_error_metrics(error_samples)
+        if monitor is not None:
+            monitor.start(cgal_mesh, len(faces) // 3)
+        cgal_mesh.triangulated_surface_mesh_simplification()
+
+        # Récupération des tableaux numpy du maillage résultant de l'algorithme de décimation réalisé côté C++
+        # (sommets float32 (N, 3) et faces int32 (M, 3), mis à plat sans copie pour foreach_set)
+        simplified_mesh_vertices = cgal_mesh.get_vertices().ravel()
+        simplified_mesh_faces = cgal_mesh.get_faces().ravel()
+        statistics = cgal_mesh.get_statistics()
+    except Exception:
+        restore_mesh_handle(object_name, mesh_handle, revision, vertices, faces)
+        raise
+    finally:
+        if monitor is not None:
+            monitor.finish(len(faces) // 3, cgal_mesh)
+    if cgal_mesh.is_cancelled():
+        return simplified_mesh_vertices, simplified_mesh_faces, time.perf_counter() - start_time, statistics
+    if cache is not None:
+        cache.put(key, cache_entry(simplified_mesh_vertices, simplified_mesh_faces, statistics))
+    register_mesh_handle(object_name, mesh_handle, simplified_mesh_vertices, simplified_mesh_faces)
+    return simplified_mesh_vertices, simplified_mesh_faces, time.perf_counter() - start_time, statistics
+
+
+# Suivi d'une simplification exécutée depuis un thread secondaire (opérateur modal), éventuellement répartie sur plusieurs
+# instances de l'algorithme (une par composante connexe) : annulation de l'ensemble des instances et progression globale,
+# chaque instance comptant pour son nombre de faces
+class SimplificationMonitor:
+    def __init__(self, number_of_faces):
+        self.number_of_faces = max(number_of_faces, 1)
+        # instances en cours d'exécution et nombre de faces de chacune
+        self.instances = []
+        # nombre de faces des maillages déjà traités (simplifiés, servis par le cache ou conservés tels quels)
+        self.finished_faces = 0
+        self.cancelled = False
+        # Les instances sont ajoutées depuis les threads de calcul et consultées depuis le thread principal
+        self.lock = threading.Lock()
+
+    # Une instance démarrée après la demande d'annulation est annulée avant même l'exécution de l'algorithme
+    def start(self, cgal_mesh, number_of_faces):
+        with self.lock:
+            self.instances.append((cgal_mesh, number_of_faces))
+            cancelled = self.cancelled
+        if cancelled:
+            cgal_mesh.cancel()
+
+    def finish(self, number_of_faces, cgal_mesh=None):
+        with self.lock:
+            self.instances = [instance for instance in self.instances if instance[0] is not cgal_mesh]
+            self.finished_faces += number_of_faces
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            instances = list(self.instances)
+        for cgal_mesh, _ in instances:
+            cgal_mesh.cancel()
+
+    # Proportion du travail effectuée : faces des maillages traités et, pour chaque instance en cours, nombre d'arêtes
+    # supprimées par rapport au nombre d'arêtes à supprimer
+    def progress(self):
+        with self.lock:
+            instances = list(self.instances)
+            finished_faces = self.finished_faces
+        for cgal_mesh, number_of_faces in instances:
+            removed_edges, target_removed_edges = cgal_mesh.get_progress()
+            if target_removed_edges > 0:
+                finished_faces += number_of_faces * min(removed_edges / target_removed_edges, 1.0)
+        return min(finished_faces / self.number_of_faces, 1.0)
+
+
+# Nombre de faces en deçà duquel une composante n'est pas simplifiée (un tétraèdre ne peut plus l'être)
+MIN_COMPONENT_FACES = 4
+
+
+# Découpe un maillage (sommets (N, 3), faces (M, 3)) en composantes connexes
+# Retourne la liste des composantes (sommets et faces réindexées localement), les sommets isolés étant ignorés
+def split_components(vertices, faces):
+    vertices = vertices.reshape(-1, 3)
+    faces = faces.reshape(-1, 3)
+    # Un maillage sans face (nuage de points, arêtes seules) n'a aucune composante
+    if len(faces) == 0:
+        return []
+    # Deux faces partageant un sommet appartiennent à la même composante : deux arêtes par triangle suffisent à relier ses
+    # trois sommets
+    vertex_roots = union_find_roots(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]]]), len(vertices))
+    # Numérotation compacte des composantes possédant au moins une face
+    roots = np.unique(vertex_roots[faces[:, 0]])
+    position = np.minimum(np.searchsorted(roots, vertex_roots), len(roots) - 1)
+    vertex_labels = np.where(roots[position] == vertex_roots, position, len(roots))
+    face_labels = vertex_labels[faces[:, 0]]
+
+    # Tri des sommets et des faces par composante : chaque composante occupe une plage contiguë
+    vertex_order = np.argsort(vertex_labels, kind='stable')
+    vertex_counts = np.bincount(vertex_labels, minlength=len(roots) + 1)
+    vertex_starts = np.cumsum(vertex_counts) - vertex_counts
+    # indice local de chaque sommet au sein de sa composante
+    local_indices = np.empty(len(vertices), dtype=np.int32)
+    local_indices[vertex_order] = np.arange(len(vertices)) - np.repeat(vertex_starts, vertex_counts)
+    face_order = np.argsort(face_labels, kind='stable')
+    face_counts = np.bincount(face_labels, minlength=len(roots))
+    face_starts = np.cumsum(face_counts) - face_counts
+
+    sorted_vertices = vertices[vertex_order]
+    sorted_faces = local_indices[faces[face_order]]
+    return [(np.ascontiguousarray(sorted_vertices[vertex_starts[label]:vertex_starts[label] + vertex_counts[label]]),
+             np.ascontiguousarray(sorted_faces[face_starts[label]:face_starts[label] + face_counts[label]]))
+            for label in range(len(roots))]
+
+
+# Facteur de décimation de chaque composante : le même pour toutes ('PER_COMPONENT') ou issu de la répartition d'un budget
+# global de faces proportionnellement au nombre de faces de chaque composante ('GLOBAL_BUDGET')
+def component_ratios(face_counts, decimation_factor, component_mode, face_budget):
+    face_counts = np.asarray(face_counts, dtype=np.float64)
+    if component_mode != 'GLOBAL_BUDGET':
+        return np.full(len(face_counts), decimation_factor)
+    # Chaque composante conserve au moins MIN_COMPONENT_FACES faces, le reste du budget étant réparti sur les autres
+    budgets = np.maximum(face_budget * face_counts / face_counts.sum(), MIN_COMPONENT_FACES)
+    return np.clip(budgets / face_counts, 0.0, 1.0)
+
+
+# Simplifie chaque composante connexe d'un maillage sur un pool de 'max_workers' threads puis fusionne les résultats en un seul
+# maillage (les indices des faces de chaque composante sont décalés du nombre de sommets des composantes précédentes)
+# Retourne, comme simplify_buffers, le maillage simplifié, la durée du calcul et les statistiques cumulées des composantes
+# Le résultat est mis en cache pour le maillage entier (voir simplify_object_buffers), et non composante par composante
+def simplify_components(vertices, faces, decimation_factor, component_mode, face_budget, max_workers, error_samples=0, monitor=None):
+    start_time = time.perf_counter()
+    components = split_components(vertices, faces)
+    ratios = component_ratios([len(component_faces) for _, component_faces in components], decimation_factor, component_mode, face_budget)
+
+    def simplify_component(component, ratio):
+        component_vertices, component_faces = component
+        # Les composantes trop petites ou non décimées, ou dont la simplification n'a pas encore commencé lorsque l'annulation
+        # est demandée, sont conservées telles quelles
+        if len(component_faces) <= MIN_COMPONENT_FACES or ratio >= 1.0 or (monitor is not None and monitor.cancelled):
+            if monitor is not None:
+                monitor.finish(len(component_faces))
+            return component_vertices.ravel(), component_faces.ravel(), 0.0, {'timings_ms': {}, 'sizes': {}, 'counts': {}}
+        return simplify_buffers(component_vertices, component_faces, float(ratio), None, error_samples, monitor=monitor)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(simplify_component, components, ratios))
+
+    # Fusion des composantes simplifiées en un unique tableau de sommets et de faces
+    offsets = np.cumsum([0] + [len(result_vertices) // 3 for result_vertices, _, _, _ in results[:-1]])
+    merged_vertices = np.concatenate([result_vertices for result_vertices, _, _, _ in results]) if results else np.empty(0, dtype=np.float32)
+    merged_faces = (np.concatenate([result_faces + offset for (_, result_faces, _, _), offset in zip(results, offsets)]).astype(np.int32)
+                    if results else np.empty(0, dtype=np.int32))
+
+    # Les durées des phases, les tailles et les nombres d'éléments sont cumulés sur l'ensemble des composantes (temps de
+    # calcul et non temps écoulé)
+    statistics = {'timings_ms': {}, 'sizes': {}, 'counts': {'components': len(components)}}
+    for _, _, _, component_statistics in results:
+        for name, duration in component_statistics['timings_ms'].items():
+            statistics['timings_ms'][name] = statistics['timings_ms'].get(name, 0.0) + duration
+        for name, size in component_statistics['sizes'].items():
+            statistics['sizes'][name] = statistics['sizes'].get(name, 0) + size
+        for name, count in component_statistics.get('counts', {}).items():
+            statistics['counts'][name] = statistics['counts'].get(name, 0) + count
+    error = merge_errors([component_statistics.get('error') for _, _, _, component_statistics in results])
+    if error:
+        statistics['error'] = error
+    return merged_vertices, merged_faces, time.perf_counter() - start_time, statistics
+
+
+# Simplifie un maillage entier ou composante par composante selon le mode choisi
+# 'max_workers' threads sont utilisés pour les composantes (les options sont lues depuis le thread principal)
+# Un maillage entier est simplifié sur le maillage CGAL partagé de l'objet 'object_name', s'il est fourni
+def simplify_object_buffers(vertices, faces, options, max_workers, cache=None, object_name=None, monitor=None):
+    if options['component_mode'] == 'NONE':
+        return simplify_buffers(vertices, faces, options['decimation_factor'], cache, options['error_samples'], object_name, monitor)
+
+    start_time = time.perf_counter()
+    if cache is not None:
+        key = simplification_cache_key(vertices, faces, options['decimation_factor'], options['error_samples'], options['component_mode'],
+                                       options['face_budget'])
+        result = cache.get(key)
+        if result is not None:
+            return result['vertices'], result['faces'], time.perf_counter() - start_time, cache_entry_statistics(result, start_time)
+    simplified_mesh_vertices, simplified_mesh_faces, _, statistics = simplify_components(
+        vertices, faces, options['decimation_factor'], options['component_mode'], options['face_budget'], max_workers, options['error_samples'], monitor)
+    if cache is not None and not (monitor is not None and monitor.cancelled):
+        cache.put(key, cache_entry(simplified_mesh_vertices, simplified_mesh_faces, statistics))
+    return simplified_mesh_vertices, simplified_mesh_faces, time.perf_counter() - start_time, statistics
+
+
+# Options de simplification lues depuis les propriétés de la scène
+def simplification_options(context):
+    properties = context.scene.simplification_properties
+    return {
+        'decimation_factor': properties.decimation_factor,
+        'component_mode': properties.component_mode,
+        'face_budget': properties.face_budget,
+        # nombre d'échantillons de la mesure de l'erreur géométrique (0 : erreur non mesurée)
+        'error_samples': properties.error_samples if properties.compute_error else 0,
+    }
+
+
+# Masque des polygones sélectionnés du maillage (les sélections du mode 'Edition' y sont reportées par extract_mesh_buffers)
+def polygon_selection(mesh):
+    selection = np.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get('select', selection)
+    return selection
+
+
+# Simplifie uniquement la région 'region' (masque des triangles) d'un maillage : seuls ses triangles sont envoyés au code C++,
+# son bord avec le reste du maillage étant contraint (ni contracté, ni déplacé)
+# Retourne les sommets et les faces de la région simplifiée, l'indice du sommet d'origine correspondant à chaque sommet du
+# résultat (-1 pour un sommet intérieur à la région), la durée du calcul et les statistiques du code C++
+# Les sommets du bord sont identifiés par le code C++, qui suit leur indice à travers les contractions d'arêtes : deux sommets
+# de mêmes coordonnées ne sont pas confondus
+def simplify_region_buffers(vertices, faces, region, decimation_factor, cache=None, error_samples=0):
+    start_time = time.perf_counter()
+    vertices = vertices.reshape(-1, 3)
+    faces = faces.reshape(-1, 3)
+    used_vertices, local_faces = np.unique(faces[region], return_inverse=True)
+    region_vertices = np.ascontiguousarray(vertices[used_vertices])
+    local_faces = np.ascontiguousarray(local_faces.reshape(-1, 3), dtype=np.int32)
+    # Les sommets de la région également utilisés par les faces non sélectionnées forment son bord
+    used_outside = np.zeros(len(vertices), dtype=bool)
+    used_outside[faces[~region].ravel()] = True
+    locked_vertices = np.flatnonzero(used_outside[used_vertices]).astype(np.int32)
+
+    result = None
+    if cache is not None:
+        key = ResultCache.key((region_vertices, local_faces, locked_vertices),
+                              ('simplification_region', decimation_factor, error_samples, RESULTS_VERSION))
+        result = cache.get(key)
+    if result is not None:
+        result_vertices, result_faces, original_indices = result['vertices'], result['faces'], result['original_indices']
+        statistics = cache_entry_statistics(result, start_time)
     else:
-        mesh = object.data
-        # Si nous nous situons en mode 'Objet'
-        if(context.mode == 'OBJECT'):
-            bm = bmesh.new()
-            bm.from_mesh(mesh)
-        # Sinon si nous nous situons en mode 'Edition'
-        elif(context.mode == 'EDIT_MESH'):
-            bm = bmesh.from_edit_mesh(mesh)
-        # Sinon nous ne nous situons ni en mode 'Objet' ni en mode 'Edition'
-        else:
-            bpy.ops.object.mode_set(mode='OBJECT')
-            
-        # On vérifie que la maillage ne possède pas de doublons en supprimant les sommets qui se superposent
-        bmesh.ops.remove_doubles(bm, verts=bm.verts[:], dist=0.0001)
-        # et on triangule l'ensemble des faces du maillage
-        bmesh.ops.triangulate(bm, faces=bm.faces[:])
-        
-        # On met à jour le mesh dans le viewport selon le mode dans lequel nous nous situons
-        # si nous nous trouvons en mode 'Objet'
-        if(context.mode == 'OBJECT'):
-            bm.to_mesh(mesh)
-            bm.free()
-        # sinon nous nous trouvons en mode 'Edition'
-        else:
-            bmesh.update_edit_mesh(mesh)
-            
+        cgal_mesh = SurfaceMeshSimplification(region_vertices, local_faces, decimation_factor)
+        cgal_mesh.set_constrained_vertices(locked_vertices)
+        if error_samples > 0:
+            cgal_mesh.enable_error_metrics(error_samples)
+        cgal_mesh.triangulated_surface_mesh_simplification()
+        result_vertices = cgal_mesh.get_vertices()
+        result_faces = cgal_mesh.get_faces()
+        # Indice, dans la région, du sommet du bord représenté par chaque sommet du résultat (-1 pour un sommet intérieur)
+        original_indices = cgal_mesh.get_original_vertex_indices()
+        statistics = cgal_mesh.get_statistics()
+        if cache is not None:
+            entry = cache_entry(result_vertices, result_faces, statistics)
+            entry['original_indices'] = original_indices
+            cache.put(key, entry)
+
+    result_indices = np.where(original_indices >= 0, used_vertices[np.maximum(original_indices, 0)], -1)
+    return result_vertices, result_faces, result_indices, time.perf_counter() - start_time, statistics
 
-def simplify_mesh(context, object):
-    # Passage du contexte en mode 'OBJET'
-    bpy.ops.object.mode_set(mode='OBJECT')
-        
-    #Nous récupérons toutes les transformations du maillage (translation, rotation, mise à l'échelle)
-    translation = object.location
-    rotation = object.rotation_euler
-    scale = object.scale
 
-    # Récupération du maillage associé à l'objet courant
+# Remplace, en mode 'Edition', les polygones sélectionnés par la région simplifiée : le reste du maillage n'est pas modifié
+# (ses polygones, sommets et attributs sont conservés) et les faces créées restent sélectionnées, avec le matériau et le
+# lissage des polygones de la région ('attributes', voir polygon_attributes)
+def splice_simplified_region(object, selected_polygons, result_vertices, result_faces, result_indices, attributes=None):
     mesh = object.data
-    
-    # Nous commençons par préparer les données à envoyer au code C++ à savoir la liste des indices des sommets par face et les coordonnées des sommets ainsi que le facteur de décimation de l'algorithme
-    # Nous créons pour cela une structure de données sous la forme d'un dictionnaire python
-    data = {}
-    # commençons par les indices des sommets des faces
-    faces = np.zeros((len(mesh.polygons) * 3), dtype=np.int32)
-    mesh.polygons.foreach_get('vertices', faces)
-    data['faces'] = faces
-    
-    vertices = np.zeros((len(mesh.vertices) * 3), dtype=np.float32)
-    mesh.vertices.foreach_get('co', vertices)
-    # et pour les coordonnées des sommets du mesh
-    data['vertices'] = vertices
+    bm = bmesh.from_edit_mesh(mesh)
+    bm.verts.ensure_lookup_table()
+    bm.faces.ensure_lookup_table()
+    # Les sommets du bord sont référencés avant la suppression des faces, qui renumérote les éléments du maillage
+    result_verts = [bm.verts[index] if index >= 0 else None for index in result_indices.tolist()]
+    bmesh.ops.delete(bm, geom=[bm.faces[index] for index in np.flatnonzero(selected_polygons).tolist()], context='FACES')
+    for index, co in enumerate(result_vertices.tolist()):
+        if result_verts[index] is None:
+            result_verts[index] = bm.verts.new(co)
+    values = transferred_attributes(attributes, result_vertices, result_faces) if attributes is not None else {}
+    material_indices = values['material_index'].tolist() if 'material_index' in values else None
+    smooth = values['use_smooth'].tolist() if 'use_smooth' in values else None
+    for index, face in enumerate(result_faces.reshape(-1, 3).tolist()):
+        bm_face = bm.faces.new([result_verts[vertex] for vertex in face])
+        bm_face.select = True
+        if material_indices is not None:
+            bm_face.material_index = material_indices[index]
+            bm_face.smooth = smooth[index]
+    bm.select_flush(True)
+    bmesh.update_edit_mesh(mesh)
+    return object
+
+
+# Simplifie uniquement les faces sélectionnées d'un objet en mode 'Edition'
+def simplify_selection(context, object, timings):
+    with PhaseTimer(timings, 'extraction'):
+        # Les sommets ne sont pas fusionnés : leurs indices désignent directement les sommets du maillage édité
+        vertices, faces, triangle_polygons = extract_mesh_buffers(object, weld_distance=0.0)
+        selected_polygons = polygon_selection(object.data)
+        region = selected_polygons[triangle_polygons]
+        attributes = polygon_attributes(object.data, vertices, faces.reshape(-1, 3)[region], triangle_polygons[region])
+    if not region.any():
+        raise RuntimeError('Aucune face n\'est sélectionnée')
+
+    options = simplification_options(context)
+    result_vertices, result_faces, result_indices, _, statistics = simplify_region_buffers(vertices, faces, region, options['decimation_factor'],
+                                                                                           get_result_cache(context), options['error_samples'])
+    with PhaseTimer(timings, 'application'):
+        splice_simplified_region(object, selected_polygons, result_vertices, result_faces, result_indices, attributes)
+    execution_statistics.record(context.scene.simplification_properties, 'simplification', object.name, timings, statistics)
+
+
+# Attributs des polygones reportés sur les faces du maillage simplifié (la géométrie de l'objet est remplacée en entier)
+POLYGON_ATTRIBUTES = (('material_index', np.int32), ('use_smooth', bool))
+
+
+# Lit, avant que le maillage ne soit remplacé, les attributs des polygones de 'mesh' pour chacun des triangles extraits
+# ('vertices', 'faces' et 'triangle_polygons' retournés par extract_mesh_buffers)
+def polygon_attributes(mesh, vertices, faces, triangle_polygons):
+    attributes = {'vertices': vertices, 'faces': faces}
+    for name, dtype in POLYGON_ATTRIBUTES:
+        values = np.empty(len(mesh.polygons), dtype=dtype)
+        mesh.polygons.foreach_get(name, values)
+        attributes[name] = values[triangle_polygons]
+    return attributes
+
+
+# Centres des triangles d'un maillage (sommets à plat ou (N, 3), faces à plat ou (M, 3))
+def triangle_centers(vertices, faces):
+    return vertices.reshape(-1, 3)[faces.reshape(-1, 3)].mean(axis=1)
+
+
+# Valeurs des attributs des polygones pour chaque face du maillage simplifié : chaque face prend celles du triangle d'origine
+# dont le centre est le plus proche du sien. Un attribut uniforme (un seul matériau, lissage identique) est reporté tel quel
+def transferred_attributes(attributes, vertices, faces):
+    number_of_faces = len(faces) // 3
+    values = {}
+    nearest = None
+    for name, _ in POLYGON_ATTRIBUTES:
+        source = attributes[name]
+        if len(source) == 0:
+            continue
+        if np.all(source == source[0]):
+            values[name] = np.full(number_of_faces, source[0], dtype=source.dtype)
+            continue
+        if nearest is None:
+            nearest = nearest_points(triangle_centers(attributes['vertices'], attributes['faces']), triangle_centers(vertices, faces))
+        values[name] = source[nearest]
+    return values
+
+
+# Remplit un maillage vide à partir de tableaux numpy de sommets (float32) et de faces triangulaires (int32)
+# Les attributs des polygones du maillage d'origine ('attributes', voir polygon_attributes) sont reportés sur les faces
+def fill_mesh_from_buffers(mesh, vertices, faces, attributes=None):
+    vertices = vertices.ravel()
+    faces = faces.ravel()
+    number_of_faces = len(faces) // 3
+
+    mesh.vertices.add(len(vertices) // 3)
+    mesh.vertices.foreach_set('co', vertices)
+    mesh.loops.add(len(faces))
+    mesh.loops.foreach_set('vertex_index', faces)
+    mesh.polygons.add(number_of_faces)
+    mesh.polygons.foreach_set('loop_start', np.arange(0, len(faces), 3, dtype=np.int32))
+    mesh.polygons.foreach_set('loop_total', np.full(number_of_faces, 3, dtype=np.int32))
+    if attributes is not None:
+        for name, values in transferred_attributes(attributes, vertices, faces).items():
+            mesh.polygons.foreach_set(name, values)
+
+    mesh.update()
+
+
+# Remplace en place la géométrie du maillage de l'objet par le maillage simplifié, sans passer par bpy.ops :
+# l'objet (modificateurs, matériaux, parenté, propriétés personnalisées) est conservé, ainsi que le matériau et le lissage
+# des faces si les attributs des polygones d'origine ('attributes', voir polygon_attributes) sont fournis
+def apply_simplified_mesh(context, object, simplified_mesh_vertices, simplified_mesh_faces, attributes=None):
+    mesh = object.data
+    # En mode 'Edition', le maillage édité est remplacé via bmesh depuis un maillage temporaire
+    if object.mode == 'EDIT':
+        simplified_mesh = bpy.data.meshes.new(name=mesh.name + '.simplified')
+        fill_mesh_from_buffers(simplified_mesh, simplified_mesh_vertices, simplified_mesh_faces, attributes)
+        bm = bmesh.from_edit_mesh(mesh)
+        bm.clear()
+        bm.from_mesh(simplified_mesh)
+        bmesh.update_edit_mesh(mesh)
+        bpy.data.meshes.remove(simplified_mesh)
+    else:
+        mesh.clear_geometry()
+        fill_mesh_from_buffers(mesh, simplified_mesh_vertices, simplified_mesh_faces, attributes)
+    return object
+
+
+def simplify_mesh(context, object, timings=None):
+    timings = {} if timings is None else timings
+    # En mode 'Edition', seules les faces sélectionnées peuvent être simplifiées
+    if context.scene.simplification_properties.selection_only and object and object.mode == 'EDIT':
+        return simplify_selection(context, object, timings)
+    # Nous commençons par préparer les données à envoyer au code C++ à savoir les indices des sommets par face et les coordonnées des sommets
+    with PhaseTimer(timings, 'extraction'):
+        vertices, faces, triangle_polygons = extract_mesh_buffers(object)
+        attributes = polygon_attributes(object.data, vertices, faces, triangle_polygons)
+
+    # Récupération du facteur de décimation (et du mode de traitement des composantes) contenus dans l'instance de la propriété
+    # associée à la scène de Blender
+    options = simplification_options(context)
 
-    # Récupération du facteur de décimation contenu dans l'instance de la propriété associée à la scène de Blender
-    data['decimation_factor'] = context.scene.simplification_properties.decimation_factor
-    
-    cgal_mesh = SurfaceMeshSimplification(data)
     try:
-        cgal_mesh.triangulated_surface_mesh_simplification()
+        simplified_mesh_vertices, simplified_mesh_faces, _, statistics = simplify_object_buffers(vertices, faces, options, os.cpu_count(), get_result_cache(context),
+                                                                                                 object.name)
     except Exception as err:
         raise err
-    
-    # Récupération de la structure de données du maillage résultant de l'algorithme de décimation réalisé côté C++
-    simplified_mesh_data = cgal_mesh.get_surface_mesh_data()
-    simplified_mesh_vertices = simplified_mesh_data.get('vertices')
-    simplified_mesh_faces = simplified_mesh_data.get('faces')
-    
-    # Récupération du nom du maillage
-    mesh_name = mesh.name
-    
-    bpy.ops.object.select_all(action='DESELECT')
-    object.select_set(True)    
-    
-    bpy.ops.object.delete()
-     
-    # on crée un nouveau maillage dans Blender avec les données récupérées
-    simplified_mesh = bpy.data.meshes.new(name=mesh_name)
-    # new_mesh.from_pydata(cgal_mesh_data.get('vertices'), cgal_mesh_edges, cgal_mesh_data.get('faces'))
-    # useful for development when the mesh may be invalid.
-    simplified_mesh.vertices.add(len(simplified_mesh_vertices) // 3)
-    simplified_mesh.vertices.foreach_set('co', simplified_mesh_vertices)
-
-    total_face_indices = len(simplified_mesh_faces)
-    
-    simplified_mesh.loops.add(total_face_indices)
-    simplified_mesh.loops.foreach_set('vertex_index', simplified_mesh_faces) 
-    
-    loop_start = range(0, total_face_indices, 3)
-    loop_total = [3] * total_face_indices
 
-    simplified_mesh.polygons.add(total_face_indices // 3)
-    simplified_mesh.polygons.foreach_set('loop_start', loop_start) 
-    simplified_mesh.polygons.foreach_set('loop_total', loop_total)
-    simplified_mesh.polygons.foreach_set('use_smooth', [0] * total_face_indices)
+    with PhaseTimer(timings, 'application'):
+        apply_simplified_mesh(context, object, simplified_mesh_vertices, simplified_mesh_faces, attributes)
+    execution_statistics.record(context.scene.simplification_properties, 'simplification', object.name, timings, statistics)
 
-    simplified_mesh.update()
-    simplified_mesh.validate()
-    
-    # Création d'un objet Blender auquel associer le maillage
-    obj = bpy.data.objects.new(mesh_name, simplified_mesh)
 
-    # Application de l'ensemble des transformations de l'ancien maillage sur le nouveau
-    obj.location = translation
-    obj.rotation_euler = rotation
-    obj.scale = scale
+# Crée un nouveau maillage Blender à partir de tableaux numpy de sommets (float32) et de faces triangulaires (int32)
+def create_mesh_from_buffers(name, vertices, faces, attributes=None):
+    mesh = bpy.data.meshes.new(name=name)
+    fill_mesh_from_buffers(mesh, vertices, faces, attributes)
+    return mesh
+
 
-    # Ajout de l'objet à la scène
-    bpy.context.scene.collection.objects.link(obj)
+# Génère en une seule exécution de l'algorithme les niveaux de détail (LOD1 à LODn) de l'objet,
+# le niveau i correspondant au facteur de décimation 'lod_ratio' puissance i
+def generate_lods(context, object):
+    properties = context.scene.simplification_properties
+    ratios = [properties.lod_ratio ** level for level in range(1, properties.lod_levels + 1)]
 
-    # et sélection de l'objet dans la scène 3D
-    bpy.context.view_layer.objects.active = obj
-    obj.select_set(True)
+    timings = {}
+    # Le maillage de l'objet (LOD0) n'est pas modifié
+    with PhaseTimer(timings, 'extraction'):
+        vertices, faces, triangle_polygons = extract_mesh_buffers(object)
+        attributes = polygon_attributes(object.data, vertices, faces, triangle_polygons)
+
+    # Niveau le plus grossier, dont la géométrie est celle du maillage partagé une fois les niveaux générés
+    coarsest_level = int(np.argmin(ratios))
+
+    start_time = time.perf_counter()
+    cache = get_result_cache(context)
+    result = None
+    mesh_handle = None
+    if cache is not None:
+        key = ResultCache.key((vertices, faces), ('lods', tuple(ratios), RESULTS_VERSION))
+        result = cache.get(key)
+    if result is not None:
+        lods = [{'vertices': result['vertices_{}'.format(level)], 'faces': result['faces_{}'.format(level)]} for level in range(len(ratios))]
+        statistics = cached_statistics(start_time)
+    else:
+        # Le maillage partagé de l'objet est décimé en place jusqu'au niveau le plus grossier : il est ensuite replacé dans le
+        # registre, associé à l'objet de ce niveau
+        mesh_handle = acquire_mesh_handle(object.name, vertices, faces)
+        revision = mesh_handle.revision() if mesh_handle is not None else None
+        try:
+            cgal_mesh = simplification_instance(mesh_handle, vertices, faces, ratios[-1])
+            lods = cgal_mesh.simplify_lods(ratios)
+        except Exception:
+            restore_mesh_handle(object.name, mesh_handle, revision, vertices, faces)
+            raise
+        statistics = cgal_mesh.get_statistics()
+        if mesh_handle is not None:
+            # Le compactage du maillage partagé (collect_garbage) réordonne ses sommets et ses faces : le niveau le plus grossier
+            # est exporté depuis ce maillage, afin que l'ordre de ses faces soit celui du maillage placé dans le registre
+            lods[coarsest_level] = {'vertices': mesh_handle.get_vertices(), 'faces': mesh_handle.get_faces()}
+        if cache is not None:
+            arrays = {}
+            for level, lod in enumerate(lods):
+                arrays['vertices_{}'.format(level)] = lod['vertices']
+                arrays['faces_{}'.format(level)] = lod['faces']
+            cache.put(key, arrays)
+
+    # Création des objets des niveaux de détail, placés dans les mêmes collections et avec la même transformation que l'objet
+    # d'origine, dont ils reprennent les matériaux
+    lod_objects = []
+    with PhaseTimer(timings, 'application'):
+        for level, lod in enumerate(lods, start=1):
+            name = '{}_LOD{}'.format(object.name, level)
+            lod_mesh = create_mesh_from_buffers(name, lod['vertices'], lod['faces'], attributes)
+            for material in object.data.materials:
+                lod_mesh.materials.append(material)
+            lod_object = bpy.data.objects.new(name, lod_mesh)
+            lod_object.matrix_world = object.matrix_world.copy()
+            for collection in object.users_collection:
+                collection.objects.link(lod_object)
+            lod_objects.append(lod_object)
+    register_mesh_handle(lod_objects[coarsest_level].name, mesh_handle, lods[coarsest_level]['vertices'], lods[coarsest_level]['faces'])
+    execution_statistics.record(context.scene.simplification_properties, 'lods', object.name, timings, statistics)
+    return lod_objects
+
+
+# Simplifie l'ensemble des objets en parallèle et retourne la durée du calcul de chacun d'entre eux
+# 'object_timings' reçoit, par nom d'objet, les durées des étapes Python (extraction, application)
+def simplify_meshes(context, objects, object_timings=None):
+    properties = context.scene.simplification_properties
+    object_timings = {} if object_timings is None else object_timings
+    for object in objects:
+        object_timings.setdefault(object.name, {})
+
+    # Extraction en amont des tableaux de l'ensemble des maillages (accès à bpy uniquement depuis le thread principal)
+    buffers = []
+    attributes = []
+    for object in objects:
+        with PhaseTimer(object_timings[object.name], 'extraction'):
+            vertices, faces, triangle_polygons = extract_mesh_buffers(object)
+            buffers.append((vertices, faces))
+            attributes.append(polygon_attributes(object.data, vertices, faces, triangle_polygons))
+
+    # Simplification des maillages sur un pool de threads (0 : autant de threads que de coeurs disponibles)
+    max_workers = properties.batch_threads if properties.batch_threads > 0 else os.cpu_count()
+    cache = get_result_cache(context)
+    options = simplification_options(context)
+    # Les threads sont répartis entre les objets simplifiés simultanément et les composantes de chacun d'entre eux :
+    # le nombre total de threads ne dépasse pas 'max_workers'
+    object_workers = max(1, min(max_workers, len(objects)))
+    component_workers = max(1, max_workers // object_workers)
+    with ThreadPoolExecutor(max_workers=object_workers) as executor:
+        futures = [executor.submit(simplify_object_buffers, vertices, faces, options, component_workers, cache, object.name)
+                   for object, (vertices, faces) in zip(objects, buffers)]
+        results = [future.result() for future in futures]
+
+    # Application de l'ensemble des résultats en une seule passe depuis le thread principal
+    timings = {}
+    for object, object_attributes, (simplified_mesh_vertices, simplified_mesh_faces, elapsed_time, statistics) in zip(objects, attributes, results):
+        timings[object.name] = elapsed_time
+        # la durée du calcul est enregistrée avec les étapes Python de l'objet (panneau et journal des statistiques)
+        object_timings[object.name]['simplification'] = elapsed_time * 1000.0
+        with PhaseTimer(object_timings[object.name], 'application'):
+            apply_simplified_mesh(context, object, simplified_mesh_vertices, simplified_mesh_faces, object_attributes)
+        execution_statistics.record(context.scene.simplification_properties, 'batch', object.name, object_timings[object.name], statistics)
+    return timings
             
 
 class VIEW3D_OT_mesh_simplification(bpy.types.Operator):
@@ -142,8 +675,127 @@ class VIEW3D_OT_mesh_simplification(bpy.types.Operator):
     
     def execute(self, context):
         object = context.active_object
-        triangulate_mesh(context, object)
-        simplify_mesh(context, object)      
+        simplify_mesh(context, object)
+        return {'FINISHED'}
+
+
+class VIEW3D_OT_mesh_simplification_modal(bpy.types.Operator):
+    """Exécute l'algorithme de simplification en arrière-plan sans bloquer l'interface (Échap pour annuler)"""
+    bl_idname = 'wm.mesh_simplification_modal'
+    bl_label = 'Simplification en arrière-plan'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def invoke(self, context, event):
+        object = context.active_object
+        self.object_name = object.name
+        self.timings = {}
+        # La simplification d'une sélection, qui modifie le maillage édité via bmesh, est exécutée directement
+        if context.scene.simplification_properties.selection_only and object.mode == 'EDIT':
+            simplify_selection(context, object, self.timings)
+            return {'FINISHED'}
+        # Le maillage de l'objet n'est pas modifié avant la fin de l'algorithme : en cas d'annulation il reste intact
+        with PhaseTimer(self.timings, 'extraction'):
+            self.vertices, self.faces, triangle_polygons = extract_mesh_buffers(object)
+            self.attributes = polygon_attributes(object.data, self.vertices, self.faces, triangle_polygons)
+        # Les options (mode de traitement des composantes et budget de faces compris) et le cache sont lus depuis le thread
+        # principal ; la simplification, servie par le cache si le résultat y est déjà, est exécutée comme celle de
+        # l'opérateur non modal par simplify_object_buffers
+        self.options = simplification_options(context)
+        self.cache = get_result_cache(context)
+        self.monitor = SimplificationMonitor(len(self.faces) // 3)
+        self.result = None
+        self.error = None
+
+        # L'algorithme relâche le GIL : l'interface de Blender reste réactive pendant son exécution
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        self.timer = context.window_manager.event_timer_add(0.1, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def run(self):
+        try:
+            # Le maillage CGAL partagé de l'objet est retiré du registre pendant l'algorithme : s'il est annulé, le maillage
+            # partiellement simplifié n'est pas réutilisé
+            self.result = simplify_object_buffers(self.vertices, self.faces, self.options, os.cpu_count(), self.cache, self.object_name, self.monitor)
+        except Exception as err:
+            self.error = err
+
+    def modal(self, context, event):
+        # Demande d'annulation : l'algorithme s'interrompt à la prochaine contraction, le maillage d'origine n'est pas modifié
+        if event.type == 'ESC':
+            self.monitor.cancel()
+            return {'RUNNING_MODAL'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        if self.thread.is_alive():
+            # Progression : arêtes supprimées par rapport aux arêtes à supprimer, pondérées par le nombre de faces de chaque
+            # composante simplifiée
+            context.workspace.status_text_set('Simplification : {:.0%} (Échap pour annuler)'.format(self.monitor.progress()))
+            return {'RUNNING_MODAL'}
+
+        context.window_manager.event_timer_remove(self.timer)
+        context.workspace.status_text_set(None)
+        if self.error is not None:
+            self.report({'ERROR'}, str(self.error))
+            return {'CANCELLED'}
+        if self.monitor.cancelled:
+            self.report({'INFO'}, 'Simplification annulée')
+            return {'CANCELLED'}
+
+        simplified_mesh_vertices, simplified_mesh_faces, elapsed_time, statistics = self.result
+        self.timings['simplification'] = elapsed_time * 1000.0
+        with PhaseTimer(self.timings, 'application'):
+            apply_simplified_mesh(context, bpy.data.objects[self.object_name], simplified_mesh_vertices, simplified_mesh_faces, self.attributes)
+        execution_statistics.record(context.scene.simplification_properties, 'simplification', self.object_name, self.timings, statistics)
+        return {'FINISHED'}
+
+
+class VIEW3D_OT_generate_lods(bpy.types.Operator):
+    """Génère les niveaux de détail de l'objet actif en une seule exécution de l'algorithme de simplification"""
+    bl_idname = 'wm.generate_lods'
+    bl_label = 'Générer les LODs'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        object = context.active_object
+        lod_objects = generate_lods(context, object)
+        self.report({'INFO'}, '{} niveaux de détail générés pour {}'.format(len(lod_objects), object.name))
+        return {'FINISHED'}
+
+
+class VIEW3D_OT_clear_simplification_cache(bpy.types.Operator):
+    """Supprime l'ensemble des résultats conservés dans le cache disque"""
+    bl_idname = 'wm.clear_simplification_cache'
+    bl_label = 'Vider le cache'
+
+    def execute(self, context):
+        properties = context.scene.simplification_properties
+        result_cache.configure(bpy.path.abspath(properties.cache_directory), properties.cache_size * 1024 * 1024)
+        result_cache.clear()
+        return {'FINISHED'}
+
+
+class VIEW3D_OT_batch_mesh_simplification(bpy.types.Operator):
+    """Permet de simplifier en parallèle le maillage de l'ensemble des objets sélectionnés"""
+    bl_idname = 'wm.batch_mesh_simplification'
+    bl_label = 'Simplifier les objets sélectionnés'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        # Les maillages étant remplacés en place, un maillage partagé par plusieurs objets n'est simplifié qu'une fois
+        objects = list({object.data: object for object in reversed(context.selected_objects) if object.type == 'MESH'}.values())
+        if not objects:
+            self.report({'WARNING'}, 'Aucun maillage n\'est sélectionné')
+            return {'CANCELLED'}
+
+        timings = simplify_meshes(context, objects)
+
+        # Compte rendu des durées de calcul (la durée de chaque objet est enregistrée dans ses statistiques)
+        slowest = max(timings, key=timings.get)
+        self.report({'INFO'}, '{} objets simplifiés (total des calculs : {:.1f} ms, le plus long : {} en {:.1f} ms)'.format(
+            len(timings), sum(timings.values()) * 1000.0, slowest, timings[slowest] * 1000.0))
         return {'FINISHED'}
 
 
@@ -161,8 +813,46 @@ class VIEW3D_PT_mesh_simplification_panel(bpy.types.Panel):
         # Création du contenu de l'onglet de l'extension
         box = self.layout.box()
         box.prop(property, 'decimation_factor')
+        box.prop(property, 'selection_only')
+        # mesure de l'erreur géométrique du maillage simplifié
+        box.prop(property, 'compute_error')
+        row = box.row()
+        row.enabled = property.compute_error
+        row.prop(property, 'error_samples')
+        # traitement des maillages composés de plusieurs composantes connexes
+        box.prop(property, 'component_mode')
+        row = box.row()
+        row.enabled = property.component_mode == 'GLOBAL_BUDGET'
+        row.prop(property, 'face_budget')
         row = self.layout.row()
         row.operator(VIEW3D_OT_mesh_simplification.bl_idname, text='Simplifier le maillage')
+        row = self.layout.row()
+        row.operator(VIEW3D_OT_mesh_simplification_modal.bl_idname, text='Simplifier en arrière-plan')
+        # génération des niveaux de détail de l'objet actif
+        box = self.layout.box()
+        box.prop(property, 'lod_levels')
+        box.prop(property, 'lod_ratio')
+        box.operator(VIEW3D_OT_generate_lods.bl_idname, text='Générer les LODs')
+        # simplification en parallèle de l'ensemble des objets sélectionnés
+        box = self.layout.box()
+        box.prop(property, 'batch_threads')
+        box.operator(VIEW3D_OT_batch_mesh_simplification.bl_idname, text='Simplifier les objets sélectionnés')
+        # cache disque des résultats
+        box = self.layout.box()
+        box.prop(property, 'use_result_cache')
+        column = box.column()
+        column.enabled = property.use_result_cache
+        column.prop(property, 'cache_directory')
+        column.prop(property, 'cache_size')
+        column.label(text='succès : {}, échecs : {}'.format(result_cache.hits, result_cache.misses))
+        column.operator(VIEW3D_OT_clear_simplification_cache.bl_idname, text='Vider le cache')
+        # statistiques de la dernière exécution et journal JSON
+        box = self.layout.box()
+        draw_statistics(box, execution_statistics.last)
+        box.prop(property, 'log_statistics')
+        row = box.row()
+        row.enabled = property.log_statistics
+        row.prop(property, 'log_path')
 
 
 # classe contenant les propriétés utilisées dans l'algorithme de simplification du maillage
@@ -176,9 +866,107 @@ class SimplificationProperties(bpy.types.PropertyGroup):
         max=1.0,  # Valeur maximale
         step=5,  # Incrémentation pour le curseur (une valeur 'step' de 5 pour une FloatProperty indique un pas de 0.05)
     )
+    # propriété limitant la simplification aux faces sélectionnées en mode 'Edition'
+    selection_only: bpy.props.BoolProperty(
+        name='sélection uniquement',
+        description='En mode \'Edition\', simplifie uniquement les faces sélectionnées (le bord de la sélection est conservé)',
+        default=False,
+    )
+    # propriété activant la mesure de l'erreur géométrique (distance de Hausdorff échantillonnée et erreur quadratique moyenne)
+    compute_error: bpy.props.BoolProperty(
+        name='mesurer l\'erreur',
+        description='Mesure la distance entre le maillage simplifié et le maillage d\'origine (le maillage d\'origine est conservé pendant l\'algorithme)',
+        default=False,
+    )
+    # propriété sur le nombre d'échantillons de la mesure d'erreur (dans chacun des deux sens)
+    error_samples: bpy.props.IntProperty(
+        name='échantillons',
+        description='Nombre de points échantillonnés sur chacun des deux maillages pour mesurer l\'erreur',
+        default=100000,  # Valeur par défaut
+        min=1000,  # Valeur minimale
+        max=10000000,  # Valeur maximale
+    )
+    # propriété sur le traitement des composantes connexes du maillage
+    component_mode: bpy.props.EnumProperty(
+        name='composantes',
+        description='Traitement des maillages composés de plusieurs composantes connexes',
+        items=[
+            ('NONE', 'Maillage entier', 'Le maillage est simplifié en une seule fois (maillages connexes uniquement)'),
+            ('PER_COMPONENT', 'Par composante', 'Chaque composante connexe est simplifiée en parallèle avec le facteur de décimation'),
+            ('GLOBAL_BUDGET', 'Budget global', 'Le budget de faces est réparti entre les composantes proportionnellement à leur nombre de faces'),
+        ],
+        default='NONE',
+    )
+    # propriété sur le nombre total de faces visé en mode 'budget global'
+    face_budget: bpy.props.IntProperty(
+        name='budget de faces',
+        description='Nombre total de faces visé pour l\'ensemble des composantes',
+        default=10000,  # Valeur par défaut
+        min=4,  # Valeur minimale
+        max=100000000,  # Valeur maximale
+    )
+    # propriété sur le nombre de niveaux de détail générés (en plus du maillage d'origine, LOD0)
+    lod_levels: bpy.props.IntProperty(
+        name='niveaux de détail',
+        description='Nombre de niveaux de détail à générer',
+        default=4,  # Valeur par défaut
+        min=1,  # Valeur minimale
+        max=10,  # Valeur maximale
+    )
+    # propriété sur le facteur de décimation appliqué entre deux niveaux de détail successifs
+    lod_ratio: bpy.props.FloatProperty(
+        name='facteur entre niveaux',
+        description='Facteur de décimation entre deux niveaux de détail successifs',
+        default=0.5,  # Valeur par défaut
+        min=0.05,  # Valeur minimale
+        max=0.95,  # Valeur maximale
+        step=5,  # Incrémentation pour le curseur
+    )
+    # propriété sur le nombre de threads utilisés pour simplifier plusieurs objets en parallèle
+    batch_threads: bpy.props.IntProperty(
+        name='threads',
+        description='Nombre d\'objets simplifiés en parallèle (0 : autant que de coeurs disponibles)',
+        default=0,  # Valeur par défaut
+        min=0,  # Valeur minimale
+        max=256,  # Valeur maximale
+    )
+    # propriété permettant de conserver les résultats sur disque afin de ne pas recalculer une simplification déjà réalisée
+    use_result_cache: bpy.props.BoolProperty(
+        name='cache des résultats',
+        description='Réutilise le résultat d\'une simplification déjà calculée pour le même maillage et les mêmes paramètres',
+        default=False
+    )
+    # propriété sur le dossier du cache (vide : dossier temporaire du système)
+    cache_directory: bpy.props.StringProperty(
+        name='dossier du cache',
+        description='Dossier dans lequel les résultats sont conservés (vide : dossier temporaire du système)',
+        default='',
+        subtype='DIR_PATH',
+    )
+    # propriété sur la taille maximale du cache
+    cache_size: bpy.props.IntProperty(
+        name='taille du cache (Mo)',
+        description='Taille au-delà de laquelle les résultats les moins récemment utilisés sont supprimés',
+        default=1024,  # Valeur par défaut
+        min=1,  # Valeur minimale
+        max=1048576,  # Valeur maximale
+    )
+    # propriété permettant d'ajouter les statistiques de chaque exécution à un journal JSON (une ligne par exécution)
+    log_statistics: bpy.props.BoolProperty(
+        name='journal JSON',
+        description='Ajoute les durées et tailles de chaque exécution au fichier journal (une ligne JSON par exécution)',
+        default=False
+    )
+    # propriété sur le chemin du fichier journal
+    log_path: bpy.props.StringProperty(
+        name='fichier journal',
+        description='Fichier dans lequel les statistiques sont ajoutées',
+        default='',
+        subtype='FILE_PATH',
+    )
 
 
-classes = (VIEW3D_PT_mesh_simplification_panel, VIEW3D_OT_mesh_simplification, SimplificationProperties)
+classes = (VIEW3D_PT_mesh_simplification_panel, VIEW3D_OT_mesh_simplification, VIEW3D_OT_mesh_simplification_modal, VIEW3D_OT_generate_lods, VIEW3D_OT_batch_mesh_simplification, VIEW3D_OT_clear_simplification_cache, SimplificationProperties)
 
 def register():
     for cls in classes:
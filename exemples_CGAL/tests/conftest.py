@@ -0,0 +1,17 @@
+# Configuration commune des tests : les modules Python communs, la chaîne de traitement et les maillages synthétiques sont
+# importés depuis leurs dossiers ; les modules compilés sont cherchés dans les dossiers de la variable d'environnement
+# CGAL_MODULE_PATH (séparés comme ceux de PATH), les tests qui en dépendent étant ignorés s'ils sont introuvables
+#
+# Exemple :
+#   CGAL_MODULE_PATH=../build/simplification:../build/segmentation python -m pytest tests
+
+import os
+import sys
+
+TESTS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIRECTORIES = [os.path.join(TESTS_DIRECTORY, '..', name) for name in ('Common', 'Batch_Pipeline', 'Benchmarks')]
+
+for path in [path for path in os.environ.get('CGAL_MODULE_PATH', '').split(os.pathsep) if path] + SOURCE_DIRECTORIES:
+    path = os.path.abspath(path)
+    if path not in sys.path:
+        sys.path.insert(0, path)
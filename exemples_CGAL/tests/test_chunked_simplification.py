@@ -0,0 +1,85 @@
+# Simplification par blocs (chunked_simplification) : découpage d'un maillage fermé, simplification de chaque bloc par une
+# simplification identité (sans le module compilé) et recousage des blocs. Le maillage recousu doit être le maillage
+# d'origine, renuméroté : les sommets verrouillés reviennent à leur indice d'origine et aucune arête de bord n'apparaît le
+# long des coutures entre les blocs
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import chunked_simplification
+import synthetic_meshes
+
+CELLS_PER_AXIS = 3
+
+
+# Simplification identité : les sommets du bloc sont retournés dans l'ordre inverse (pour vérifier le recousage par les
+# indices d'origine), les sommets verrouillés avec leur indice dans le bloc et les autres avec -1, comme le code C++
+def identity_simplification(vertices, faces, ratio, locked_vertices):
+    order = np.arange(len(vertices))[::-1]
+    inverse_order = np.empty_like(order)
+    inverse_order[order] = np.arange(len(order))
+    original_indices = np.full(len(vertices), -1, dtype=np.int32)
+    original_indices[inverse_order[locked_vertices]] = locked_vertices
+    return (np.ascontiguousarray(vertices[order]), inverse_order[faces].astype(np.int32), original_indices,
+            {'timings_ms': {}, 'sizes': {}})
+
+
+# Triangles (coordonnées de leurs sommets) indépendamment de la numérotation des sommets et de l'ordre des faces
+def sorted_triangles(vertices, faces):
+    triangles = [tuple(map(tuple, triangle)) for triangle in vertices[faces].tolist()]
+    # Rotation de chaque triangle (sans en changer l'orientation) pour commencer par son plus petit sommet
+    return sorted(triangle[triangle.index(min(triangle)):] + triangle[:triangle.index(min(triangle))] for triangle in triangles)
+
+
+# Nombre d'arêtes partagées par une seule face
+def boundary_edges(faces):
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    return int((counts == 1).sum())
+
+
+@pytest.mark.parametrize('shift, band', [(0.0, False), (0.5, False), (0.5, True)])
+def test_identity_chunks_are_stitched_back(tmp_path, monkeypatch, shift, band):
+    monkeypatch.setattr(chunked_simplification, 'simplify_constrained', identity_simplification)
+    vertices, faces = synthetic_meshes.noisy_torus(24, 8)
+    assert boundary_edges(faces) == 0
+
+    directory = str(tmp_path)
+    vertices, faces = chunked_simplification.save_blocks(directory, [(vertices, faces)])
+    bounds = chunked_simplification.mesh_bounds(vertices)
+    band_vertices = len(vertices) // 2 if band else None
+    chunks, number_of_kept = chunked_simplification.partition_mesh(directory, CELLS_PER_AXIS, bounds, shift, band_vertices)
+    assert len(chunks) > 1
+
+    # Des threads plutôt que des processus : la simplification remplacée n'est visible que dans ce processus
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = chunked_simplification.simplify_chunks(executor, directory, chunks, 0.5)
+
+    # Chaque sommet verrouillé d'un bloc revient avec son indice d'origine
+    locked = np.load(str(tmp_path / 'locked.npy'))
+    order = np.load(str(tmp_path / 'order.npy'))
+    assert locked.any()
+    for index, (start, count) in enumerate(chunks):
+        used_vertices = np.unique(faces[order[start:start + count]])
+        with np.load(str(tmp_path / 'chunk_{}.npz'.format(index))) as chunk:
+            original_indices = chunk['original_indices']
+            assert np.array_equal(np.sort(original_indices[original_indices >= 0]), used_vertices[locked[used_vertices]])
+            assert np.array_equal(chunk['vertices'][original_indices >= 0], vertices[original_indices[original_indices >= 0]])
+
+    number_of_vertices, number_of_faces, blocks = chunked_simplification.assemble_chunks(directory, results, number_of_kept)
+    blocks = list(blocks)
+    result_vertices = np.concatenate([block_vertices for block_vertices, _ in blocks])
+    result_faces = np.concatenate([block_faces for _, block_faces in blocks])
+    assert len(result_vertices) == number_of_vertices == len(vertices)
+    assert len(result_faces) == number_of_faces == len(faces)
+
+    # Les sommets conservés sont en tête du résultat, à la position donnée par 'kept_index'
+    kept_index = np.load(str(tmp_path / 'kept_index.npy'))
+    kept = kept_index >= 0
+    assert np.array_equal(result_vertices[kept_index[kept]], vertices[kept])
+
+    # Recousage étanche : aucune arête de bord le long des coutures, et les triangles sont ceux du maillage d'origine
+    assert boundary_edges(result_faces) == 0
+    assert sorted_triangles(result_vertices, result_faces) == sorted_triangles(np.asarray(vertices), np.asarray(faces))
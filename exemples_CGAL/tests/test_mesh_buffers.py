@@ -0,0 +1,27 @@
+# Recherche des plus proches voisins (mesh_buffers.nearest_points) comparée à une recherche exhaustive, pour des points
+# répartis sur une surface, dans un volume ou en amas éloignés des points cherchés
+
+import numpy as np
+import pytest
+
+from mesh_buffers import nearest_points
+
+rng = np.random.default_rng(0)
+POINT_SETS = {
+    'surface': (np.c_[rng.random((3000, 2)), np.zeros(3000)], rng.random((1000, 3)) * 0.1),
+    'volume': (rng.random((3000, 3)), rng.random((1000, 3))),
+    'clusters': (np.r_[rng.random((2000, 3)) * 0.01, rng.random((5, 3)) + 5.0], rng.random((500, 3)) * 6.0),
+}
+
+
+@pytest.mark.parametrize('name', sorted(POINT_SETS))
+def test_nearest_points_is_exact(name):
+    points, queries = POINT_SETS[name]
+    nearest = nearest_points(points, queries)
+    distances = np.einsum('ij,ij->i', queries - points[nearest], queries - points[nearest])
+    exhaustive = ((queries[:, None, :] - points[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+    assert np.allclose(distances, exhaustive, rtol=1e-12, atol=0.0)
+
+
+def test_nearest_points_without_points():
+    assert np.array_equal(nearest_points(np.empty((0, 3)), np.zeros((2, 3))), [-1, -1])
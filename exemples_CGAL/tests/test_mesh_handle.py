@@ -0,0 +1,64 @@
+# Maillage partagé (MeshHandle) entre les modules de simplification et de segmentation : enchaînement des deux algorithmes sur
+# le même maillage et réservation du maillage par des traitements concurrents
+
+import threading
+
+import numpy as np
+import pytest
+
+mesh_simplification = pytest.importorskip('mesh_simplification')
+surface_mesh_segmentation = pytest.importorskip('surface_mesh_segmentation')
+
+import synthetic_meshes
+
+# Durée maximale d'un traitement avant de considérer qu'il attend indéfiniment le maillage (en secondes)
+TIMEOUT = 60.0
+
+
+def test_simplify_then_segment_same_handle():
+    vertices, faces = synthetic_meshes.icosphere(4)
+    mesh_handle = mesh_simplification.MeshHandle(vertices, faces)
+    mesh_simplification.SurfaceMeshSimplification(mesh_handle, 0.25).triangulated_surface_mesh_simplification()
+    assert not mesh_handle.is_busy()
+
+    segmentation = surface_mesh_segmentation.SurfaceMeshSegmentation(mesh_handle, 4, 0.3)
+    segmentation.triangulated_surface_mesh_segmentation()
+    segments_ids = segmentation.getSegmentsIds()
+    assert len(segments_ids) == mesh_handle.number_of_faces() == len(mesh_handle.get_faces())
+    assert np.array_equal(mesh_handle.get_input_faces(), np.arange(mesh_handle.number_of_faces()))
+    assert not mesh_handle.is_busy()
+
+
+def test_concurrent_simplify_and_segment_wait_for_the_handle():
+    vertices, faces = synthetic_meshes.icosphere(5)
+    mesh_handle = surface_mesh_segmentation.MeshHandle(vertices, faces)
+    simplification = mesh_simplification.SurfaceMeshSimplification(mesh_handle, 0.5)
+    segmentation = surface_mesh_segmentation.SurfaceMeshSegmentation(mesh_handle, 4, 0.3)
+    errors = []
+
+    def run(function):
+        try:
+            function()
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(simplification.triangulated_surface_mesh_simplification,)),
+               threading.Thread(target=run, args=(segmentation.triangulated_surface_mesh_segmentation,))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(TIMEOUT)
+    assert not any(thread.is_alive() for thread in threads)
+    assert not errors
+    assert not mesh_handle.is_busy()
+
+
+def test_rejected_faces_are_mapped_to_input_triangles():
+    vertices, faces = synthetic_meshes.icosphere(2)
+    # Un triangle dupliqué est refusé par la construction du maillage (arêtes non manifold)
+    faces = np.concatenate([faces[:1], faces])
+    mesh_handle = surface_mesh_segmentation.MeshHandle(vertices, faces)
+    input_faces = mesh_handle.get_input_faces()
+    assert mesh_handle.number_of_faces() == len(faces) - 1
+    assert np.array_equal(input_faces, np.delete(np.arange(len(faces)), 1))
+    assert mesh_handle.get_statistics()['sizes']['rejected_faces'] == 1